@@ -5,13 +5,18 @@ from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.prompts import ChatPromptTemplate
 import os
 
-# Initialize LLM (Placeholder values for now)
-llm = ChatGoogleGenerativeAI(
-    model="gemini-2.0-flash-exp",
-    temperature=0.1
-)
+_llm_with_tools = None
 
-llm_with_tools = llm.bind_tools(tools)
+def get_llm_with_tools():
+    """Tool-bound LLM, created on first use so importing needs no credentials."""
+    global _llm_with_tools
+    if _llm_with_tools is None:
+        llm = ChatGoogleGenerativeAI(
+            model="gemini-2.0-flash-exp",
+            temperature=0.1
+        )
+        _llm_with_tools = llm.bind_tools(tools)
+    return _llm_with_tools
 
 def initialize_repository(state: CodeReviewState) -> CodeReviewState:
     """Initialize the repository and detect structure."""
@@ -34,7 +39,7 @@ def run_static_analysis(state: CodeReviewState) -> CodeReviewState:
         Files: {target_files}""")
     ])
     
-    chain = prompt | llm_with_tools
+    chain = prompt | get_llm_with_tools()
     
     try:
         files_to_analyze = state.get("target_files", []) or []
@@ -1,67 +1,51 @@
+from typing import List
 from langgraph.graph import StateGraph, END
 from langgraph.checkpoint.memory import MemorySaver
 from agents.state import CodeReviewState
-import operator
-
-# Node functions
-def initialize_repository_node(state: CodeReviewState) -> CodeReviewState:
-    state["current_step"] = "initializing_repository"
-    return state
-
-def define_scope_node(state: CodeReviewState) -> CodeReviewState:
-    state["current_step"] = "defining_scope"
-    return state
-
-def run_static_analysis_node(state: CodeReviewState) -> CodeReviewState:
-    state["current_step"] = "running_static_analysis"
-    return state
-
-def run_pattern_analysis_node(state: CodeReviewState) -> CodeReviewState:
-    state["current_step"] = "running_pattern_analysis"
-    return state
-
-def run_security_audit_node(state: CodeReviewState) -> CodeReviewState:
-    state["current_step"] = "running_security_audit"
-    return state
-
-def run_performance_analysis_node(state: CodeReviewState) -> CodeReviewState:
-    state["current_step"] = "running_performance_analysis"
-    return state
-
-def assess_testing_node(state: CodeReviewState) -> CodeReviewState:
-    state["current_step"] = "assessing_testing"
-    return state
-
-def verify_logic_node(state: CodeReviewState) -> CodeReviewState:
-    state["current_step"] = "verifying_logic"
-    return state
-
-def verify_policy_node(state: CodeReviewState) -> CodeReviewState:
-    state["current_step"] = "verifying_policy"
-    return state
-
-def synthesize_findings_node(state: CodeReviewState) -> CodeReviewState:
-    state["current_step"] = "synthesizing_findings"
-    # Consolidate findings
-    all_f = (state.get("static_analysis_findings", []) + 
-             state.get("pattern_analysis_findings", []) + 
-             state.get("security_findings", []) +
-             state.get("performance_findings", []) +
-             state.get("testing_findings", []) +
-             state.get("logic_findings", []) +
-             state.get("policy_findings", []))
-    state["all_findings"] = all_f
-    state["prioritized_issues"] = sorted(all_f, key=lambda x: x.get("severity", "info"))
-    return state
-
-def generate_fixes_node(state: CodeReviewState) -> CodeReviewState:
-    state["current_step"] = "generating_fixes"
-    return state
-
-def create_reports_node(state: CodeReviewState) -> CodeReviewState:
-    state["current_step"] = "creating_reports"
-    state["markdown_report"] = "# Code Review Report\nGenerated report content."
-    return state
+from agents.nodes import (
+    initialize_repository_node,
+    define_scope_node,
+    run_static_analysis_node,
+    run_pattern_analysis_node,
+    run_security_audit_node,
+    run_performance_analysis_node,
+    assess_testing_node,
+    verify_logic_node,
+    verify_policy_node,
+    synthesize_findings_node,
+    generate_fixes_node,
+    create_reports_node
+)
+
+# Independent analysis nodes, keyed by their `enabled_checks` name. None of
+# them reads another's output, so they all run as parallel branches.
+ANALYSIS_NODES = {
+    "static_analysis": run_static_analysis_node,
+    "pattern_analysis": run_pattern_analysis_node,
+    "security_audit": run_security_audit_node,
+    "performance_analysis": run_performance_analysis_node,
+    "testing_assessment": assess_testing_node,
+    "logic_verification": verify_logic_node,
+    "policy_verification": verify_policy_node,
+}
+
+# Review scopes that restrict the analysis to a single node
+SCOPE_ONLY_NODES = {
+    "security_only": "security_audit",
+    "performance_only": "performance_analysis",
+}
+
+def route_analysis_nodes(state: CodeReviewState) -> List[str]:
+    """Fan out from scope definition to every enabled analysis node."""
+    scope = state.get("review_scope")
+    if scope in SCOPE_ONLY_NODES:
+        return [SCOPE_ONLY_NODES[scope]]
+
+    enabled = state.get("config", {}).get("enabled_checks")
+    if enabled is None:
+        return list(ANALYSIS_NODES)
+    selected = [name for name in ANALYSIS_NODES if name in enabled]
+    return selected or ["synthesis"]
 
 def should_generate_fixes(state: CodeReviewState) -> str:
     """Determine if fixes should be generated."""
@@ -70,19 +54,21 @@ def should_generate_fixes(state: CodeReviewState) -> str:
     return "generate_fixes"
 
 # Create the graph
-def create_code_review_graph():
+def create_code_review_graph(checkpointer=None):
+    """
+    Compile the review graph.
+
+    Without a ``checkpointer`` checkpoints are kept in memory and a thread
+    ends with the process; pass a durable one (see
+    utils.checkpointer.SQLiteCheckpointSaver) to make reviews resumable.
+    """
     workflow = StateGraph(CodeReviewState)
 
     # Add Nodes
     workflow.add_node("initialization", initialize_repository_node)
     workflow.add_node("scope_definition", define_scope_node)
-    workflow.add_node("static_analysis", run_static_analysis_node)
-    workflow.add_node("pattern_analysis", run_pattern_analysis_node)
-    workflow.add_node("security_audit", run_security_audit_node)
-    workflow.add_node("performance_analysis", run_performance_analysis_node)
-    workflow.add_node("testing_assessment", assess_testing_node)
-    workflow.add_node("logic_verification", verify_logic_node)
-    workflow.add_node("policy_verification", verify_policy_node)
+    for name, node in ANALYSIS_NODES.items():
+        workflow.add_node(name, node)
     workflow.add_node("synthesis", synthesize_findings_node)
     workflow.add_node("fix_generation", generate_fixes_node)
     workflow.add_node("reporting", create_reports_node)
@@ -90,14 +76,16 @@ def create_code_review_graph():
     # Set Edges
     workflow.set_entry_point("initialization")
     workflow.add_edge("initialization", "scope_definition")
-    workflow.add_edge("scope_definition", "static_analysis")
-    workflow.add_edge("static_analysis", "pattern_analysis")
-    workflow.add_edge("pattern_analysis", "security_audit")
-    workflow.add_edge("security_audit", "performance_analysis")
-    workflow.add_edge("performance_analysis", "testing_assessment")
-    workflow.add_edge("testing_assessment", "logic_verification")
-    workflow.add_edge("logic_verification", "policy_verification")
-    workflow.add_edge("policy_verification", "synthesis")
+
+    # Fan out to the analysis branches; they all finish in the same step,
+    # so synthesis runs once with every branch's findings merged in
+    workflow.add_conditional_edges(
+        "scope_definition",
+        route_analysis_nodes,
+        list(ANALYSIS_NODES) + ["synthesis"]
+    )
+    for name in ANALYSIS_NODES:
+        workflow.add_edge(name, "synthesis")
     
     # Conditional edge for fixes with human-in-the-loop approval
     workflow.add_conditional_edges(
@@ -112,10 +100,22 @@ def create_code_review_graph():
     workflow.add_edge("reporting", END)
 
     # Compile with checkpointer for HITL
-    memory = MemorySaver()
     return workflow.compile(
-        checkpointer=memory,
+        checkpointer=checkpointer or MemorySaver(),
         interrupt_before=["fix_generation"]  # Wait for user approval
     )
 
-app = create_code_review_graph()
+_app = None
+
+def get_app():
+    """The default compiled graph, built on first use rather than at import."""
+    global _app
+    if _app is None:
+        _app = create_code_review_graph()
+    return _app
+
+def __getattr__(name):
+    # Keeps `from agents.graph import app` working without compiling at import
+    if name == "app":
+        return get_app()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,184 +1,723 @@
 """
 Node implementations for the Code Review Agent LangGraph.
+
+Nodes return only the state keys they update. The analysis nodes run as
+parallel branches, so they must never write the same non-reducer key.
 """
 
-from typing import Dict, List, Any
-from agents.state import CodeReviewState, Finding
-from tools.git_operations import clone_repository, get_changed_files
-from tools.code_analysis import parse_python_ast, run_pylint, calculate_cyclomatic_complexity, detect_code_smells
-from langchain_google_genai import ChatGoogleGenerativeAI
+from typing import Dict, Iterator, List, Any, Optional, Tuple
+from agents.state import CodeReviewState, Finding, FindingRecord
+from tools.git_operations import clone_repository, get_changed_hunks, list_repository_files
+from tools.code_analysis import (
+    parse_python_ast, lint_python_files, calculate_cyclomatic_complexity, find_code_smells,
+    SMELL_DETECTOR_VERSION
+)
+from tools.complexity import COMPLEXITY_ENGINE_VERSION
+from tools.security_scanner import scan_security_vulnerabilities
 from langchain_core.prompts import ChatPromptTemplate
 import os
+import re
 import time
-import uuid
 import ast
-from utils.rag_engine import RAGEngine
-
-# Initialize LLM
-llm = ChatGoogleGenerativeAI(
-    model="gemini-2.0-flash-exp",
-    temperature=0.1
-)
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from tools.policy_rules import get_policy_rules
+from utils.rag_engine import get_rag_engine, policy_triggers
+from utils.source_cache import source_cache
+from utils.result_cache import get_result_cache, cached_result, cached_results, tool_version
+from utils.config_loader import load_config
+from utils.parallel import map_files
+from utils.file_scope import ScopeFilter, iter_scope_files
+from utils.diff_scope import ChangedLines
+from utils.findings_stream import FindingsSink, get_findings_sink, read_findings
+from utils.baseline import get_baseline, is_suppressed
+from utils.fingerprint import CONTEXT_VERSION, Fingerprinter, annotate_context
+from utils.dedup import merge_duplicates
+from utils.llm_gateway import get_llm_gateway
+from utils.llm_cache import get_llm_response_cache
+from utils.context_packer import ContextPacker, DEFAULT_CONTEXT_TOKENS
 
-def initialize_repository_node(state: CodeReviewState) -> CodeReviewState:
+def initialize_repository_node(state: CodeReviewState) -> Dict:
     """Initialize repository and detect project structure."""
     repo_url = state.get("repository_url")
-    local_path = state.get("local_path", "./repo_to_review")
+    local_path = state.get("local_path") or "./repo_to_review"
+    source_cache.clear()
     
-    if repo_url and repo_url != "local":
-        result = clone_repository.invoke({"repo_url": repo_url, "local_path": local_path})
-        state["local_path"] = local_path
+    if repo_url and repo_url != "local" and not os.path.isdir(repo_url):
+        clone_repository.invoke({"repo_url": repo_url, "local_path": local_path})
+    elif repo_url and repo_url != "local":
+        local_path = repo_url
     else:
-        state["local_path"] = "."
+        local_path = state.get("local_path") or "."
 
     # Mock detection for demo
-    state["primary_languages"] = ["python"]
-    state["project_type"] = "library"
-    state["current_step"] = "repository_initialized"
-    return state
+    return {
+        "local_path": local_path,
+        "config": state.get("config") or load_config(local_path),
+        "primary_languages": ["python"],
+        "project_type": "library",
+        "current_step": "repository_initialized"
+    }
 
-def define_scope_node(state: CodeReviewState) -> CodeReviewState:
+def define_scope_node(state: CodeReviewState) -> Dict:
     """Identify files to analyze based on scope."""
     scope = state.get("review_scope", "full")
     local_path = state.get("local_path")
+    config = state.get("config", {})
+    include_patterns = config.get("include_patterns")
+    exclude_patterns = config.get("exclude_patterns")
     
-    files = []
-    if scope == "full":
-        # Logic to list all files (simplified)
-        for root, _, filenames in os.walk(local_path):
-            for f in filenames:
-                if f.endswith('.py'):
-                    files.append(os.path.join(root, f))
+    file_source = state.get("file_source") or "auto"
+    file_hashes = {}
+    changed_lines = {}
+    
+    if scope == "files" and state.get("target_files"):
+        files = list(state["target_files"])
     elif scope == "diff":
-        files = get_changed_files.invoke({"repo_path": local_path})
+        scope_filter = ScopeFilter(include_patterns, exclude_patterns)
+        hunks = get_changed_hunks.invoke({
+            "repo_path": local_path,
+            "base_ref": state.get("base_ref"),
+            "target_branch": state.get("target_branch")
+        })
+        if hunks.get("status") != "success":
+            return {
+                "target_files": [],
+                "total_files": 0,
+                "errors": [f"Diff scope failed: {hunks.get('error')}"],
+                "current_step": "scope_defined"
+            }
+        files = []
+        for rel_path, ranges in sorted(hunks["files"].items()):
+            file_path = os.path.join(local_path, rel_path)
+            if scope_filter.wants_file(rel_path) and os.path.isfile(file_path):
+                files.append(file_path)
+                changed_lines[file_path] = ranges
+    else:
+        listing = None
+        if file_source != "walk":
+            listing = list_repository_files.invoke({"repo_path": local_path})
+            if listing.get("status") != "success":
+                if file_source == "git":
+                    return {
+                        "target_files": [],
+                        "total_files": 0,
+                        "errors": [f"Git file listing failed: {listing.get('error')}"],
+                        "current_step": "scope_defined"
+                    }
+                listing = None
+        
+        if listing is not None:
+            # Git already skips ignored trees, so nothing is walked on disk
+            scope_filter = ScopeFilter(include_patterns, exclude_patterns)
+            wanted_dirs = {}
+            files = []
+            for rel_path in sorted(listing["files"]):
+                if not scope_filter.wants_file(rel_path):
+                    continue
+                parents = list(_parent_dirs(rel_path))
+                for rel_dir in parents:
+                    if rel_dir not in wanted_dirs:
+                        wanted_dirs[rel_dir] = scope_filter.wants_dir(rel_dir)
+                if not all(wanted_dirs[d] for d in parents):
+                    continue
+                file_path = os.path.join(local_path, rel_path)
+                files.append(file_path)
+                if listing["files"][rel_path]:
+                    file_hashes[file_path] = listing["files"][rel_path]
+        else:
+            files = list(iter_scope_files(local_path, include_patterns, exclude_patterns))
     
-    state["target_files"] = files[:10]  # Limit for demo
-    state["total_files"] = len(files)
-    state["current_step"] = "scope_defined"
-    return state
+    return {
+        "target_files": files,
+        "total_files": len(files),
+        "file_hashes": file_hashes,
+        "changed_lines": changed_lines,
+        "current_step": "scope_defined"
+    }
+
+def _parent_dirs(rel_path: str) -> Iterator[str]:
+    """'a/b/c.py' -> 'a', 'a/b'; mirrors the directories iter_scope_files would prune."""
+    index = rel_path.find("/")
+    while index != -1:
+        yield rel_path[:index]
+        index = rel_path.find("/", index + 1)
+
+def _analysis_cache(cache_enabled: bool):
+    """Result cache for this review, or None when disabled with --no-cache."""
+    if not cache_enabled:
+        return None
+    return get_result_cache()
+
+def _python_config(state: CodeReviewState) -> Dict:
+    return state.get("config", {}).get("languages", {}).get("python", {})
+
+def _rel_path(state: CodeReviewState, file_path: str) -> str:
+    """Path of a file relative to the repository root, as used in fingerprints."""
+    local_path = state.get("local_path")
+    return os.path.relpath(file_path, local_path) if local_path else file_path
+
+def _python_files(state: CodeReviewState) -> Iterator[Tuple[str, str, Optional[str], Optional[List]]]:
+    """Lazily select the in-scope files the Python analyzers understand.
+
+    Each file comes with its repository-relative path, its git blob SHA
+    when scope definition found one, and its changed line ranges in a diff
+    review (None: whole file).
+    """
+    file_hashes = state.get("file_hashes") or {}
+    changed_lines = state.get("changed_lines") or {}
+    return ((f, _rel_path(state, f), file_hashes.get(f), changed_lines.get(f))
+            for f in state.get("target_files") or [] if f.endswith(".py"))
+
+def _content_hash(file_path: str, known_hash: Optional[str]) -> str:
+    """Content identity of a file; a known blob SHA avoids reading it at all."""
+    return known_hash or source_cache.get(file_path).content_hash
+
+def _import_dirs(file_path: str, rel_path: str) -> List[str]:
+    """Directories an absolute import in ``file_path`` may resolve from, up to the repository root."""
+    directory = os.path.dirname(os.path.abspath(file_path))
+    dirs = [directory]
+    if not os.path.isabs(rel_path) and not rel_path.startswith(".."):
+        for _ in range(rel_path.count(os.sep)):
+            directory = os.path.dirname(directory)
+            dirs.append(directory)
+    return dirs
+
+def _module_hash(name: str, dirs: List[str]) -> Optional[str]:
+    parts = name.split(".")
+    for directory in dirs:
+        for candidate in (os.path.join(directory, *parts) + ".py",
+                          os.path.join(directory, *parts, "__init__.py")):
+            if os.path.isfile(candidate):
+                return source_cache.get(candidate).content_hash
+    return None
+
+def _import_hashes(file_path: str, rel_path: str) -> Dict[str, Optional[str]]:
+    """Content hash of every module ``file_path`` imports, by import name.
+
+    Pylint's import-error, no-name-in-module and no-member messages depend
+    on the imported modules, so their hashes belong in the file's cache
+    key. Modules outside the repository map to None, so adding one later
+    changes the key as well.
+    """
+    try:
+        tree = source_cache.get(file_path).tree
+    except (SyntaxError, ValueError):
+        return {}
+    absolute = _import_dirs(file_path, rel_path)
+    hashes = {}
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names, dirs, prefix = [alias.name for alias in node.names], absolute, ""
+        elif isinstance(node, ast.ImportFrom):
+            module = node.module or ""
+            names = ([module] if module else []) + [
+                f"{module}.{alias.name}" if module else alias.name for alias in node.names]
+            dirs, prefix = absolute, "." * node.level
+            if node.level:
+                package = absolute[0]
+                for _ in range(node.level - 1):
+                    package = os.path.dirname(package)
+                dirs = [package]
+        else:
+            continue
+        for name in names:
+            hashes[prefix + name] = _module_hash(name, dirs)
+    return hashes
+
+# Pylint messages that depend on more of the project than a file's direct imports
+_PROJECT_WIDE_LINT_SYMBOLS = frozenset({"cyclic-import", "duplicate-code"})
+
+def _lint_cacheable(lint_results: List[Dict]) -> bool:
+    """Whether pylint results depend on the linted file and its direct imports only."""
+    return not any(lint.get("symbol") in _PROJECT_WIDE_LINT_SYMBOLS for lint in lint_results)
+
+def _findings_sink(state: CodeReviewState) -> Optional[FindingsSink]:
+    """Sink the review streams findings to, or None to keep them in state."""
+    return get_findings_sink(state.get("findings_stream"))
+
+def _emit(state: CodeReviewState, batch: List[Finding], findings: List[Finding]) -> int:
+    """Pass a batch of new findings on, dropping those recorded in the baseline.
+
+    Kept findings go to the review's sink when it streams, else to
+    ``findings``. Returns how many findings the baseline dropped.
+    """
+    baseline = get_baseline(state.get("baseline_path"))
+    known = 0
+    if baseline:
+        new = [f for f in batch if f.get("id") not in baseline]
+        known, batch = len(batch) - len(new), new
+    sink = _findings_sink(state)
+    if sink is not None:
+        sink.write(batch)
+    else:
+        findings.extend(batch)
+    return known
 
-def run_static_analysis_node(state: CodeReviewState) -> CodeReviewState:
+def _collect(state: CodeReviewState, results, findings: List[Finding], errors: List[str],
+             timings: Optional[Dict[str, float]] = None) -> Tuple[int, int]:
+    """Merge per-file (findings, errors[, timings]) results from map_files in file order.
+
+    Each file's findings are emitted as soon as the file is done.
+
+    Returns:
+        Number of files processed and of findings dropped by the baseline
+    """
+    processed = known = 0
+    for file_path, result, error in results:
+        processed += 1
+        if error:
+            errors.append(f"{file_path}: {error}")
+            continue
+        file_findings, file_errors, *file_timings = result
+        known += _emit(state, file_findings, findings)
+        errors.extend(file_errors)
+        if timings is not None and file_timings:
+            for name, seconds in file_timings[0].items():
+                timings[name] = timings.get(name, 0.0) + seconds
+    return processed, known
+
+# Files per pylint run; large enough to share inference, small enough to spread over workers
+LINT_BATCH_FILES = 16
+
+def _static_analysis_batch(first_path: str, batch: Tuple, python_config: Dict,
+                           cache_enabled: bool) -> List[Tuple]:
+    """Static analysis of a batch of files, linted together in one pylint run.
+
+    Args:
+        first_path: Path of the batch's first file, which map_files reports it under
+        batch: ``_python_files`` entries of the files
+
+    Returns:
+        (findings, errors) of each file, in batch order
+    """
+    # Pylint checks whole files; synthesis scopes its findings to the diff.
+    # Its results depend on the file's name (invalid-name, module docstrings)
+    # and on the modules it imports, not only on its content.
+    entries = {file_path: (_content_hash(file_path, known_hash),
+                           {"python": python_config, "path": rel_path,
+                            "imports": _import_hashes(file_path, rel_path)})
+               for file_path, rel_path, known_hash, _ in batch}
+
+    def lint(file_paths: List[str]) -> Dict[str, List[Dict]]:
+        linted = lint_python_files(file_paths, python_config.get("max_line_length"))
+        return {path: annotate_context(linted[path], source_cache.get(path)) for path in file_paths}
+
+    lint_results = cached_results(_analysis_cache(cache_enabled), entries, "pylint",
+                                  f"{tool_version('pylint')}/{CONTEXT_VERSION}", lint,
+                                  cacheable=_lint_cacheable)
+    return [_static_findings(file_path, rel_path, lint_results[file_path])
+            for file_path, rel_path, _, _ in batch]
+
+def _static_findings(file_path: str, rel_path: str, lint_results: List[Dict]) -> Tuple[List[Finding], List[str]]:
+    findings, errors = [], []
+    fingerprints = Fingerprinter(rel_path)
+    for lint in lint_results:
+        if "error" in lint:
+            errors.append(f"{file_path}: {lint['error']}")
+            continue
+        fingerprint = fingerprints.make(lint.get("symbol"), lint.get("context"), lint.get("scope"))
+        if is_suppressed(lint, lint.get("symbol")):
+            continue
+        findings.append(FindingRecord(
+            id=fingerprint,
+            rule_id=lint.get("symbol"),
+            tool="pylint",
+            symbol=lint.get("scope"),
+            file=file_path,
+            line=lint.get("line", 0),
+            end_line=lint.get("end_line"),
+            severity=lint.get("severity", "medium"),
+            category="style",
+            title=f"Lint Issue: {lint.get('symbol')}",
+            description=lint.get("message", ""),
+            auto_fixable=False
+        ))
+
+    # Run AST
+    ast_info = parse_python_ast.invoke({"file_path": file_path})
+    if ast_info.get("status") == "error":
+        errors.append(ast_info.get("error"))
+    return findings, errors
+
+def _static_analysis_file(file_path: str, rel_path: str, known_hash: Optional[str], ranges: Optional[List],
+                          python_config: Dict, cache_enabled: bool):
+    return _static_analysis_batch(file_path, ((file_path, rel_path, known_hash, ranges),),
+                                  python_config, cache_enabled)[0]
+
+def _lint_batches(files: Iterator[Tuple]) -> Iterator[Tuple[str, Tuple]]:
+    """Group files into ``(first file path, files)`` items for map_files."""
+    batch = []
+    for item in files:
+        batch.append(item)
+        if len(batch) == LINT_BATCH_FILES:
+            yield batch[0][0], tuple(batch)
+            batch = []
+    if batch:
+        yield batch[0][0], tuple(batch)
+
+def _per_file(results: Iterator[Tuple], batches: Dict[str, Tuple]) -> Iterator[Tuple]:
+    """Split map_files results of file batches back into per-file results."""
+    for first_path, result, error in results:
+        batch = batches.pop(first_path)
+        for index, (file_path, *_) in enumerate(batch):
+            yield file_path, None if error else result[index], error
+
+def run_static_analysis_node(state: CodeReviewState) -> Dict:
     """Execute linting and AST analysis."""
-    files = state.get("target_files", [])
-    findings = []
+    findings, errors = [], []
+    batches = {}
+
+    def submitted():
+        for first_path, batch in _lint_batches(_python_files(state)):
+            batches[first_path] = batch
+            yield first_path, batch
+
+    results = map_files(_static_analysis_batch, submitted(), _python_config(state),
+                        state.get("cache_enabled", True), jobs=state.get("jobs"))
+    analyzed, known = _collect(state, _per_file(results, batches), findings, errors)
+            
+    return {
+        "static_analysis_findings": findings,
+        "errors": errors,
+        "baseline_matches": known,
+        "files_analyzed": state.get("files_analyzed", 0) + analyzed,
+        "current_step": "static_analysis_complete"
+    }
+
+def _policy_config(state: CodeReviewState) -> Dict:
+    return state.get("config", {}).get("policy", {})
+
+def _standards_dir(state: CodeReviewState) -> str:
+    return _policy_config(state).get("standards_dir", "./standards")
+
+def _pattern_analysis_file(file_path: str, rel_path: str, known_hash: Optional[str], ranges: Optional[List],
+                           performance_config: Dict, policy_rules: List[Dict], cache_enabled: bool):
+    findings, errors, timings = [], [], {}
+    
+    def compute():
+        try:
+            smells, rule_timings = find_code_smells(file_path, performance_config, policy_rules)
+        except Exception as e:
+            return [{"error": str(e)}]
+        timings.update(rule_timings)
+        return annotate_context(smells, source_cache.get(file_path))
+    
+    # Rules only run (and are timed) on a cache miss
+    smells = cached_result(
+        _analysis_cache(cache_enabled), _content_hash(file_path, known_hash),
+        "code_smells", f"{SMELL_DETECTOR_VERSION}/{CONTEXT_VERSION}", compute,
+        config_section={"performance": performance_config, "policies": policy_rules}
+    )
+    changed = ChangedLines({file_path: ranges} if ranges is not None else None)
+    fingerprints = Fingerprinter(rel_path)
+    for smell in smells:
+        if "error" in smell:
+            errors.append(f"{file_path}: {smell['error']}")
+            continue
+        # Fingerprint every smell, so occurrence numbers do not depend on the diff
+        fingerprint = fingerprints.make(smell.get("type"), smell.get("context"), smell.get("scope"))
+        if is_suppressed(smell, smell.get("type")):
+            continue
+        if not changed.overlaps(file_path, smell.get("line", 0), smell.get("end_line")):
+            continue
+        # Compiled policies report through the same pass as the smell rules
+        policy = smell.get("category") == "policy"
+        findings.append(FindingRecord(
+            id=fingerprint,
+            rule_id=smell.get("type"),
+            tool="policy" if policy else "smells",
+            symbol=smell.get("scope"),
+            file=file_path,
+            line=smell.get("line", 0),
+            end_line=smell.get("end_line"),
+            column=smell.get("column"),
+            severity=smell.get("severity", "medium"),
+            category=smell.get("category", "pattern"),
+            title=smell.get("message", "") if policy else smell.get("type").replace("_", " ").title(),
+            description=smell.get("message", ""),
+            auto_fixable=not policy
+        ))
+    return findings, errors, timings
+
+def run_pattern_analysis_node(state: CodeReviewState) -> Dict:
+    """Detect code smells and violations of compiled policies."""
+    findings, errors, timings = [], [], {}
+    policy_rules, rule_errors = get_policy_rules(_standards_dir(state))
+    errors.extend(f"Policy rule not compiled: {error}" for error in rule_errors)
+    
+    results = map_files(_pattern_analysis_file, _python_files(state), state.get("config", {}).get("performance", {}),
+                        policy_rules, state.get("cache_enabled", True), jobs=state.get("jobs"))
+    _, known = _collect(state, results, findings, errors, timings)
+            
+    return {
+        "pattern_analysis_findings": findings,
+        "errors": errors,
+        "baseline_matches": known,
+        "rule_timings": timings,
+        "current_step": "pattern_analysis_complete"
+    }
+
+def _security_analysis_file(file_path: str, rel_path: str, known_hash: Optional[str], ranges: Optional[List],
+                            security_config: Dict, cache_enabled: bool):
+    findings, errors = [], []
+    issues = cached_result(
+        _analysis_cache(cache_enabled), _content_hash(file_path, known_hash),
+        "bandit", f"{tool_version('bandit')}/{CONTEXT_VERSION}",
+        lambda: annotate_context(scan_security_vulnerabilities.invoke({
+            "file_path": file_path,
+            "skips": security_config.get("bandit_skips")
+        }), source_cache.get(file_path)),
+        config_section=security_config
+    )
+    changed = ChangedLines({file_path: ranges} if ranges is not None else None)
+    fingerprints = Fingerprinter(rel_path)
+    for issue in issues:
+        if "error" in issue:
+            errors.append(f"{file_path}: {issue['error']}")
+            continue
+        fingerprint = fingerprints.make(issue.get("test_id"), issue.get("context"), issue.get("scope"))
+        if is_suppressed(issue, issue.get("test_id")):
+            continue
+        if not changed.overlaps(file_path, issue.get("line", 0), issue.get("end_line")):
+            continue
+        findings.append(FindingRecord(
+            id=fingerprint,
+            rule_id=issue.get("test_id"),
+            tool="bandit",
+            symbol=issue.get("scope"),
+            file=file_path,
+            line=issue.get("line", 0),
+            end_line=issue.get("end_line"),
+            column=issue.get("column"),
+            severity=issue.get("severity", "medium"),
+            category="security",
+            title=f"{issue.get('test_id')}: {issue.get('test_name', '').replace('_', ' ')}",
+            description=issue.get("message", ""),
+            cwe_id=f"CWE-{issue['cwe']}" if issue.get("cwe") else None,
+            auto_fixable=False
+        ))
+    return findings, errors
+
+def run_security_audit_node(state: CodeReviewState) -> Dict:
+    """Run bandit over the in-scope Python files, sharded across the worker pool."""
+    findings, errors = [], []
     
-    for file_path in files:
-        # Run Pylint
-        lint_results = run_pylint.invoke({"file_path": file_path})
-        for lint in lint_results:
-            findings.append(Finding(
-                id=str(uuid.uuid4()),
+    results = map_files(_security_analysis_file, _python_files(state), state.get("config", {}).get("security", {}),
+                        state.get("cache_enabled", True), jobs=state.get("jobs"))
+    _, known = _collect(state, results, findings, errors)
+    
+    return {
+        "security_findings": findings,
+        "errors": errors,
+        "baseline_matches": known,
+        "current_step": "security_audit_complete"
+    }
+
+def _with_suppressions(complexity: Dict, file_path: str) -> Dict:
+    """Annotate complexity blocks with the suppression comments on their def lines."""
+    if "error" not in complexity:
+        annotate_context(complexity["complexity_data"], source_cache.get(file_path), line_key="lineno")
+    return complexity
+
+def _performance_analysis_file(file_path: str, rel_path: str, known_hash: Optional[str], ranges: Optional[List],
+                               python_config: Dict, cache_enabled: bool):
+    findings, errors = [], []
+    complexity = cached_result(
+        _analysis_cache(cache_enabled), _content_hash(file_path, known_hash),
+        "complexity", f"{COMPLEXITY_ENGINE_VERSION}/{CONTEXT_VERSION}",
+        lambda: _with_suppressions(calculate_cyclomatic_complexity.invoke({"file_path": file_path}), file_path),
+        config_section=python_config
+    )
+    if "error" in complexity:
+        errors.append(f"{file_path}: {complexity['error']}")
+    threshold = python_config.get("complexity_threshold", 10)
+    cognitive_threshold = python_config.get("cognitive_complexity_threshold", 15)
+    comp_list = complexity.get("complexity_data", [])
+    changed = ChangedLines({file_path: ranges} if ranges is not None else None)
+    fingerprints = Fingerprinter(rel_path)
+    for item in comp_list:
+        symbol = f"{item['classname']}.{item.get('name')}" if item.get("classname") else item.get("name")
+        cyclomatic_id = fingerprints.make("high-cyclomatic-complexity", symbol=symbol)
+        cognitive_id = fingerprints.make("high-cognitive-complexity", symbol=symbol)
+        # Functions the diff does not touch are not re-judged
+        if not changed.overlaps(file_path, item.get("lineno", 0), item.get("endline")):
+            continue
+        if item.get("complexity", 0) > threshold and not is_suppressed(item, "high-cyclomatic-complexity"):
+            findings.append(FindingRecord(
+                id=cyclomatic_id,
+                rule_id="high-cyclomatic-complexity",
+                tool="complexity",
+                symbol=symbol,
                 file=file_path,
-                line=lint.get("line", 0),
-                severity=lint.get("severity", "medium"),
-                category="style",
-                title=f"Lint Issue: {lint.get('symbol')}",
-                description=lint.get("message", ""),
+                line=item.get("lineno", 0),
+                end_line=item.get("endline"),
+                severity="high",
+                category="performance",
+                title="High Cyclomatic Complexity",
+                description=f"Function {item.get('name')} has complexity {item.get('complexity')}",
                 auto_fixable=False
             ))
-            
-        # Run AST
-        ast_info = parse_python_ast.invoke({"file_path": file_path})
-        if ast_info.get("status") == "error":
-            state["errors"].append(ast_info.get("error"))
-            
-    state["static_analysis_findings"] = findings
-    state["files_analyzed"] += len(files)
-    state["current_step"] = "static_analysis_complete"
-    return state
-
-def run_pattern_analysis_node(state: CodeReviewState) -> CodeReviewState:
-    """Detect code smells."""
-    files = state.get("target_files", [])
-    findings = []
-    
-    for file_path in files:
-        smells = detect_code_smells.invoke({"file_path": file_path})
-        for smell in smells:
-            findings.append(Finding(
-                id=str(uuid.uuid4()),
+        if (item.get("cognitive_complexity", 0) > cognitive_threshold
+                and not is_suppressed(item, "high-cognitive-complexity")):
+            findings.append(FindingRecord(
+                id=cognitive_id,
+                rule_id="high-cognitive-complexity",
+                tool="complexity",
+                symbol=symbol,
                 file=file_path,
-                line=smell.get("line", 0),
+                line=item.get("lineno", 0),
+                end_line=item.get("endline"),
                 severity="medium",
-                category="pattern",
-                title=smell.get("type").replace("_", " ").title(),
-                description=smell.get("message", ""),
-                auto_fixable=True
+                category="performance",
+                title="High Cognitive Complexity",
+                description=(f"Function {item.get('name')} has cognitive complexity "
+                             f"{item.get('cognitive_complexity')} (nesting depth {item.get('max_nesting')})"),
+                auto_fixable=False
             ))
-            
-    state["pattern_analysis_findings"] = findings
-    state["current_step"] = "pattern_analysis_complete"
-    return state
+    return findings, errors
 
-def run_security_audit_node(state: CodeReviewState) -> CodeReviewState:
-    """Stub for security audit."""
-    state["security_findings"] = []
-    state["current_step"] = "security_audit_complete"
-    return state
-
-def run_performance_analysis_node(state: CodeReviewState) -> CodeReviewState:
+def run_performance_analysis_node(state: CodeReviewState) -> Dict:
     """Check complexity."""
-    files = state.get("target_files", [])
-    findings = []
+    findings, errors = [], []
+    
+    results = map_files(_performance_analysis_file, _python_files(state), _python_config(state),
+                        state.get("cache_enabled", True), jobs=state.get("jobs"))
+    _, known = _collect(state, results, findings, errors)
+                
+    return {
+        "performance_findings": findings,
+        "errors": errors,
+        "baseline_matches": known,
+        "current_step": "performance_analysis_complete"
+    }
+
+def assess_testing_node(state: CodeReviewState) -> Dict:
+    return {"testing_findings": [], "current_step": "testing_assessment_complete"}
+
+def verify_logic_node(state: CodeReviewState) -> Dict:
+    return {"logic_findings": [], "current_step": "logic_verification_complete"}
+
+def verify_policy_node(state: CodeReviewState) -> Dict:
+    """Verify code against local company policies using RAG.
+
+    Files are grouped by language, top-level directory and imported
+    frameworks, and each group makes one retrieval whose sections are
+    reused for all its files. A file gets a finding only where it contains
+    a trigger of one of the retrieved policy sections. Sections with a
+    compiled rule block are enforced by the pattern analysis and skipped.
+    """
+    # One index per process, shared by every file of every review
+    policy = _policy_config(state)
+    rag = get_rag_engine(_standards_dir(state), policy.get("retrieval", "lexical"))
+    compiled = {(spec["source"]["document"], spec["source"]["section"])
+                for spec in get_policy_rules(_standards_dir(state))[0]}
+    frameworks = frozenset(policy.get("frameworks", POLICY_FRAMEWORKS))
+    
+    groups: Dict[Tuple[str, str, Tuple[str, ...]], List[Tuple[str, str, Optional[str]]]] = {}
+    file_hashes = state.get("file_hashes") or {}
+    for file_path in state.get("target_files") or []:
+        source = _read_source(file_path, file_hashes.get(file_path))
+        if source is None:
+            continue
+        rel_path = _rel_path(state, file_path)
+        groups.setdefault(_policy_group(rel_path, source, frameworks), []).append((file_path, rel_path, source))
     
-    for file_path in files:
-        complexity = calculate_cyclomatic_complexity.invoke({"file_path": file_path})
-        comp_list = complexity.get("complexity_data", [])
-        for item in comp_list:
-            if item.get("complexity", 0) > 10:
-                findings.append(Finding(
-                    id=str(uuid.uuid4()),
+    findings = []
+    for (language, directory, imported), members in groups.items():
+        query = " ".join([language, directory.replace("_", " "), *imported])
+        policies = [(hit, triggers) for hit in rag.search(query, k=policy.get("top_k", 5))
+                    if (hit["document"], hit["section"]) not in compiled
+                    and (triggers := policy_triggers(hit["text"]))]
+        for file_path, rel_path, source in members:
+            fingerprints = Fingerprinter(rel_path)
+            for hit, triggers in policies:
+                match = _first_trigger(source, triggers)
+                if match is None:
+                    continue
+                trigger, line = match
+                standard = hit["document"] + (f" > {hit['section']}" if hit["section"] else "")
+                findings.append(FindingRecord(
+                    id=fingerprints.make("local-policy", context=f"{standard}\0{trigger}"),
+                    rule_id="local-policy",
+                    tool="policy",
                     file=file_path,
-                    line=item.get("lineno", 0),
-                    severity="high",
-                    category="performance",
-                    title="High Cyclomatic Complexity",
-                    description=f"Function {item.get('name')} has complexity {item.get('complexity')}",
+                    line=line,
+                    severity="info",
+                    category="policy",
+                    title=f"Policy applies: {hit['section'] or hit['document']}",
+                    description=f"`{trigger}` falls under {standard}:\n{hit['text']}",
                     auto_fixable=False
                 ))
-                
-    state["performance_findings"] = findings
-    state["current_step"] = "performance_analysis_complete"
-    return state
-
-def assess_testing_node(state: CodeReviewState) -> CodeReviewState:
-    state["testing_findings"] = []
-    state["current_step"] = "testing_assessment_complete"
-    return state
-
-def verify_logic_node(state: CodeReviewState) -> CodeReviewState:
-    state["logic_findings"] = []
-    state["current_step"] = "logic_verification_complete"
-    return state
-
-def verify_policy_node(state: CodeReviewState) -> CodeReviewState:
-    """Verify code against local company policies using RAG."""
-    rag = RAGEngine()
-    rag.load_standards()
-    
-    files = state.get("target_files", [])
-    findings = []
-    
-    for file_path in files:
-        # Simulate checking a file against indexed standards
-        policy_context = rag.query_standards(f"Coding standards for {file_path}")
-        # In a real scenario, LLM would analyze code using policy_context
-        findings.append(Finding(
-            id=str(uuid.uuid4()),
-            file=file_path,
-            line=1,
-            severity="info",
-            category="policy",
-            title="Applied Local Policy",
-            description=f"Verified against standard: {policy_context}",
-            auto_fixable=False
-        ))
         
-    state["policy_findings"] = findings
-    state["current_step"] = "policy_verification_complete"
-    return state
+    kept = []
+    known = _emit(state, findings, kept)
+    return {"policy_findings": kept, "baseline_matches": known, "current_step": "policy_verification_complete"}
+
+# Language names added to policy queries, by file extension
+_LANGUAGES = {".py": "python", ".js": "javascript", ".ts": "typescript", ".java": "java", ".go": "go"}
+
+# Imports that select policies; override with `policy.frameworks` in .codeguardian.yml
+POLICY_FRAMEWORKS = frozenset({
+    "django", "flask", "fastapi", "sqlalchemy", "celery", "requests", "boto3", "pandas", "numpy",
+    "pytest", "langchain", "langgraph", "react", "express", "axios"
+})
+
+_IMPORT = re.compile(r"^\s*(?:from|import)\s+([A-Za-z_]\w*)|require\(\s*['\"]([@\w-]+)|from\s+['\"]([@\w-]+)",
+                     re.MULTILINE)
+
+# Bytes inspected for NUL bytes, as git does to tell binary files apart
+_BINARY_SNIFF_BYTES = 8000
+
+def _read_source(file_path: str, known_hash: Optional[str]) -> Optional[str]:
+    """Text of a file through the source cache, or None if it cannot be read as text.
+
+    Binary files are recognized before they reach the cache.
+    """
+    try:
+        with open(file_path, "rb") as f:
+            if b"\0" in f.read(_BINARY_SNIFF_BYTES):
+                return None
+        return source_cache.get(file_path, known_hash).source
+    # tokenize.detect_encoding raises SyntaxError on bad encoding declarations
+    except (OSError, UnicodeDecodeError, SyntaxError, ValueError):
+        return None
+
+def _policy_group(rel_path: str, source: str, frameworks: frozenset) -> Tuple[str, str, Tuple[str, ...]]:
+    """(language, top-level directory, imported frameworks) of a file."""
+    extension = os.path.splitext(rel_path)[1].lower()
+    language = _LANGUAGES.get(extension, extension.lstrip(".") or "text")
+    parts = rel_path.replace("\\", "/").split("/")
+    directory = parts[0] if len(parts) > 1 else ""
+    imported = {name for match in _IMPORT.finditer(source) for name in match.groups() if name}
+    return language, directory, tuple(sorted(imported & frameworks))
 
-def synthesize_findings_node(state: CodeReviewState) -> CodeReviewState:
+def _first_trigger(source: str, triggers: List[str]) -> Optional[Tuple[str, int]]:
+    """Earliest trigger found in ``source`` and its line number."""
+    best = None
+    for trigger in triggers:
+        offset = source.find(trigger)
+        if offset != -1 and (best is None or offset < best[1]):
+            best = (trigger, offset)
+    if best is None:
+        return None
+    return best[0], source.count("\n", 0, best[1]) + 1
+
+def _scope_to_changes(findings: List[Finding], state: CodeReviewState) -> List[Finding]:
+    """Drop, or mark as pre-existing, findings outside the changed lines of a diff review."""
+    changed = ChangedLines(state.get("changed_lines"))
+    if not changed:
+        return findings
+    mark = state.get("config", {}).get("pre_existing_findings", "drop") == "mark"
+    scoped = []
+    for finding in findings:
+        if changed.overlaps(finding.get("file"), finding.get("line") or 0, finding.get("end_line")):
+            scoped.append(finding)
+        elif mark:
+            scoped.append(replace(FindingRecord.from_dict(finding), pre_existing=True))
+    return scoped
+
+def synthesize_findings_node(state: CodeReviewState) -> Dict:
     """Consolidate and prioritize results."""
     all_f = (state.get("static_analysis_findings", []) + 
              state.get("pattern_analysis_findings", []) + 
@@ -187,13 +726,20 @@ def synthesize_findings_node(state: CodeReviewState) -> CodeReviewState:
              state.get("testing_findings", []) +
              state.get("logic_findings", []) +
              state.get("policy_findings", []))
+    if state.get("findings_stream"):
+        all_f += [FindingRecord.from_dict(f) for f in read_findings(state["findings_stream"])]
+    
+    all_f = _scope_to_changes(all_f, state)
+    all_f = [replace(FindingRecord.from_dict(kept), merged_ids=[m.get("id") for m in merged]) if merged else kept
+             for kept, merged in merge_duplicates(all_f)]
     
-    state["all_findings"] = all_f
     # Sort by severity priority (critical > high > medium > low > info)
     severity_map = {"critical": 0, "high": 1, "medium": 2, "low": 3, "info": 4}
-    state["prioritized_issues"] = sorted(all_f, key=lambda x: severity_map.get(x.get("severity", "info"), 5))
-    state["current_step"] = "synthesis_complete"
-    return state
+    return {
+        "all_findings": all_f,
+        "prioritized_issues": sorted(all_f, key=lambda x: severity_map.get(x.get("severity", "info"), 5)),
+        "current_step": "synthesis_complete"
+    }
 
 def validate_python_syntax(code: str) -> bool:
     """Validate if the provided string is valid Python syntax."""
@@ -203,36 +749,90 @@ def validate_python_syntax(code: str) -> bool:
     except SyntaxError:
         return False
 
-def generate_fixes_node(state: CodeReviewState) -> CodeReviewState:
-    """Generate and validate code fixes for identified issues."""
-    state["current_step"] = "generating_fixes"
-    fixable_issues = [f for f in state.get("prioritized_issues", []) if f.get("auto_fixable")]
+FIX_PROMPT = """You are fixing one issue found by a code review.
+
+Issue: {title} ({rule_id}) at {file}:{line}
+{description}
+
+Relevant code (the enclosing symbol, related functions and imports):
+```python
+{context}
+```
+
+Reply with only the corrected code of the enclosing symbol in a single ```python block."""
+
+_CODE_BLOCK = re.compile(r"```(?:python|py)?[ \t]*\n(.*?)```", re.DOTALL)
+
+def _extract_code(reply: str) -> str:
+    """Code of the first fenced block of an LLM reply, or the whole reply."""
+    match = _CODE_BLOCK.search(reply)
+    return (match.group(1) if match else reply).strip("\n")
+
+def generate_fixes_node(state: CodeReviewState) -> Dict:
+    """Generate and validate code fixes for identified issues.
+
+    Each prompt carries only the code around its issue, packed into the
+    ``auto_fix.context_tokens`` budget, and the prompts run concurrently
+    up to the gateway's limit.
+    """
+    fixable_issues = [f for f in state.get("prioritized_issues", [])
+                      if f.get("auto_fixable") and not f.get("pre_existing")]
+    budget = state.get("config", {}).get("auto_fix", {}).get("context_tokens", DEFAULT_CONTEXT_TOKENS)
+    packer = ContextPacker(budget)
     
-    generated_fixes = []
-    for issue in fixable_issues:
-        # Simulate LLM generating a fix
-        # In a real scenario, we would call llm.ainvoke([SystemMessage(...), HumanMessage(...)])
-        mock_fix = f"# Fixed {issue['title']}\ndef fixed_function():\n    pass"
-        
-        # AST Validation
-        if validate_python_syntax(mock_fix):
-            generated_fixes.append({
-                "issue_id": issue["id"],
-                "fix_code": mock_fix,
-                "status": "valid_syntax"
-            })
-        else:
-            state["errors"].append(f"LLM generated invalid syntax for issue {issue['id']}")
+    def fix(issue):
+        context = packer.pack(issue["file"], issue.get("line") or 1, issue.get("end_line"))
+        reply = get_llm_gateway().generate_from_template_sync(FIX_PROMPT, {
+            "title": issue.get("title", ""),
+            "rule_id": issue.get("rule_id", ""),
+            "file": _rel_path(state, issue["file"]),
+            "line": issue.get("line"),
+            "description": issue.get("description", ""),
+            "context": context.text
+        })
+        return context, _extract_code(reply)
+    
+    generated_fixes, errors = [], []
+    if fixable_issues:
+        with ThreadPoolExecutor(max_workers=get_llm_gateway().max_concurrency) as pool:
+            futures = [(issue, pool.submit(fix, issue)) for issue in fixable_issues]
+            for issue, future in futures:
+                try:
+                    context, fix_code = future.result()
+                except Exception as e:
+                    errors.append(f"Fix generation failed for issue {issue['id']}: {e}")
+                    continue
+                # AST Validation
+                if validate_python_syntax(fix_code):
+                    generated_fixes.append({
+                        "issue_id": issue["id"],
+                        "fix_code": fix_code,
+                        "context_tokens": context.tokens,
+                        "status": "valid_syntax"
+                    })
+                else:
+                    errors.append(f"LLM generated invalid syntax for issue {issue['id']}")
             
-    state["generated_fixes"] = generated_fixes
-    state["current_step"] = "fix_generation_complete"
-    return state
+    return {
+        "generated_fixes": generated_fixes,
+        "errors": errors,
+        "current_step": "fix_generation_complete"
+    }
 
-def create_reports_node(state: CodeReviewState) -> CodeReviewState:
+def create_reports_node(state: CodeReviewState) -> Dict:
     """Generate Markdown and JSON reports."""
     from reporters.markdown_reporter import MarkdownReporter
     reporter = MarkdownReporter()
-    state["markdown_report"] = reporter.generate(state.get("prioritized_issues", []))
-    state["json_report"] = {"findings": state.get("prioritized_issues", []), "summary": "Analysis complete"}
-    state["current_step"] = "reporting_complete"
-    return state
+    llm_cache = get_llm_response_cache()
+    return {
+        "markdown_report": reporter.generate(state.get("prioritized_issues", [])),
+        "json_report": {
+            "findings": [f.to_dict() if isinstance(f, FindingRecord) else f
+                         for f in state.get("prioritized_issues", [])],
+            "summary": "Analysis complete",
+            "llm_cache": llm_cache.stats() if llm_cache is not None else None,
+            "rule_timings": state.get("rule_timings", {}),
+            "baseline_matches": state.get("baseline_matches", 0)
+        },
+        "current_step": "reporting_complete"
+    }
@@ -2,16 +2,27 @@
 State definitions for the Code Review Agent.
 """
 
-from typing import TypedDict, List, Dict, Optional, Annotated
+from typing import TypedDict, List, Dict, Optional, Annotated, Any, Iterator, Union
 from langchain_core.messages import BaseMessage
+from dataclasses import dataclass, fields
 import operator
+import sys
+
+
+def latest(current, update):
+    """Reducer keeping the most recent value; lets parallel nodes write the same key."""
+    return update
 
 
 class Finding(TypedDict):
     """Structure for a single finding."""
-    id: str
+    id: str  # Fingerprint: stable across runs (see utils.fingerprint)
+    rule_id: str  # Rule of the reporting tool, e.g. a pylint symbol
+    tool: str  # 'pylint', 'smells', 'complexity', 'policy', ...
+    symbol: str  # Enclosing function or class, dotted
     file: str
     line: int
+    end_line: Optional[int]  # Last line of the construct a finding is about
     column: Optional[int]
     severity: str  # 'critical', 'high', 'medium', 'low', 'info'
     category: str  # 'bug', 'security', 'performance', 'style', etc.
@@ -25,6 +36,82 @@ class Finding(TypedDict):
     references: List[str]
     cwe_id: Optional[str]  # For security issues
     cvss_score: Optional[float]  # For security issues
+    pre_existing: bool  # Outside the changed lines of a diff review
+    merged_ids: List[str]  # Near-duplicates from other tools folded into this one
+
+
+@dataclass(slots=True)
+class FindingRecord:
+    """Compact in-memory form of a Finding.
+
+    Slotted, with the strings repeated across findings (rule, tool, symbol,
+    file, severity, category, title) interned, so a large review holds one
+    copy of each.
+    Unset fields are None and are left out of ``to_dict``, which makes the
+    conversion to and from the Finding dict shape lossless. Records also
+    answer ``get``/``[]``/``in`` like the dicts they replace.
+    """
+    id: Optional[str] = None
+    rule_id: Optional[str] = None
+    tool: Optional[str] = None
+    symbol: Optional[str] = None
+    file: Optional[str] = None
+    line: Optional[int] = None
+    severity: Optional[str] = None
+    category: Optional[str] = None
+    title: Optional[str] = None
+    description: Optional[str] = None
+    auto_fixable: Optional[bool] = None
+    end_line: Optional[int] = None
+    column: Optional[int] = None
+    impact: Optional[str] = None
+    recommendation: Optional[str] = None
+    code_snippet: Optional[str] = None
+    suggested_fix: Optional[str] = None
+    references: Optional[List[str]] = None
+    cwe_id: Optional[str] = None
+    cvss_score: Optional[float] = None
+    pre_existing: Optional[bool] = None
+    merged_ids: Optional[List[str]] = None
+
+    def __post_init__(self):
+        for name in ("rule_id", "tool", "symbol", "file", "severity", "category", "title"):
+            value = getattr(self, name)
+            if type(value) is str:
+                setattr(self, name, sys.intern(value))
+
+    def __reduce__(self):
+        # Rebuild through __init__ so records unpickled from worker
+        # processes are interned again
+        return (FindingRecord, tuple(getattr(self, f) for f in _FINDING_FIELDS))
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = getattr(self, key, None) if key in _FINDING_FIELDS else None
+        return default if value is None else value
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def keys(self) -> Iterator[str]:
+        return (name for name in _FINDING_FIELDS if getattr(self, name) is not None)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.keys()}
+
+    @classmethod
+    def from_dict(cls, finding: Union[Dict, "FindingRecord"]) -> "FindingRecord":
+        if isinstance(finding, cls):
+            return finding
+        return cls(**{k: v for k, v in finding.items() if k in _FINDING_FIELDS})
+
+
+_FINDING_FIELDS = tuple(f.name for f in fields(FindingRecord))
 
 
 class CodeReviewState(TypedDict):
@@ -38,6 +125,10 @@ class CodeReviewState(TypedDict):
     review_scope: str
     target_branch: Optional[str]
     target_files: Optional[List[str]]
+    file_source: str  # 'auto', 'git' or 'walk': how full-scope files are enumerated
+    file_hashes: Dict[str, str]  # Git blob SHA of unmodified in-scope files, by path
+    base_ref: Optional[str]  # Diff scope base; the merge-base with it is diffed
+    changed_lines: Dict[str, List[List[int]]]  # Diff scope: changed [start, end] ranges by path
     
     # Repository metadata
     primary_languages: List[str]
@@ -49,6 +140,10 @@ class CodeReviewState(TypedDict):
     config: Dict
     severity_threshold: str
     auto_fix_enabled: bool
+    cache_enabled: bool  # Reuse persisted per-file analyzer results
+    jobs: Optional[int]  # Worker processes for per-file analysis (default: core count)
+    findings_stream: Optional[str]  # JSONL file findings are streamed to instead of state
+    baseline_path: Optional[str]  # Fingerprints of known findings to leave out
     
     # Analysis results (accumulated across nodes)
     static_analysis_findings: Annotated[List[Finding], operator.add]
@@ -58,6 +153,8 @@ class CodeReviewState(TypedDict):
     testing_findings: Annotated[List[Finding], operator.add]
     logic_findings: Annotated[List[Finding], operator.add]
     policy_findings: Annotated[List[Finding], operator.add]
+    rule_timings: Dict[str, float]  # Seconds spent per smell rule on cache misses
+    baseline_matches: Annotated[int, operator.add]  # Known findings dropped by the baseline
     
     # Synthesized results
     all_findings: List[Finding]
@@ -75,7 +172,7 @@ class CodeReviewState(TypedDict):
     
     # Conversation
     messages: Annotated[List[BaseMessage], operator.add]
-    current_step: str
+    current_step: Annotated[str, latest]
     errors: Annotated[List[str], operator.add]
     
     # Progress tracking
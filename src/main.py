@@ -3,6 +3,7 @@
 Code Review and Debugging Agent - Main Entry Point
 """
 
+from typing import Optional
 import asyncio
 import click
 from dotenv import load_dotenv
@@ -10,14 +11,15 @@ from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn
 import os
 import sys
+import time
+import uuid
 
 # Add src to python path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-from agents.graph import app
-from agents.state import CodeReviewState
 from utils.logger import setup_logger
 from utils.config_loader import load_config
+from utils.findings_stream import get_findings_sink
 
 # Load environment variables
 load_dotenv()
@@ -25,6 +27,34 @@ load_dotenv()
 console = Console()
 logger = setup_logger(__name__)
 
+# LangGraph and the analyzers are imported, and the graph compiled, only
+# when a command actually runs a review; see get_app()
+_checkpointer = None
+_app = None
+
+
+def get_checkpointer():
+    """On-disk checkpointer, so an interrupted or paused review can be resumed."""
+    global _checkpointer
+    if _checkpointer is None:
+        from utils.checkpointer import SQLiteCheckpointSaver
+        _checkpointer = SQLiteCheckpointSaver()
+    return _checkpointer
+
+
+def get_app():
+    """The review graph, compiled on first use."""
+    global _app
+    if _app is None:
+        from agents.graph import create_code_review_graph
+        _app = create_code_review_graph(get_checkpointer())
+    return _app
+
+
+def new_thread_id(prefix: str) -> str:
+    """Unique checkpoint thread for one run."""
+    return f"{prefix}-{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
 
 @click.group()
 def cli():
@@ -33,11 +63,14 @@ def cli():
 
 
 @cli.command()
-@click.argument('repository_url')
+@click.argument('repository_url', required=False)
 @click.option('--scope', default='full', 
               type=click.Choice(['full', 'branch', 'files', 'diff', 'security_only', 'performance_only']),
               help='Analysis scope')
 @click.option('--branch', default=None, help='Target branch for analysis')
+@click.option('--base-ref', default=None,
+              help='Diff scope: review changes since the merge-base with this ref '
+                   '(default: --branch, then origin/HEAD, main or master)')
 @click.option('--files', default=None, help='Comma-separated list of files to analyze')
 @click.option('--auto-fix/--no-auto-fix', default=True, help='Enable automatic fixes')
 @click.option('--severity', default='medium',
@@ -47,23 +80,53 @@ def cli():
 @click.option('--format', default='markdown',
               type=click.Choice(['markdown', 'json', 'html', 'all']),
               help='Report format')
-def review(repository_url, scope, branch, files, auto_fix, severity, output, format):
+@click.option('--no-cache', is_flag=True, default=False,
+              help='Recompute every analyzer result instead of reusing cached ones')
+@click.option('--jobs', '-j', default=None, type=click.IntRange(min=1),
+              help='Worker processes for per-file analysis (default: number of cores)')
+@click.option('--file-source', default='auto', type=click.Choice(['auto', 'git', 'walk']),
+              help='List files from the git index (git), the filesystem (walk), '
+                   'or git when available (auto)')
+@click.option('--baseline', 'baseline_path', default=None, type=click.Path(exists=True, dir_okay=False),
+              help='Baseline file of known findings to leave out (see the baseline command)')
+@click.option('--resume', 'resume_thread', default=None, metavar='THREAD_ID',
+              help='Continue an interrupted or paused review from its last completed step')
+def review(repository_url, scope, branch, base_ref, files, auto_fix, severity, output, format, no_cache,
+           jobs, file_source, baseline_path, resume_thread):
     """
     Review a code repository.
     """
+    if resume_thread:
+        console.print(f"[bold blue]Resuming review:[/bold blue] {resume_thread}")
+        asyncio.run(run_analysis(None, output, format, resume_thread))
+        return
+    if not repository_url:
+        raise click.UsageError("Missing argument 'REPOSITORY_URL' (or pass --resume THREAD_ID)")
+    
     console.print(f"[bold blue]Starting code review for:[/bold blue] {repository_url}")
     
     # Prepare initial state
     target_files = files.split(',') if files else None
     
+    # Findings are appended here as each file finishes, so even an
+    # interrupted run leaves its partial results behind
+    findings_stream = os.path.join(output, 'findings.jsonl')
+    get_findings_sink(findings_stream).reset()
+    
     initial_state = {
         "repository_url": repository_url,
         "local_path": "",
         "review_scope": scope,
         "target_branch": branch,
+        "base_ref": base_ref,
         "target_files": target_files,
+        "file_source": file_source,
         "severity_threshold": severity,
         "auto_fix_enabled": auto_fix,
+        "cache_enabled": not no_cache,
+        "jobs": jobs,
+        "findings_stream": findings_stream,
+        "baseline_path": baseline_path,
         "messages": [],
         "errors": [],
         "static_analysis_findings": [],
@@ -88,15 +151,31 @@ def review(repository_url, scope, branch, files, auto_fix, severity, output, for
     }
     
     # Run analysis
-    asyncio.run(run_analysis(initial_state, output, format))
+    asyncio.run(run_analysis(initial_state, output, format, new_thread_id("review")))
 
 
-async def run_analysis(initial_state: dict, output_dir: str, report_format: str):
-    """Execute the code review analysis."""
-    
-    # app is the compiled graph from graph.py
+async def run_analysis(initial_state: Optional[dict], output_dir: str, report_format: str, thread_id: str):
+    """
+    Execute the code review analysis.
     
-    config = {"configurable": {"thread_id": "review-session"}}
+    With ``initial_state`` None, the thread's checkpoint is resumed instead:
+    nodes that already completed are not run again.
+    """
+    config = {"configurable": {"thread_id": thread_id}}
+    app = get_app()
+    if initial_state is None:
+        snapshot = await app.aget_state(config)
+        if not snapshot.values:
+            console.print(f"[red]No saved review named[/red] {thread_id}")
+            return
+        stream_state = snapshot.values
+        # The interrupted node runs again and re-emits what it already streamed
+        sink = get_findings_sink(stream_state.get("findings_stream"))
+        if sink is not None:
+            sink.resume()
+    else:
+        console.print(f"Review thread: [bold]{thread_id}[/bold]")
+        stream_state = initial_state
     
     with Progress(
         SpinnerColumn(),
@@ -105,20 +184,24 @@ async def run_analysis(initial_state: dict, output_dir: str, report_format: str)
     ) as progress:
         
         analysis_task = progress.add_task("[cyan]Analyzing repository...", total=None)
+        findings_task = progress.add_task("[magenta]Findings: 0", total=None)
+        sink = get_findings_sink(stream_state.get("findings_stream"))
+        if sink is not None:
+            sink.subscribe(lambda total: progress.update(findings_task, description=f"[magenta]Findings: {total}"))
+            progress.update(findings_task, description=f"[magenta]Findings: {sink.count}")
         
         try:
-            final_state = initial_state
             async for event in app.astream(initial_state, config):
-                # The event in astream is usually a dict {node_name: state_delta}
-                # But here we assume a simpler streaming or standard invoke result
-                # For simplicity in this demo, we'll just track the current step
+                # Each event is {node_name: state_delta}; only track the current step here
                 if isinstance(event, dict):
                     for node, state in event.items():
-                        if "current_step" in state:
+                        if isinstance(state, dict) and "current_step" in state:
                             current_step = state["current_step"]
                             progress.update(analysis_task, description=f"[cyan]{current_step.replace('_', ' ').title()}")
-                        final_state.update(state)
-                
+            
+            # The checkpoint holds the merged state, including any resumed part
+            snapshot = await app.aget_state(config)
+            final_state = snapshot.values
             progress.update(analysis_task, description="[green]Analysis complete!")
             
             # Display summary
@@ -127,8 +210,15 @@ async def run_analysis(initial_state: dict, output_dir: str, report_format: str)
             # Save reports
             save_reports(final_state, output_dir, report_format)
             
+            if snapshot.next:
+                console.print(f"\n[yellow]Paused before {', '.join(snapshot.next)}.[/yellow] "
+                              f"Continue with: [bold]review --resume {thread_id}[/bold]")
+            else:
+                get_checkpointer().delete_thread(thread_id)
+            
         except Exception as e:
             console.print(f"[red]Error during analysis:[/red] {str(e)}")
+            console.print(f"Continue from the last completed step with: [bold]review --resume {thread_id}[/bold]")
             logger.error(f"Analysis failed: {e}", exc_info=True)
 
 
@@ -174,6 +264,9 @@ def save_reports(state: dict, output_dir: str, report_format: str):
     """Save analysis reports."""
     os.makedirs(output_dir, exist_ok=True)
     
+    if state.get("findings_stream"):
+        console.print(f"\n✓ Findings streamed to: [blue]{state['findings_stream']}[/blue]")
+    
     if report_format in ['markdown', 'all']:
         markdown_path = os.path.join(output_dir, 'code_review_report.md')
         with open(markdown_path, 'w') as f:
@@ -190,6 +283,46 @@ def save_reports(state: dict, output_dir: str, report_format: str):
     console.print("\n[bold green]Analysis complete! 🎉[/bold green]")
 
 
+@cli.command()
+@click.argument('repository_url')
+@click.option('--output', default='.codeguardian-baseline', help='Baseline file to write')
+@click.option('--no-cache', is_flag=True, default=False,
+              help='Recompute every analyzer result instead of reusing cached ones')
+@click.option('--jobs', '-j', default=None, type=click.IntRange(min=1),
+              help='Worker processes for per-file analysis (default: number of cores)')
+def baseline(repository_url, output, no_cache, jobs):
+    """
+    Record the current findings so later reviews only report new ones.
+    """
+    from utils.baseline import save_baseline
+    
+    console.print(f"[bold blue]Recording baseline for:[/bold blue] {repository_url}")
+    initial_state = {
+        "repository_url": repository_url,
+        "local_path": "",
+        "review_scope": "full",
+        "auto_fix_enabled": False,
+        "cache_enabled": not no_cache,
+        "jobs": jobs,
+        "errors": [],
+        "current_step": "started"
+    }
+    thread_id = new_thread_id("baseline")
+    config = {"configurable": {"thread_id": thread_id}}
+    
+    with console.status("[cyan]Analyzing repository..."):
+        final_state = asyncio.run(get_app().ainvoke(initial_state, config))
+    get_checkpointer().delete_thread(thread_id)
+    
+    fingerprints = []
+    for finding in final_state.get("all_findings", []):
+        fingerprints.append(finding.get("id"))
+        # Duplicates merged into a finding are known as well
+        fingerprints.extend(finding.get("merged_ids") or [])
+    count = save_baseline(output, fingerprints)
+    console.print(f"[green]✓ Baseline of {count} findings saved to:[/green] [blue]{output}[/blue]")
+
+
 @cli.command()
 @click.argument('config_file')
 def validate_config(config_file):
@@ -204,6 +337,59 @@ def validate_config(config_file):
         console.print(f"[red]✗ Configuration error:[/red] {str(e)}")
 
 
+@cli.group()
+def cache():
+    """Manage the persistent analyzer result and LLM response caches."""
+    pass
+
+
+def _caches():
+    from utils.result_cache import ResultCache
+    from utils.llm_cache import LLMResponseCache
+    return {"Analyzer results": ResultCache(), "LLM responses": LLMResponseCache()}
+
+
+@cache.command()
+@click.option('--max-size', default=None, type=int,
+              help='Size limit in MB (defaults to CACHE_MAX_SIZE_MB)')
+def prune(max_size):
+    """Evict expired and least recently used entries until each cache fits its size limit."""
+    limit = None if max_size is None else max_size * 1024 * 1024
+    for name, store in _caches().items():
+        evicted = store.prune_expired() if hasattr(store, "prune_expired") else 0
+        evicted += store.prune(limit)
+        stats = store.stats()
+        console.print(f"[green]✓ {name}: evicted {evicted} entries[/green]")
+        console.print(f"  Cache now holds {stats['entries']} entries ({stats['bytes'] / 1024 / 1024:.1f} MB)")
+
+
+@cache.command()
+def clear():
+    """Remove every cached analyzer result and LLM response."""
+    for store in _caches().values():
+        store.clear()
+    console.print("[green]✓ Cache cleared[/green]")
+
+
+@cache.command()
+def stats():
+    """Show the size of each cache."""
+    for name, store in _caches().items():
+        stats = store.stats()
+        console.print(f"{name}: {stats['entries']} entries ({stats['bytes'] / 1024 / 1024:.1f} MB)")
+
+
+@cli.command()
+def reviews():
+    """List paused or interrupted reviews that can be resumed."""
+    thread_ids = get_checkpointer().thread_ids()
+    if not thread_ids:
+        console.print("No resumable reviews")
+        return
+    for thread_id in thread_ids:
+        console.print(f"{thread_id}  (review --resume {thread_id})")
+
+
 @cli.command()
 def version():
     """Display version information."""
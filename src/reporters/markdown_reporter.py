@@ -12,7 +12,8 @@ class MarkdownReporter:
             return report
         
         for finding in findings:
-            report += f"## {finding.get('title', 'Issue')}\n"
+            suffix = " (pre-existing)" if finding.get("pre_existing") else ""
+            report += f"## {finding.get('title', 'Issue')}{suffix}\n"
             report += f"- **Severity**: {finding.get('severity', 'Info')}\n"
             report += f"- **File**: {finding.get('file', 'N/A')}\n"
             report += f"- **Description**: {finding.get('description', '')}\n\n"
@@ -0,0 +1,122 @@
+"""
+Long-lived in-process bandit worker.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+import io
+import threading
+import tokenize
+from utils.source_cache import source_cache
+
+_LEVELS = ("info", "low", "medium", "high", "critical")
+
+
+def map_severity(severity: str, confidence: str) -> str:
+    """
+    Finding severity of a bandit issue.
+
+    Bandit's LOW/MEDIUM/HIGH map to low/medium/high; high-confidence HIGH
+    issues become critical and low-confidence ones drop one level.
+    """
+    level = _LEVELS.index(severity.lower()) if severity.lower() in _LEVELS else 2
+    if confidence == "HIGH" and severity == "HIGH":
+        level += 1
+    elif confidence == "LOW":
+        level -= 1
+    return _LEVELS[max(0, min(level, len(_LEVELS) - 1))]
+
+
+class BanditWorker:
+    """Runs bandit's checks through its Python API on already parsed files.
+
+    Plugin discovery and test-set construction happen once per process.
+    Each file is checked against the AST and token stream held by the
+    source cache, so bandit neither re-reads nor re-parses it. That relies
+    on bandit internals (the node visitor and nosec parsing), which are
+    only known to work with the versions pinned in requirements.txt; when
+    they are missing the worker falls back to bandit's public manager API,
+    which reads and parses the file itself.
+    """
+
+    def __init__(self, skips: Sequence[str] = ()):
+        self.skips = list(skips)
+        self._test_set = None
+        self._lock = threading.Lock()
+
+    def _profile(self) -> Dict:
+        return {"exclude": self.skips} if self.skips else {}
+
+    def scan(self, file_path: str) -> List[Dict]:
+        """
+        Check one Python file.
+
+        Args:
+            file_path: Path of the file
+
+        Returns:
+            List of security issues, with bandit's ``# nosec`` comments honored
+        """
+        from bandit.core import manager as b_manager
+        from bandit.core import node_visitor
+
+        parse_nosec = getattr(b_manager, "_parse_nosec_comment", None)
+        if parse_nosec is None or not hasattr(node_visitor.BanditNodeVisitor, "generic_visit"):
+            return self._scan_public(file_path)
+
+        from bandit.core import config as b_config
+        from bandit.core import meta_ast, metrics, test_set
+        parsed = source_cache.get(file_path)
+        nosec_lines = {token.start[0]: parse_nosec(token.string)
+                       for token in parsed.tokens if token.type == tokenize.COMMENT}
+        with self._lock:
+            if self._test_set is None:
+                self._test_set = test_set.BanditTestSet(b_config.BanditConfig(), self._profile())
+            # Fresh metrics per file, so nothing accumulates over the worker's life
+            file_metrics = metrics.Metrics()
+            file_metrics.begin(file_path)
+            visitor = node_visitor.BanditNodeVisitor(
+                file_path, io.BytesIO(parsed.data), meta_ast.BanditMetaAst(), self._test_set, False,
+                nosec_lines, file_metrics
+            )
+            # BanditNodeVisitor.process without its own ast.parse
+            visitor.generic_visit(parsed.tree)
+            visitor.context = {"file_data": visitor.fdata, "filename": file_path, "lineno": 0,
+                               "linerange": [0, 1], "col_offset": 0}
+            visitor.update_scores(visitor.tester.run_tests(visitor.context, "File"))
+            return [_issue_dict(file_path, issue) for issue in visitor.tester.results]
+
+    def _scan_public(self, file_path: str) -> List[Dict]:
+        from bandit.core import config as b_config
+        from bandit.core import manager as b_manager
+        manager = b_manager.BanditManager(b_config.BanditConfig(), "file", profile=self._profile())
+        manager.discover_files([file_path])
+        manager.run_tests()
+        return [_issue_dict(file_path, issue) for issue in manager.get_issue_list()]
+
+
+def _issue_dict(file_path: str, issue) -> Dict:
+    return {
+        "file": file_path,
+        "line": issue.lineno,
+        "end_line": max(issue.linerange) if issue.linerange else issue.lineno,
+        "column": issue.col_offset,
+        "test_id": issue.test_id,
+        "test_name": issue.test,
+        "severity": map_severity(issue.severity, issue.confidence),
+        "confidence": issue.confidence,
+        "cwe": issue.cwe.id or None,
+        "message": issue.text
+    }
+
+
+_workers: Dict[Tuple[str, ...], BanditWorker] = {}
+_workers_lock = threading.Lock()
+
+
+def get_bandit_worker(skips: Optional[Sequence[str]] = None) -> BanditWorker:
+    """Process-wide worker for the given skipped tests, created on first use."""
+    key = tuple(sorted(skips or ()))
+    with _workers_lock:
+        if key not in _workers:
+            _workers[key] = BanditWorker(key)
+        return _workers[key]
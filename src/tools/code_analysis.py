@@ -3,11 +3,16 @@ Code analysis tools for static analysis and linting.
 """
 
 from langchain_core.tools import tool
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import ast
-import subprocess
-import json
-from pathlib import Path
+from utils.source_cache import source_cache
+from tools.lint_worker import get_pylint_worker
+from tools.complexity import analyze_complexity
+from tools.smell_rules import RuleEngine
+from tools.policy_rules import compile_policy_rules
+
+# Bump whenever detect_code_smells changes what it reports
+SMELL_DETECTOR_VERSION = "5"
 
 
 @tool
@@ -22,17 +27,15 @@ def parse_python_ast(file_path: str) -> Dict:
         Dict with AST information and statistics
     """
     try:
-        with open(file_path, 'r') as f:
-            source_code = f.read()
-        
-        tree = ast.parse(source_code, filename=file_path)
+        parsed = source_cache.get(file_path)
+        tree = parsed.tree
         
         # Collect statistics
         stats = {
             "functions": [],
             "classes": [],
             "imports": [],
-            "total_lines": len(source_code.split('\n'))
+            "total_lines": len(parsed.lines)
         }
         
         for node in ast.walk(tree):
@@ -76,46 +79,43 @@ def parse_python_ast(file_path: str) -> Dict:
 
 
 @tool
-def run_pylint(file_path: str) -> List[Dict]:
+def run_pylint(file_path: str, max_line_length: Optional[int] = None) -> List[Dict]:
     """
     Run pylint on Python file.
     
     Args:
         file_path: Path to Python file
+        max_line_length: Override for pylint's line length limit
         
     Returns:
         List of linting issues
     """
-    try:
-        result = subprocess.run(
-            ['pylint', '--output-format=json', file_path],
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
+    return lint_python_files([file_path], max_line_length)[file_path]
+
+
+def lint_python_files(file_paths: List[str], max_line_length: Optional[int] = None) -> Dict[str, List[Dict]]:
+    """
+    Run pylint on a batch of Python files in one pass.
+    
+    Args:
+        file_paths: Paths to Python files
+        max_line_length: Override for pylint's line length limit
         
-        if result.stdout:
-            issues = json.loads(result.stdout)
-            return [{
-                "file": issue.get("path"),
-                "line": issue.get("line"),
-                "column": issue.get("column"),
-                "severity": issue.get("type"),  # convention, refactor, warning, error
-                "message": issue.get("message"),
-                "message_id": issue.get("message-id"),
-                "symbol": issue.get("symbol")
-            } for issue in issues]
-        return []
-    except subprocess.TimeoutExpired:
-        return [{"error": "Pylint timeout"}]
-    except Exception as e:
-        return [{"error": str(e)}]
+    Returns:
+        Mapping of each path to its linting issues; when pylint fails, every
+        path maps to a single error entry
+    """
+    try:
+        results = get_pylint_worker(max_line_length).lint(file_paths)
+        return {path: results.get(path, []) for path in file_paths}
+    except (Exception, SystemExit) as e:
+        return {path: [{"error": f"Pylint failed: {e}"}] for path in file_paths}
 
 
 @tool
 def calculate_cyclomatic_complexity(file_path: str) -> Dict:
     """
-    Calculate cyclomatic complexity using radon.
+    Calculate cyclomatic and cognitive complexity of every function and class.
     
     Args:
         file_path: Path to Python file
@@ -124,92 +124,49 @@ def calculate_cyclomatic_complexity(file_path: str) -> Dict:
         Dict with complexity metrics
     """
     try:
-        result = subprocess.run(
-            ['radon', 'cc', file_path, '-j'],
-            capture_output=True,
-            text=True,
-            timeout=10
-        )
-        
-        if result.stdout:
-            data = json.loads(result.stdout)
-            return {
-                "file": file_path,
-                "complexity_data": data.get(file_path, [])
-            }
-        return {"file": file_path, "complexity_data": []}
+        tree = source_cache.get(file_path).tree
+        return {
+            "file": file_path,
+            "complexity_data": analyze_complexity(tree)
+        }
     except Exception as e:
         return {"error": str(e)}
 
 
+def find_code_smells(file_path: str, config: Optional[Dict] = None,
+                     policy_rules: Optional[List[Dict]] = None) -> Tuple[List[Dict], Dict[str, float]]:
+    """
+    Run every registered smell rule over a file in one traversal.
+    
+    Args:
+        file_path: Path to Python file
+        config: ``performance`` section of .codeguardian.yml (rule thresholds)
+        policy_rules: Compiled policy specs (see tools.policy_rules) run in the same pass
+        
+    Returns:
+        Detected smells and the seconds spent in each rule
+    """
+    parsed = source_cache.get(file_path)
+    engine = RuleEngine.from_config(config)
+    if policy_rules:
+        engine = RuleEngine(engine.rules + compile_policy_rules(policy_rules, config))
+    smells = engine.run(parsed)
+    return smells, engine.timings
+
+
 @tool
-def detect_code_smells(file_path: str) -> List[Dict]:
+def detect_code_smells(file_path: str, config: Optional[Dict] = None) -> List[Dict]:
     """
-    Detect code smells using various heuristics.
+    Detect code smells using the registered smell rules.
     
     Args:
         file_path: Path to Python file
+        config: ``performance`` section of .codeguardian.yml (rule thresholds)
         
     Returns:
         List of detected code smells
     """
-    smells = []
-    
     try:
-        with open(file_path, 'r') as f:
-            content = f.read()
-            lines = content.split('\n')
-        
-        tree = ast.parse(content, filename=file_path)
-        
-        # Detect long functions (>50 lines)
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef):
-                # Calculate function length
-                if hasattr(node, 'end_lineno') and hasattr(node, 'lineno'):
-                    length = node.end_lineno - node.lineno
-                    if length > 50:
-                        smells.append({
-                            "type": "long_function",
-                            "line": node.lineno,
-                            "function": node.name,
-                            "length": length,
-                            "message": f"Function '{node.name}' is {length} lines long (>50)"
-                        })
-                
-                # Detect too many parameters (>5)
-                param_count = len(node.args.args)
-                if param_count > 5:
-                    smells.append({
-                        "type": "too_many_parameters",
-                        "line": node.lineno,
-                        "function": node.name,
-                        "parameter_count": param_count,
-                        "message": f"Function '{node.name}' has {param_count} parameters (>5)"
-                    })
-            
-            # Detect large classes (>500 lines)
-            elif isinstance(node, ast.ClassDef):
-                if hasattr(node, 'end_lineno') and hasattr(node, 'lineno'):
-                    length = node.end_lineno - node.lineno
-                    if length > 500:
-                        smells.append({
-                            "type": "god_class",
-                            "line": node.lineno,
-                            "class": node.name,
-                            "length": length,
-                            "message": f"Class '{node.name}' is {length} lines long (>500)"
-                        })
-        
-        # Detect magic numbers
-        for i, line in enumerate(lines, 1):
-            if any(num in line for num in ['1000', '100', '86400', '3600']):
-                smells.append({
-                    "type": "magic_number",
-                    "line": i,
-                    "message": "Potential magic number detected"
-                })
-        
-        return smells
+        return find_code_smells(file_path, config)[0]
     except Exception as e:
         return [{"error": str(e)}]
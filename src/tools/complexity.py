@@ -0,0 +1,221 @@
+"""
+In-process complexity engine: cyclomatic, cognitive and nesting depth.
+
+Cyclomatic complexity follows radon's rules so the numbers match
+``radon cc``. Cognitive complexity follows the SonarSource definition:
+control flow breaks cost one point plus the current nesting level.
+Everything is computed in a single pass over an already parsed AST.
+"""
+
+from typing import Dict, List, Optional
+import ast
+import math
+
+# Bump whenever the engine changes the numbers it reports
+COMPLEXITY_ENGINE_VERSION = "1"
+
+# Statements that open a new level for the structural nesting depth
+_TRY_BLOCKS = (ast.Try,) + ((ast.TryStar,) if hasattr(ast, "TryStar") else ())
+_NESTING_BLOCKS = (ast.If, ast.For, ast.AsyncFor, ast.While, ast.With,
+                   ast.AsyncWith, ast.Match) + _TRY_BLOCKS
+_FUNCTIONS = (ast.FunctionDef, ast.AsyncFunctionDef)
+
+
+def cc_rank(complexity: int) -> str:
+    """Letter rank A-F for a cyclomatic complexity score, as radon computes it."""
+    return chr(min(int(math.ceil(complexity / 10.0) or 1) - (1, 0)[5 - complexity < 0], 5) + 65)
+
+
+class _Frame:
+    """Accumulator for the block (module, class or function) being visited."""
+
+    def __init__(self, kind: str, name: Optional[str] = None, classname: Optional[str] = None):
+        self.kind = kind
+        self.name = name
+        self.classname = classname
+        self.complexity = 1 if kind != "module" else 0
+        self.cognitive = 0
+        self.max_nesting = 0
+        self.functions: List[Dict] = []
+        self.classes: List[Dict] = []
+
+
+class ComplexityEngine:
+    """Computes per-function and per-class complexity metrics of a module."""
+
+    def analyze(self, tree: ast.Module) -> List[Dict]:
+        """
+        Score every function, method and class of a parsed module.
+
+        Args:
+            tree: Parsed module
+
+        Returns:
+            Blocks in the shape of ``radon cc -j``, highest complexity first.
+            Functions and methods also carry ``cognitive_complexity`` and
+            ``max_nesting``; nested functions are listed under ``closures``.
+        """
+        module = _Frame("module")
+        for stmt in tree.body:
+            self._walk(stmt, module, 0, 0)
+
+        blocks = list(module.functions)
+        for cls in module.classes:
+            blocks.append(cls)
+            blocks.extend(cls["methods"])
+        return sorted(blocks, key=lambda block: -block["complexity"])
+
+    def _function(self, node: ast.AST, frame: _Frame) -> Dict:
+        is_method = frame.kind == "class"
+        inner = _Frame("function", node.name, frame.name if is_method else None)
+        for stmt in node.body:
+            self._walk(stmt, inner, 0, 0)
+
+        block = {
+            "type": "method" if is_method else "function",
+            "rank": cc_rank(inner.complexity),
+            "name": node.name,
+            "lineno": node.lineno,
+            "col_offset": node.col_offset,
+            "endline": node.end_lineno,
+            "complexity": inner.complexity,
+            "cognitive_complexity": inner.cognitive,
+            "max_nesting": inner.max_nesting,
+            "closures": inner.functions
+        }
+        if is_method:
+            block["classname"] = inner.classname
+        return block
+
+    def _class(self, node: ast.ClassDef) -> Dict:
+        inner = _Frame("class", node.name)
+        for stmt in node.body:
+            self._walk(stmt, inner, 0, 0)
+
+        methods = inner.functions
+        # radon reports a class as the average of its methods, plus one
+        # when it has more than one
+        real = inner.complexity + sum(m["complexity"] for m in methods)
+        complexity = int(real / float(len(methods))) + (len(methods) > 1) if methods else real
+        return {
+            "type": "class",
+            "rank": cc_rank(complexity),
+            "name": node.name,
+            "lineno": node.lineno,
+            "col_offset": node.col_offset,
+            "endline": node.end_lineno,
+            "complexity": complexity,
+            "methods": methods
+        }
+
+    def _walk(self, node: ast.AST, frame: _Frame, nesting: int, depth: int):
+        """Visit ``node`` inside ``frame``.
+
+        ``nesting`` is the cognitive-complexity nesting level; ``depth`` is
+        the structural depth of nested control flow blocks.
+        """
+        if isinstance(node, _FUNCTIONS):
+            # Top-level functions, methods or closures depending on the frame
+            frame.functions.append(self._function(node, frame))
+            return
+        if isinstance(node, ast.ClassDef):
+            # radon ignores classes nested in functions or other classes
+            if frame.kind == "module":
+                frame.classes.append(self._class(node))
+            return
+        if isinstance(node, ast.Assert):
+            frame.complexity += 1
+            return
+
+        if isinstance(node, _NESTING_BLOCKS):
+            depth += 1
+            frame.max_nesting = max(frame.max_nesting, depth)
+
+        if isinstance(node, ast.If):
+            self._if(node, frame, nesting, depth, is_elif=False)
+            return
+        if isinstance(node, (ast.For, ast.AsyncFor, ast.While)):
+            frame.complexity += 1 + bool(node.orelse)
+            frame.cognitive += 1 + nesting
+            for child in ([node.target, node.iter] if not isinstance(node, ast.While) else [node.test]):
+                self._walk(child, frame, nesting, depth)
+            self._walk_all(node.body, frame, nesting + 1, depth)
+            self._walk_all(node.orelse, frame, nesting + 1, depth)
+            return
+        if isinstance(node, _TRY_BLOCKS):
+            # radon only counts handlers of plain try statements
+            if isinstance(node, ast.Try):
+                frame.complexity += len(node.handlers) + bool(node.orelse)
+            self._walk_all(node.body, frame, nesting, depth)
+            for handler in node.handlers:
+                frame.cognitive += 1 + nesting
+                if handler.type is not None:
+                    self._walk(handler.type, frame, nesting, depth)
+                self._walk_all(handler.body, frame, nesting + 1, depth)
+            self._walk_all(node.orelse, frame, nesting, depth)
+            self._walk_all(node.finalbody, frame, nesting, depth)
+            return
+        if isinstance(node, ast.Match):
+            wildcard = any(getattr(case.pattern, "pattern", False) is None for case in node.cases)
+            frame.complexity += max(0, len(node.cases) - wildcard)
+            frame.cognitive += 1 + nesting
+            self._walk(node.subject, frame, nesting, depth)
+            for case in node.cases:
+                self._walk(case.pattern, frame, nesting, depth)
+                if case.guard is not None:
+                    self._walk(case.guard, frame, nesting + 1, depth)
+                self._walk_all(case.body, frame, nesting + 1, depth)
+            return
+        if isinstance(node, ast.IfExp):
+            frame.complexity += 1
+            frame.cognitive += 1 + nesting
+            self._walk_children(node, frame, nesting + 1, depth)
+            return
+        if isinstance(node, ast.Lambda):
+            self._walk_children(node, frame, nesting + 1, depth)
+            return
+
+        if isinstance(node, ast.BoolOp):
+            frame.complexity += len(node.values) - 1
+            frame.cognitive += 1
+        elif isinstance(node, ast.comprehension):
+            frame.complexity += len(node.ifs) + 1
+        elif isinstance(node, ast.Call) and frame.kind == "function" and self._is_recursive(node, frame):
+            frame.cognitive += 1
+        self._walk_children(node, frame, nesting, depth)
+
+    def _if(self, node: ast.If, frame: _Frame, nesting: int, depth: int, is_elif: bool):
+        frame.complexity += 1
+        # elif and else cost one point but no nesting penalty
+        frame.cognitive += 1 if is_elif else 1 + nesting
+        self._walk(node.test, frame, nesting, depth)
+        self._walk_all(node.body, frame, nesting + 1, depth)
+
+        orelse = node.orelse
+        if len(orelse) == 1 and isinstance(orelse[0], ast.If) and orelse[0].col_offset == node.col_offset:
+            self._if(orelse[0], frame, nesting, depth, is_elif=True)
+        elif orelse:
+            frame.cognitive += 1
+            self._walk_all(orelse, frame, nesting + 1, depth)
+
+    def _walk_all(self, nodes: List[ast.AST], frame: _Frame, nesting: int, depth: int):
+        for child in nodes:
+            self._walk(child, frame, nesting, depth)
+
+    def _walk_children(self, node: ast.AST, frame: _Frame, nesting: int, depth: int):
+        for child in ast.iter_child_nodes(node):
+            self._walk(child, frame, nesting, depth)
+
+    @staticmethod
+    def _is_recursive(call: ast.Call, frame: _Frame) -> bool:
+        func = call.func
+        if isinstance(func, ast.Name):
+            return func.id == frame.name
+        if isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name):
+            return func.attr == frame.name and func.value.id in ("self", "cls")
+        return False
+
+
+def analyze_complexity(tree: ast.Module) -> List[Dict]:
+    """Complexity blocks for a parsed module; see ComplexityEngine.analyze."""
+    return ComplexityEngine().analyze(tree)
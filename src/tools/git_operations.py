@@ -3,10 +3,11 @@ Git operation tools for repository analysis.
 """
 
 from langchain_core.tools import tool
-from git import Repo, GitCommandError
+from git import Repo, GitCommandError, InvalidGitRepositoryError, NoSuchPathError
 from typing import List, Dict, Optional
 import os
 import shutil
+from utils.diff_scope import parse_unified_diff
 
 
 @tool
@@ -99,6 +100,144 @@ def get_changed_files(repo_path: str, commit_range: str = "HEAD~10..HEAD") -> Li
         return []
 
 
+# Tried in order when neither a base ref nor a target branch is given
+DEFAULT_BASE_REFS = ("origin/HEAD", "origin/main", "origin/master", "main", "master")
+
+
+def _path_prefix(repo: Repo, repo_path: str) -> str:
+    """'sub/dir/' when ``repo_path`` is below the work tree root, else ''."""
+    prefix = os.path.relpath(os.path.abspath(repo_path), repo.working_tree_dir).replace(os.sep, "/")
+    return "" if prefix == "." else prefix + "/"
+
+
+def _line_count(path: str) -> int:
+    """Number of lines of a file (at least 1), 1 if it cannot be read."""
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return 1
+    return max(1, data.count(b"\n") + (0 if data.endswith(b"\n") else 1))
+
+
+@tool
+def get_changed_hunks(repo_path: str, base_ref: Optional[str] = None,
+                      target_branch: Optional[str] = None) -> Dict:
+    """
+    Get the changed line ranges of every file since the merge-base with a base ref.
+    
+    The diff runs from the merge-base of the base ref and HEAD to the
+    working tree, so it covers the branch's commits and local edits, like
+    ``git diff base...`` does for a pull request. Untracked files that are
+    not ignored are new code too, and count as changed in full.
+    
+    Args:
+        repo_path: Local path to the repository
+        base_ref: Ref to diff against (defaults to ``target_branch``, then
+            the remote default branch, main or master)
+        target_branch: Branch the changes will be merged into
+        
+    Returns:
+        Dict with status, the resolved merge-base and a mapping of paths
+        relative to ``repo_path`` to inclusive [start, end] line ranges
+    """
+    try:
+        repo = Repo(repo_path, search_parent_directories=True)
+        candidates = [base_ref] if base_ref else [target_branch] if target_branch else list(DEFAULT_BASE_REFS)
+        merge_base = None
+        for ref in candidates:
+            try:
+                bases = repo.merge_base(ref, "HEAD")
+            except GitCommandError:
+                continue
+            if bases:
+                merge_base = bases[0].hexsha
+                break
+        if merge_base is None:
+            return {
+                "status": "error",
+                "error": f"No merge-base found with {', '.join(candidates)}"
+            }
+        
+        diff = repo.git.diff(merge_base, "-U0", "--no-color", "--no-ext-diff")
+        changed = parse_unified_diff(diff)
+        for path in repo.git.ls_files("--others", "--exclude-standard", "-z").split("\0"):
+            if path:
+                changed[path] = [(1, _line_count(os.path.join(repo.working_tree_dir, path)))]
+        prefix = _path_prefix(repo, repo_path)
+        return {
+            "status": "success",
+            "base": merge_base,
+            "files": {
+                path[len(prefix):]: [list(r) for r in ranges]
+                for path, ranges in changed.items() if path.startswith(prefix)
+            }
+        }
+    except (GitCommandError, InvalidGitRepositoryError, NoSuchPathError) as e:
+        return {
+            "status": "error",
+            "error": str(e)
+        }
+
+
+# Symlinks and gitlinks (submodules): the index SHA is not the content read
+_UNHASHABLE_MODES = ("120000", "160000")
+
+
+@tool
+def list_repository_files(repo_path: str) -> Dict:
+    """
+    List the files git knows about, with their blob SHAs, without walking the tree.
+    
+    Tracked files come from the index; untracked files that are not ignored
+    come from ``git ls-files --others --exclude-standard``. Files whose
+    working-tree content differs from the index, untracked files, symlinks
+    (whose blob is the link text, not the target's content) and submodules
+    have no known SHA.
+    
+    Args:
+        repo_path: Local path to the repository (or a directory inside it)
+        
+    Returns:
+        Dict with status and a mapping of paths relative to ``repo_path``
+        to blob SHA (or None)
+    """
+    try:
+        repo = Repo(repo_path, search_parent_directories=True)
+        prefix = _path_prefix(repo, repo_path)
+        
+        files = {}
+        # "<mode> <sha> <stage>\t<path>" per entry, NUL terminated
+        for record in repo.git.ls_files("-s", "-z").split("\0"):
+            if not record:
+                continue
+            meta, path = record.split("\t", 1)
+            mode, sha, stage = meta.split()
+            files[path] = sha if stage == "0" and mode not in _UNHASHABLE_MODES else None
+        
+        for path in repo.git.ls_files("-m", "-z").split("\0"):
+            if path in files:
+                files[path] = None
+        for path in repo.git.ls_files("-d", "-z").split("\0"):
+            files.pop(path, None)
+        for path in repo.git.ls_files("--others", "--exclude-standard", "-z").split("\0"):
+            if path:
+                files[path] = None
+        
+        return {
+            "status": "success",
+            "files": {
+                path[len(prefix):]: sha
+                for path, sha in files.items() if path.startswith(prefix)
+            }
+        }
+    except (GitCommandError, InvalidGitRepositoryError, NoSuchPathError) as e:
+        return {
+            "status": "error",
+            "error": str(e)
+        }
+
+
 @tool
 def create_fix_branch(repo_path: str, branch_name: str) -> Dict:
     """
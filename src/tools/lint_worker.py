@@ -0,0 +1,114 @@
+"""
+Long-lived in-process pylint worker.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+import os
+import threading
+
+# Keep pylint quiet and free of side effects; only messages are collected
+BASE_OPTIONS = ("--reports=n", "--score=n", "--persistent=n")
+
+
+class PylintWorker:
+    """Runs pylint through its Python API, reusing one linter for every batch.
+
+    Interpreter startup and checker registration are paid once per process,
+    and astroid's module cache stays warm, so imports shared between files
+    are only inferred the first time they are seen. Cached modules whose
+    file changed since, and imports that failed to resolve, are dropped
+    before each batch so edits between reviews are picked up.
+    """
+
+    def __init__(self, options: Sequence[str] = ()):
+        self.options = list(BASE_OPTIONS) + list(options)
+        self._linter = None
+        self._lock = threading.Lock()
+        # (mtime, size) of each cached module's file when it was last seen
+        self._stamps: Dict[str, Tuple[int, int]] = {}
+
+    def _refresh_modules(self) -> None:
+        from astroid import MANAGER
+        from astroid.exceptions import AstroidBuildingError
+
+        stamps = {}
+        for name, module in list(MANAGER.astroid_cache.items()):
+            path = getattr(module, "file", None)
+            if not path or not path.endswith(".py"):
+                continue
+            try:
+                info = os.stat(path)
+                stamp = (info.st_mtime_ns, info.st_size)
+            except OSError:
+                stamp = None
+            if name in self._stamps and self._stamps[name] != stamp:
+                del MANAGER.astroid_cache[name]
+            elif stamp is not None:
+                stamps[name] = stamp
+        self._stamps = stamps
+        for key, value in list(MANAGER._mod_file_cache.items()):
+            if isinstance(value, AstroidBuildingError):
+                del MANAGER._mod_file_cache[key]
+
+    def lint(self, file_paths: List[str]) -> Dict[str, List[Dict]]:
+        """
+        Lint a batch of files.
+
+        Args:
+            file_paths: Paths of Python files to lint
+
+        Returns:
+            Mapping of each requested path to its list of linting issues
+        """
+        from pylint.reporters import CollectingReporter
+
+        results: Dict[str, List[Dict]] = {path: [] for path in file_paths}
+        if not file_paths:
+            return results
+
+        reporter = CollectingReporter()
+        with self._lock:
+            self._refresh_modules()
+            if self._linter is None:
+                from pylint.lint import Run
+                # The first batch builds the linter; later ones reuse it
+                self._linter = Run(self.options + list(file_paths), reporter=reporter, exit=False).linter
+            else:
+                self._linter.set_reporter(reporter)
+                self._linter.check(list(file_paths))
+            self._refresh_modules()
+
+        by_abspath = {_normalize(path): path for path in file_paths}
+        for message in reporter.messages:
+            path = by_abspath.get(_normalize(message.abspath), message.path)
+            results.setdefault(path, []).append({
+                "file": path,
+                "line": message.line,
+                "end_line": message.end_line,
+                "column": message.column,
+                "severity": message.category,  # convention, refactor, warning, error
+                "message": message.msg,
+                "message_id": message.msg_id,
+                "symbol": message.symbol
+            })
+        return results
+
+
+def _normalize(path: str) -> str:
+    return os.path.normcase(os.path.abspath(path))
+
+
+_workers: Dict[Tuple[str, ...], PylintWorker] = {}
+_workers_lock = threading.Lock()
+
+
+def get_pylint_worker(max_line_length: Optional[int] = None) -> PylintWorker:
+    """Process-wide worker for the given settings, created on first use."""
+    options = []
+    if max_line_length:
+        options.append(f"--max-line-length={max_line_length}")
+    key = tuple(options)
+    with _workers_lock:
+        if key not in _workers:
+            _workers[key] = PylintWorker(options)
+        return _workers[key]
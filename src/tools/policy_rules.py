@@ -0,0 +1,233 @@
+"""
+Policy as code: rule blocks in standards documents compiled into smell rules.
+
+A standards document can state a policy mechanically in a fenced block::
+
+    ```codeguardian-rule
+    id: no-requests-without-timeout
+    message: HTTP calls must set a timeout
+    severity: high
+    call: [requests.get, requests.post, requests.*]
+    missing_keyword: timeout
+    ```
+
+Supported matchers, one per block:
+
+``ast``
+    AST node type, optionally narrowed by ``where`` (attribute: value;
+    null matches a missing attribute, a string matches a name, dotted
+    name or constant).
+``call``
+    Called function name or list of names, ``*`` wildcards allowed,
+    optionally narrowed by ``missing_keyword`` and by ``first_arg:
+    formatted`` (an f-string, concatenation, ``%`` or ``.format()``).
+``regex``
+    Pattern searched on every source line.
+
+Compiled rules run in the shared RuleEngine pass next to the built-in
+smell rules. Blocks that do not compile are reported and left to
+retrieval-based policy verification.
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+import ast
+import fnmatch
+import os
+import re
+import threading
+import yaml
+from tools.smell_rules import SmellRule
+from utils.rag_engine import STANDARD_SUFFIXES, split_sections
+
+RULE_FENCE = "codeguardian-rule"
+SEVERITIES = ("critical", "high", "medium", "low", "info")
+
+_BLOCK = re.compile(r"^```" + RULE_FENCE + r"[ \t]*\n(.*?)^```[ \t]*$", re.MULTILINE | re.DOTALL)
+_MATCHERS = ("ast", "call", "regex")
+
+
+def dotted_name(node: Optional[ast.AST]) -> Optional[str]:
+    """'a.b.c' for Name/Attribute chains, else None."""
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if isinstance(node, ast.Name):
+        parts.append(node.id)
+        return ".".join(reversed(parts))
+    return None
+
+
+def _is_formatted(node: ast.AST) -> bool:
+    """Whether an expression builds a string from parts at run time."""
+    if isinstance(node, ast.JoinedStr):
+        return any(isinstance(value, ast.FormattedValue) for value in node.values)
+    if isinstance(node, ast.BinOp) and isinstance(node.op, (ast.Add, ast.Mod)):
+        return isinstance(node.left, (ast.Constant, ast.JoinedStr, ast.BinOp)) and (
+            not isinstance(node.left, ast.Constant) or isinstance(node.left.value, str))
+    return (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+            and node.func.attr == "format")
+
+
+def _matches_value(actual, expected) -> bool:
+    if expected is None:
+        return actual is None or actual == []
+    if isinstance(actual, ast.AST):
+        if isinstance(actual, ast.Constant):
+            return actual.value == expected
+        return dotted_name(actual) == expected
+    return actual == expected
+
+
+def compile_spec(spec: Dict) -> Dict:
+    """
+    Validate a rule block and return its normalized spec.
+
+    Raises:
+        ValueError: when the block cannot be compiled into a matcher
+    """
+    if not isinstance(spec, dict):
+        raise ValueError("rule block must be a mapping")
+    rule_id = spec.get("id")
+    if not rule_id or not isinstance(rule_id, str):
+        raise ValueError("rule block needs an 'id'")
+    matchers = [key for key in _MATCHERS if key in spec]
+    if len(matchers) != 1:
+        raise ValueError(f"rule '{rule_id}' needs exactly one of: {', '.join(_MATCHERS)}")
+    severity = spec.get("severity", "medium")
+    if severity not in SEVERITIES:
+        raise ValueError(f"rule '{rule_id}' has unknown severity '{severity}'")
+
+    normalized = {"id": rule_id, "severity": severity,
+                  "message": spec.get("message") or f"Violates policy {rule_id}"}
+    kind = matchers[0]
+    if kind == "ast":
+        node_type = getattr(ast, str(spec["ast"]), None)
+        if not (isinstance(node_type, type) and issubclass(node_type, ast.AST)):
+            raise ValueError(f"rule '{rule_id}': '{spec['ast']}' is not an AST node type")
+        if "lineno" not in getattr(node_type, "_attributes", ()):
+            raise ValueError(f"rule '{rule_id}': '{spec['ast']}' nodes have no source position")
+        where = spec.get("where") or {}
+        if not isinstance(where, dict):
+            raise ValueError(f"rule '{rule_id}': 'where' must be a mapping")
+        normalized.update(ast=node_type.__name__, where=where)
+    elif kind == "call":
+        names = spec["call"] if isinstance(spec["call"], list) else [spec["call"]]
+        if not names or not all(isinstance(name, str) for name in names):
+            raise ValueError(f"rule '{rule_id}': 'call' must be a name or a list of names")
+        first_arg = spec.get("first_arg")
+        if first_arg not in (None, "formatted"):
+            raise ValueError(f"rule '{rule_id}': unknown first_arg '{first_arg}'")
+        normalized.update(call=names, missing_keyword=spec.get("missing_keyword"), first_arg=first_arg)
+    else:
+        try:
+            re.compile(spec["regex"])
+        except (re.error, TypeError) as e:
+            raise ValueError(f"rule '{rule_id}': invalid regex: {e}") from e
+        normalized.update(regex=spec["regex"])
+    return normalized
+
+
+def extract_rule_blocks(text: str) -> List[str]:
+    """YAML text of every rule block in a document or section."""
+    return [match.group(1) for match in _BLOCK.finditer(text)]
+
+
+def load_policy_rules(standards_dir: str) -> Tuple[List[Dict], List[str]]:
+    """
+    Compile the rule blocks of every standards document.
+
+    Each spec records the document and section it came from in ``source``.
+
+    Returns:
+        Compiled specs and one error message per block that did not compile
+    """
+    specs, errors = [], []
+    if not os.path.isdir(standards_dir):
+        return specs, errors
+    for root, dirs, files in os.walk(standards_dir):
+        dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+        for name in sorted(files):
+            if not name.lower().endswith(STANDARD_SUFFIXES):
+                continue
+            path = os.path.join(root, name)
+            document = os.path.relpath(path, standards_dir).replace(os.sep, "/")
+            with open(path, encoding="utf-8", errors="replace") as f:
+                text = f.read()
+            for section, _, body in split_sections(text):
+                for block in extract_rule_blocks(body):
+                    try:
+                        spec = compile_spec(yaml.safe_load(block))
+                    except (ValueError, yaml.YAMLError) as e:
+                        errors.append(f"{document}: {e}")
+                        continue
+                    spec["source"] = {"document": document, "section": section}
+                    specs.append(spec)
+    return specs, errors
+
+
+_rules_cache: Dict[str, Tuple[List[Dict], List[str]]] = {}
+_rules_lock = threading.Lock()
+
+
+def get_policy_rules(standards_dir: str) -> Tuple[List[Dict], List[str]]:
+    """Compiled policy rules of ``standards_dir``, loaded once per process."""
+    key = os.path.abspath(standards_dir)
+    with _rules_lock:
+        if key not in _rules_cache:
+            _rules_cache[key] = load_policy_rules(standards_dir)
+        return _rules_cache[key]
+
+
+class PolicyRule(SmellRule):
+    """A compiled policy, run by the RuleEngine like any smell rule."""
+
+    def __init__(self, spec: Dict, config: Optional[Dict] = None):
+        super().__init__(config)
+        self.spec = spec
+        self.name = spec["id"]
+        if "ast" in spec:
+            self.node_types = (getattr(ast, spec["ast"]),)
+        elif "call" in spec:
+            self.node_types = (ast.Call,)
+        else:
+            self.token_rule = True
+            self._pattern = re.compile(spec["regex"])
+
+    def _smell(self, line: int, end_line: Optional[int] = None) -> Dict:
+        return {
+            "type": self.name,
+            "line": line,
+            "end_line": end_line or line,
+            "message": self.spec["message"],
+            "severity": self.spec["severity"],
+            "category": "policy"
+        }
+
+    def check(self, node, parsed):
+        spec = self.spec
+        if "ast" in spec:
+            line = getattr(node, "lineno", None)
+            if line is not None and all(_matches_value(getattr(node, attr, None), value)
+                                        for attr, value in spec["where"].items()):
+                yield self._smell(line, getattr(node, "end_lineno", None))
+            return
+        name = dotted_name(node.func)
+        if name is None or not any(fnmatch.fnmatchcase(name, pattern) for pattern in spec["call"]):
+            return
+        keyword = spec.get("missing_keyword")
+        if keyword and (any(k.arg == keyword for k in node.keywords)
+                        or any(k.arg is None for k in node.keywords)):
+            return
+        if spec.get("first_arg") == "formatted" and not (node.args and _is_formatted(node.args[0])):
+            return
+        yield self._smell(node.lineno, node.end_lineno)
+
+    def check_tokens(self, parsed):
+        for number, line in enumerate(parsed.lines, 1):
+            if self._pattern.search(line):
+                yield self._smell(number)
+
+
+def compile_policy_rules(specs: Iterable[Dict], config: Optional[Dict] = None) -> List[PolicyRule]:
+    return [PolicyRule(spec, config) for spec in specs]
@@ -4,23 +4,24 @@ Security scanner tools for vulnerability detection.
 
 from langchain_core.tools import tool
 from typing import List, Dict, Optional
-import subprocess
-import json
+from tools.bandit_worker import get_bandit_worker
 
 @tool
-def scan_security_vulnerabilities(file_path: str) -> List[Dict]:
+def scan_security_vulnerabilities(file_path: str, skips: Optional[List[str]] = None) -> List[Dict]:
     """
-    Scan for security vulnerabilities using bandit and semgrep.
+    Scan a Python file for security vulnerabilities using bandit.
     
     Args:
-        file_path: Path to the file or directory to scan
+        file_path: Path to Python file
+        skips: Bandit test ids (e.g. B101) not to run
         
     Returns:
         List of security findings
     """
-    findings = []
-    # Implementation placeholder for calling bandit or semgrep
-    return findings
+    try:
+        return get_bandit_worker(skips).scan(file_path)
+    except Exception as e:
+        return [{"error": f"Bandit failed: {e}"}]
 
 @tool
 def check_dependencies_security() -> List[Dict]:
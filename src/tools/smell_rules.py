@@ -0,0 +1,237 @@
+"""
+Pluggable code smell rules run by a single-pass AST visitor.
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple, Type
+from collections import defaultdict
+import ast
+import keyword
+import time
+import tokenize
+
+# Rule classes by name, filled by @register_rule
+RULES: Dict[str, Type["SmellRule"]] = {}
+
+_FUNCTIONS = (ast.FunctionDef, ast.AsyncFunctionDef)
+
+
+def register_rule(rule_class: Type["SmellRule"]) -> Type["SmellRule"]:
+    """Class decorator adding a rule to the registry under its ``name``."""
+    RULES[rule_class.name] = rule_class
+    return rule_class
+
+
+class SmellRule:
+    """Base class for smell rules.
+
+    A rule lists the AST node types it inspects in ``node_types`` and is
+    handed each matching node by the engine. Rules that set ``token_rule``
+    instead get the whole file once through ``check_tokens``. ``config`` is
+    the ``performance`` section of .codeguardian.yml.
+    """
+
+    name = ""
+    node_types: Tuple[Type[ast.AST], ...] = ()
+    token_rule = False
+
+    def __init__(self, config: Optional[Dict] = None):
+        self.config = config or {}
+
+    def check(self, node: ast.AST, parsed) -> Iterable[Dict]:
+        """Smells found at ``node``; ``parsed`` is the file's ParsedFile."""
+        return ()
+
+    def check_tokens(self, parsed) -> Iterable[Dict]:
+        """Smells found in the token stream of ``parsed``."""
+        return ()
+
+
+@register_rule
+class LongFunctionRule(SmellRule):
+    name = "long_function"
+    node_types = _FUNCTIONS
+
+    def check(self, node, parsed):
+        limit = self.config.get("max_function_lines", 50)
+        length = node.end_lineno - node.lineno
+        if length > limit:
+            yield {
+                "type": self.name,
+                "line": node.lineno,
+                "end_line": node.end_lineno,
+                "function": node.name,
+                "length": length,
+                "message": f"Function '{node.name}' is {length} lines long (>{limit})"
+            }
+
+
+@register_rule
+class TooManyParametersRule(SmellRule):
+    name = "too_many_parameters"
+    node_types = _FUNCTIONS
+
+    def check(self, node, parsed):
+        limit = self.config.get("max_parameters", 5)
+        args = node.args
+        param_count = len(args.posonlyargs) + len(args.args) + len(args.kwonlyargs)
+        if param_count > limit:
+            yield {
+                "type": self.name,
+                "line": node.lineno,
+                "end_line": node.end_lineno,
+                "function": node.name,
+                "parameter_count": param_count,
+                "message": f"Function '{node.name}' has {param_count} parameters (>{limit})"
+            }
+
+
+@register_rule
+class GodClassRule(SmellRule):
+    name = "god_class"
+    node_types = (ast.ClassDef,)
+
+    def check(self, node, parsed):
+        limit = self.config.get("max_class_lines", 500)
+        length = node.end_lineno - node.lineno
+        if length > limit:
+            yield {
+                "type": self.name,
+                "line": node.lineno,
+                "end_line": node.end_lineno,
+                "class": node.name,
+                "length": length,
+                "message": f"Class '{node.name}' is {length} lines long (>{limit})"
+            }
+
+
+@register_rule
+class MagicNumberRule(SmellRule):
+    """Numeric literals that should be named constants.
+
+    Works on the token stream, so comments and strings never match. Skips
+    values in ``magic_number_allowlist``, assignments directly in a module
+    or class body (those are the named constants), everything in a
+    function signature (defaults) and subscripts (indices and slices).
+    """
+
+    name = "magic_number"
+    token_rule = True
+    DEFAULT_ALLOWLIST = (-1, 0, 1, 2)
+
+    def check_tokens(self, parsed):
+        allowlist = set(self.config.get("magic_number_allowlist", self.DEFAULT_ALLOWLIST))
+        blocks = ["module"]  # kind of every open indented block
+        opened = None  # kind of block the previous logical line opens
+        header = None  # "def" or "class" when the current line is one
+        brackets: List[str] = []
+        assigns = False
+        candidates = []
+        prev = prev2 = None
+
+        for tok in parsed.tokens:
+            kind = tok.type
+            if kind == tokenize.INDENT:
+                # Control-flow blocks take the kind of the block around them
+                blocks.append(opened or blocks[-1])
+                continue
+            if kind == tokenize.DEDENT:
+                blocks.pop()
+                continue
+            if kind == tokenize.NEWLINE:
+                if not (assigns and blocks[-1] in ("module", "class")):
+                    yield from candidates
+                opened = {"def": "function", "class": "class"}.get(header)
+                header, assigns, candidates = None, False, []
+                brackets.clear()
+                prev = prev2 = None
+                continue
+            if kind in (tokenize.NL, tokenize.COMMENT, tokenize.ENDMARKER):
+                continue
+
+            if prev is None:
+                opened = None
+                if tok.string in ("def", "class"):
+                    header = tok.string
+            elif prev.string == "async" and tok.string == "def" and prev2 is None:
+                header = "def"
+
+            if kind == tokenize.OP:
+                if tok.string in "([{":
+                    if header == "def" and not brackets and tok.string == "(":
+                        brackets.append("params")
+                    elif tok.string == "[" and prev is not None and (
+                            prev.type in (tokenize.NAME, tokenize.STRING) and not keyword.iskeyword(prev.string)
+                            or prev.string in (")", "]")):
+                        brackets.append("subscript")
+                    else:
+                        brackets.append("other")
+                elif tok.string in ")]}" and brackets:
+                    brackets.pop()
+                elif tok.string == "=" and not brackets:
+                    assigns = True
+            elif kind == tokenize.NUMBER and not ("params" in brackets or
+                                                  brackets and brackets[-1] == "subscript"):
+                value = ast.literal_eval(tok.string)
+                negative = prev is not None and prev.string == "-" and (
+                    prev2 is None or keyword.iskeyword(prev2.string)
+                    or prev2.type == tokenize.OP and prev2.string not in ")]}")
+                if negative:
+                    value = -value
+                if not isinstance(value, complex) and value not in allowlist:
+                    text = ("-" if negative else "") + tok.string
+                    # A negative literal starts at its sign
+                    line, column = (prev if negative else tok).start
+                    candidates.append({
+                        "type": self.name,
+                        "line": line,
+                        "column": column,
+                        "value": text,
+                        "message": f"Magic number {text}; consider a named constant"
+                    })
+            prev2, prev = prev, tok
+
+
+class RuleEngine:
+    """Dispatches every node of a module to the rules registered for its type.
+
+    The tree is traversed once however many rules are enabled. Time spent
+    in each rule is accumulated in ``timings`` (seconds, by rule name).
+    """
+
+    def __init__(self, rules: List[SmellRule]):
+        self.rules = rules
+        self._dispatch: Dict[Type[ast.AST], List[SmellRule]] = defaultdict(list)
+        self._token_rules = [rule for rule in rules if rule.token_rule]
+        for rule in rules:
+            for node_type in rule.node_types:
+                self._dispatch[node_type].append(rule)
+        self.timings: Dict[str, float] = {rule.name: 0.0 for rule in rules}
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict] = None,
+                    enabled: Optional[Iterable[str]] = None) -> "RuleEngine":
+        """Engine with every registered rule, or only those named in ``enabled``."""
+        names = list(RULES) if enabled is None else [name for name in enabled if name in RULES]
+        return cls([RULES[name](config) for name in names])
+
+    def run(self, parsed) -> List[Dict]:
+        """Apply the rules to a ParsedFile and return the smells in tree order."""
+        smells: List[Dict] = []
+        dispatch = self._dispatch
+        timings = self.timings
+        clock = time.perf_counter
+        stack = [parsed.tree]
+        while stack:
+            node = stack.pop()
+            for rule in dispatch.get(type(node), ()):
+                started = clock()
+                smells.extend(rule.check(node, parsed))
+                timings[rule.name] += clock() - started
+            # Reversed so children are visited in source order
+            stack.extend(reversed(list(ast.iter_child_nodes(node))))
+
+        for rule in self._token_rules:
+            started = clock()
+            smells.extend(rule.check_tokens(parsed))
+            timings[rule.name] += clock() - started
+        return smells
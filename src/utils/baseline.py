@@ -0,0 +1,91 @@
+"""
+Baseline of known findings and inline suppression comments.
+"""
+
+from typing import AbstractSet, Dict, FrozenSet, Iterable, Optional
+import os
+import re
+import threading
+import tokenize
+
+# File header; the rest of the file is packed fingerprints
+BASELINE_MAGIC = b"CGBASE1\n"
+FINGERPRINT_BYTES = 10  # utils.fingerprint ids are 20 hex digits
+
+_SUPPRESSION = re.compile(r"codeguardian:\s*ignore(?:\[([^\]]*)\])?")
+
+
+def save_baseline(path: str, fingerprints: Iterable[str]) -> int:
+    """
+    Write the fingerprints of the current findings to a baseline file.
+
+    Fingerprints are stored sorted and packed as raw bytes, 10 bytes per
+    finding, so baselines of large legacy code bases stay small and diff
+    deterministically.
+
+    Returns:
+        Number of fingerprints written
+    """
+    packed = sorted({bytes.fromhex(fp) for fp in fingerprints if fp})
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(BASELINE_MAGIC)
+        f.write(b"".join(packed))
+    return len(packed)
+
+
+def load_baseline(path: str) -> FrozenSet[str]:
+    """Fingerprints recorded in a baseline file, as a set for O(1) lookups."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if not data.startswith(BASELINE_MAGIC):
+        raise ValueError(f"{path} is not a baseline file")
+    body = memoryview(data)[len(BASELINE_MAGIC):]
+    return frozenset(
+        body[i:i + FINGERPRINT_BYTES].hex() for i in range(0, len(body), FINGERPRINT_BYTES)
+    )
+
+
+_baselines: Dict[str, FrozenSet[str]] = {}
+_baselines_lock = threading.Lock()
+
+
+def get_baseline(path: Optional[str]) -> Optional[AbstractSet[str]]:
+    """Baseline for ``path``, loaded once per process; None when there is none."""
+    if not path:
+        return None
+    key = os.path.abspath(path)
+    with _baselines_lock:
+        if key not in _baselines:
+            _baselines[key] = load_baseline(path)
+        return _baselines[key]
+
+
+def parse_suppressions(parsed) -> Dict[int, FrozenSet[str]]:
+    """
+    Find ``# codeguardian: ignore`` comments in a file.
+
+    ``ignore`` alone suppresses every rule on its line (recorded as
+    ``"*"``); ``ignore[rule-a, rule-b]`` only the listed rules.
+
+    Returns:
+        Suppressed rules by line number
+    """
+    suppressions = {}
+    for tok in parsed.tokens:
+        if tok.type != tokenize.COMMENT:
+            continue
+        match = _SUPPRESSION.search(tok.string)
+        if match:
+            rules = match.group(1)
+            suppressions[tok.start[0]] = frozenset(
+                r.strip() for r in rules.split(",") if r.strip()
+            ) if rules else frozenset("*")
+    return suppressions
+
+
+def is_suppressed(item: Dict, rule_id: str) -> bool:
+    """Whether a tool result annotated by annotate_context is suppressed for ``rule_id``."""
+    rules = item.get("suppressed")
+    return bool(rules) and ("*" in rules or rule_id in rules)
@@ -0,0 +1,300 @@
+"""
+Durable LangGraph checkpointer backed by a local SQLite database.
+"""
+
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Sequence, Tuple
+import os
+import random
+import sqlite3
+import threading
+import zlib
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+
+# Serialized values larger than this are stored zlib-compressed
+COMPRESS_MIN_BYTES = 4096
+_COMPRESSED = "+zlib"
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS checkpoints (
+        thread_id TEXT NOT NULL,
+        checkpoint_ns TEXT NOT NULL DEFAULT '',
+        checkpoint_id TEXT NOT NULL,
+        parent_checkpoint_id TEXT,
+        type TEXT,
+        checkpoint BLOB,
+        metadata_type TEXT,
+        metadata BLOB,
+        PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS blobs (
+        thread_id TEXT NOT NULL,
+        checkpoint_ns TEXT NOT NULL DEFAULT '',
+        channel TEXT NOT NULL,
+        version TEXT NOT NULL,
+        type TEXT NOT NULL,
+        blob BLOB,
+        PRIMARY KEY (thread_id, checkpoint_ns, channel, version)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS writes (
+        thread_id TEXT NOT NULL,
+        checkpoint_ns TEXT NOT NULL DEFAULT '',
+        checkpoint_id TEXT NOT NULL,
+        task_id TEXT NOT NULL,
+        idx INTEGER NOT NULL,
+        channel TEXT NOT NULL,
+        type TEXT,
+        value BLOB,
+        task_path TEXT NOT NULL DEFAULT '',
+        PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+    )
+    """,
+)
+
+
+class SQLiteCheckpointSaver(BaseCheckpointSaver[str]):
+    """Checkpointer that keeps review threads on disk so they survive the process.
+
+    Storage follows the layout of LangGraph's in-memory saver: a checkpoint
+    row holds everything but the channel values, and each channel value is
+    stored once per version in ``blobs``. A step only writes the channels it
+    changed, so a checkpoint costs the size of its delta rather than a copy
+    of the whole state, and nothing is held in memory between steps. Large
+    values (finding lists, mostly) are compressed.
+
+    The database runs in WAL mode with one connection per thread, like the
+    result cache.
+    """
+
+    def __init__(self, path: Optional[str] = None, serde=None):
+        super().__init__(serde=serde)
+        if path is None:
+            path = os.path.join(os.getenv("CACHE_DIR", "./.cache"), "checkpoints.sqlite")
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._local = threading.local()
+        for statement in _SCHEMA:
+            self._execute(statement)
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite connections must not cross threads or forked processes
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _execute(self, sql: str, params: tuple = ()) -> sqlite3.Cursor:
+        return self._connection().execute(sql, params)
+
+    def _dumps(self, value: Any) -> Tuple[str, bytes]:
+        type_, data = self.serde.dumps_typed(value)
+        if len(data) >= COMPRESS_MIN_BYTES:
+            return type_ + _COMPRESSED, zlib.compress(data)
+        return type_, data
+
+    def _loads(self, type_: str, data: bytes) -> Any:
+        if type_.endswith(_COMPRESSED):
+            type_, data = type_[:-len(_COMPRESSED)], zlib.decompress(data)
+        return self.serde.loads_typed((type_, data))
+
+    def _load_blobs(self, thread_id: str, checkpoint_ns: str, versions: ChannelVersions) -> Dict[str, Any]:
+        channel_values: Dict[str, Any] = {}
+        for channel, version in versions.items():
+            row = self._execute(
+                "SELECT type, blob FROM blobs WHERE thread_id = ? AND checkpoint_ns = ? "
+                "AND channel = ? AND version = ?",
+                (thread_id, checkpoint_ns, channel, str(version))
+            ).fetchone()
+            if row is not None and row[0] != "empty":
+                channel_values[channel] = self._loads(row[0], row[1])
+        return channel_values
+
+    def _make_tuple(self, row: tuple) -> CheckpointTuple:
+        thread_id, checkpoint_ns, checkpoint_id, parent_id, type_, data, metadata_type, metadata = row
+        checkpoint = self._loads(type_, data)
+        writes = self._execute(
+            "SELECT task_id, channel, type, value FROM writes WHERE thread_id = ? AND checkpoint_ns = ? "
+            "AND checkpoint_id = ? ORDER BY task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id)
+        ).fetchall()
+        return CheckpointTuple(
+            config={"configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint_id,
+            }},
+            checkpoint={
+                **checkpoint,
+                "channel_values": self._load_blobs(thread_id, checkpoint_ns, checkpoint["channel_versions"]),
+            },
+            metadata=self._loads(metadata_type, metadata),
+            parent_config={"configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": parent_id,
+            }} if parent_id else None,
+            pending_writes=[(task_id, channel, self._loads(t, v)) for task_id, channel, t, v in writes],
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """The checkpoint named in ``config``, or the thread's latest one."""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        columns = ("SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, "
+                   "metadata_type, metadata FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?")
+        checkpoint_id = get_checkpoint_id(config)
+        if checkpoint_id:
+            row = self._execute(columns + " AND checkpoint_id = ?",
+                                (thread_id, checkpoint_ns, checkpoint_id)).fetchone()
+        else:
+            # Checkpoint ids are time-ordered, so the largest is the latest
+            row = self._execute(columns + " ORDER BY checkpoint_id DESC LIMIT 1",
+                                (thread_id, checkpoint_ns)).fetchone()
+        return None if row is None else self._make_tuple(row)
+
+    def list(self, config: Optional[RunnableConfig], *, filter: Optional[Dict[str, Any]] = None,
+             before: Optional[RunnableConfig] = None, limit: Optional[int] = None) -> Iterator[CheckpointTuple]:
+        """Checkpoints matching the given criteria, newest first."""
+        sql = ("SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, "
+               "metadata_type, metadata FROM checkpoints WHERE 1 = 1")
+        params: list = []
+        if config:
+            sql += " AND thread_id = ?"
+            params.append(config["configurable"]["thread_id"])
+            checkpoint_ns = config["configurable"].get("checkpoint_ns")
+            if checkpoint_ns is not None:
+                sql += " AND checkpoint_ns = ?"
+                params.append(checkpoint_ns)
+            checkpoint_id = get_checkpoint_id(config)
+            if checkpoint_id:
+                sql += " AND checkpoint_id = ?"
+                params.append(checkpoint_id)
+        if before and get_checkpoint_id(before):
+            sql += " AND checkpoint_id < ?"
+            params.append(get_checkpoint_id(before))
+        sql += " ORDER BY checkpoint_id DESC"
+
+        remaining = limit
+        for row in self._execute(sql, tuple(params)).fetchall():
+            if filter:
+                metadata = self._loads(row[6], row[7])
+                if not all(metadata.get(key) == value for key, value in filter.items()):
+                    continue
+            if remaining is not None:
+                if remaining <= 0:
+                    break
+                remaining -= 1
+            yield self._make_tuple(row)
+
+    def put(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata,
+            new_versions: ChannelVersions) -> RunnableConfig:
+        """Store a checkpoint and the values of the channels that changed in it."""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        stripped = checkpoint.copy()
+        values: Dict[str, Any] = stripped.pop("channel_values")
+        blobs = []
+        for channel, version in new_versions.items():
+            type_, data = self._dumps(values[channel]) if channel in values else ("empty", b"")
+            blobs.append((thread_id, checkpoint_ns, channel, str(version), type_, data))
+        type_, data = self._dumps(stripped)
+        metadata_type, metadata_data = self._dumps(get_checkpoint_metadata(config, metadata))
+
+        conn = self._connection()
+        with conn:
+            conn.execute("BEGIN")
+            conn.executemany("INSERT OR REPLACE INTO blobs VALUES (?, ?, ?, ?, ?, ?)", blobs)
+            conn.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (thread_id, checkpoint_ns, checkpoint["id"], config["configurable"].get("checkpoint_id"),
+                 type_, data, metadata_type, metadata_data)
+            )
+        return {"configurable": {
+            "thread_id": thread_id,
+            "checkpoint_ns": checkpoint_ns,
+            "checkpoint_id": checkpoint["id"],
+        }}
+
+    def put_writes(self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str,
+                   task_path: str = "") -> None:
+        """Store the pending writes of a task, so a resumed run does not redo it."""
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        conn = self._connection()
+        with conn:
+            conn.execute("BEGIN")
+            for idx, (channel, value) in enumerate(writes):
+                type_, data = self._dumps(value)
+                # Special writes (errors, interrupts) replace earlier ones; regular writes are kept
+                verb = "INSERT OR REPLACE" if channel in WRITES_IDX_MAP else "INSERT OR IGNORE"
+                conn.execute(
+                    f"{verb} INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (thread_id, checkpoint_ns, checkpoint_id, task_id, WRITES_IDX_MAP.get(channel, idx),
+                     channel, type_, data, task_path)
+                )
+
+    def delete_thread(self, thread_id: str) -> None:
+        """Remove every checkpoint, value and write of a thread."""
+        conn = self._connection()
+        with conn:
+            conn.execute("BEGIN")
+            for table in ("checkpoints", "blobs", "writes"):
+                conn.execute(f"DELETE FROM {table} WHERE thread_id = ?", (str(thread_id),))
+
+    def thread_ids(self) -> list:
+        """Threads that still have checkpoints, most recently updated first."""
+        rows = self._execute(
+            "SELECT thread_id FROM checkpoints GROUP BY thread_id ORDER BY MAX(checkpoint_id) DESC"
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    # SQLite calls are short and local, so the async API runs them inline
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return self.get_tuple(config)
+
+    async def alist(self, config: Optional[RunnableConfig], *, filter: Optional[Dict[str, Any]] = None,
+                    before: Optional[RunnableConfig] = None,
+                    limit: Optional[int] = None) -> AsyncIterator[CheckpointTuple]:
+        for item in self.list(config, filter=filter, before=before, limit=limit):
+            yield item
+
+    async def aput(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata,
+                   new_versions: ChannelVersions) -> RunnableConfig:
+        return self.put(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str,
+                          task_path: str = "") -> None:
+        self.put_writes(config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        self.delete_thread(thread_id)
+
+    def get_next_version(self, current: Optional[str], channel: None) -> str:
+        # Same scheme as the in-memory saver: zero-padded counter plus a random tie-breaker
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
@@ -10,7 +10,9 @@ def load_config(config_path_or_repo: str) -> Dict:
         path = path / ".codeguardian.yml"
     
     default_config = {
-        "enabled_checks": ["static_analysis", "security_audit", "performance_analysis"],
+        # Every analysis node of the graph; a .codeguardian.yml can narrow it
+        "enabled_checks": ["static_analysis", "pattern_analysis", "security_audit", "performance_analysis",
+                           "testing_assessment", "logic_verification", "policy_verification"],
         "severity_threshold": "medium",
         "auto_fix": {"enabled": True}
     }
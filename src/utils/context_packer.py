@@ -0,0 +1,257 @@
+"""
+Token-budgeted code context for LLM prompts.
+
+Instead of whole files, a prompt about a finding gets the symbol around
+it, the functions it calls and that call it, the outline of its class and
+the imports those pieces use, in that order of priority, for as long as
+they fit the budget. Files are cut into chunks at function and class
+boundaries of the shared AST from the source cache.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Optional, Tuple
+import ast
+import re
+from utils.source_cache import source_cache
+
+DEFAULT_CONTEXT_TOKENS = 1500
+
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+_DEFINITIONS = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate LLM token count: one per identifier, number or symbol."""
+    return len(_TOKEN.findall(text))
+
+
+@dataclass(frozen=True)
+class Chunk:
+    """A function or class of a file, by 1-based inclusive line range."""
+    name: str
+    kind: str
+    start: int
+    end: int
+    calls: FrozenSet[str] = frozenset()
+    names: FrozenSet[str] = frozenset()
+    body_start: int = 0
+
+
+def _used_names(node: ast.AST) -> Tuple[FrozenSet[str], FrozenSet[str]]:
+    """(simple names called, identifiers read) inside ``node``."""
+    calls, names = set(), set()
+    for child in ast.walk(node):
+        if isinstance(child, ast.Call):
+            func = child.func
+            if isinstance(func, ast.Name):
+                calls.add(func.id)
+            elif isinstance(func, ast.Attribute):
+                calls.add(func.attr)
+        elif isinstance(child, ast.Name):
+            names.add(child.id)
+    return frozenset(calls), frozenset(names)
+
+
+class FileChunks:
+    """Functions, classes and imports of one parsed Python file."""
+
+    def __init__(self, parsed):
+        self.lines = parsed.lines
+        self.chunks: List[Chunk] = []
+        # (start, end, names bound) of every module-level import
+        self.imports: List[Tuple[int, int, FrozenSet[str]]] = []
+        self._top_level: List[Tuple[int, int]] = []
+        for node in parsed.tree.body:
+            self._top_level.append((self._start(node), node.end_lineno))
+            if isinstance(node, (ast.Import, ast.ImportFrom)):
+                bound = frozenset((alias.asname or alias.name).split(".")[0] for alias in node.names)
+                self.imports.append((node.lineno, node.end_lineno, bound))
+        stack = [(node, "") for node in reversed(parsed.tree.body)]
+        while stack:
+            node, outer = stack.pop()
+            if isinstance(node, _DEFINITIONS):
+                name = f"{outer}.{node.name}" if outer else node.name
+                calls, names = _used_names(node)
+                kind = "class" if isinstance(node, ast.ClassDef) else "function"
+                self.chunks.append(Chunk(name, kind, self._start(node), node.end_lineno, calls, names,
+                                         node.body[0].lineno))
+                outer = name
+            stack.extend((child, outer) for child in reversed(list(ast.iter_child_nodes(node))))
+        self._by_name: Dict[str, List[Chunk]] = {}
+        for chunk in self.chunks:
+            self._by_name.setdefault(chunk.name.rsplit(".", 1)[-1], []).append(chunk)
+
+    @staticmethod
+    def _start(node: ast.AST) -> int:
+        return min([node.lineno] + [d.lineno for d in getattr(node, "decorator_list", ())])
+
+    def enclosing(self, line: int, kind: Optional[str] = None) -> Optional[Chunk]:
+        """Innermost chunk (of ``kind``, if given) around ``line``."""
+        best = None
+        for chunk in self.chunks:
+            if chunk.start <= line <= chunk.end and (kind is None or chunk.kind == kind):
+                if best is None or chunk.start >= best.start:
+                    best = chunk
+        return best
+
+    def statement_at(self, line: int) -> Tuple[int, int]:
+        """Line range of the module-level statement around ``line``, or the line itself."""
+        for start, end in self._top_level:
+            if start <= line <= end:
+                return start, end
+        return line, line
+
+    def callees(self, chunk: Chunk) -> List[Chunk]:
+        return [callee for name in sorted(chunk.calls) for callee in self._by_name.get(name, ())
+                if callee is not chunk and not (chunk.start <= callee.start <= chunk.end)]
+
+    def callers(self, chunk: Chunk) -> List[Chunk]:
+        name = chunk.name.rsplit(".", 1)[-1]
+        return [caller for caller in self.chunks
+                if caller.kind == "function" and name in caller.calls and caller is not chunk
+                and not (caller.start <= chunk.start <= caller.end)]
+
+    def text(self, start: int, end: int) -> str:
+        return "\n".join(self.lines[start - 1:end])
+
+    def outline(self, chunk: Chunk) -> str:
+        """A class with the bodies of its methods left out."""
+        nested = [c for c in self.chunks if c.kind == "function" and chunk.start < c.start <= chunk.end]
+        lines, number = [], chunk.start
+        for method in sorted(nested, key=lambda c: c.start):
+            if method.start < number:
+                continue
+            lines.extend(self.lines[number - 1:method.body_start - 1])
+            indent = len(self.lines[method.body_start - 1]) - len(self.lines[method.body_start - 1].lstrip())
+            lines.append(" " * indent + "...")
+            number = method.end + 1
+        lines.extend(self.lines[number - 1:chunk.end])
+        return "\n".join(lines)
+
+
+@dataclass
+class PackedContext:
+    """Code context for one finding: rendered text and what went into it."""
+    text: str
+    tokens: int
+    symbols: List[str]
+    truncated: bool = False
+
+
+class ContextPacker:
+    """
+    Packs the code relevant to a finding into ``budget`` tokens.
+
+    Pieces are taken greedily in priority order: the enclosing symbol (cut
+    down to the lines around the finding when it alone is over budget),
+    the imports it uses, its class outline, its callees, its callers, and
+    finally the imports of those. A piece that does not fit is skipped and
+    smaller ones after it are still tried. Chunked files are kept per
+    packer, so one packer should serve every finding of a review.
+    """
+
+    def __init__(self, budget: int = DEFAULT_CONTEXT_TOKENS):
+        self.budget = budget
+        self._files: Dict[Tuple[str, str], Optional[FileChunks]] = {}
+
+    def _chunks(self, file_path: str) -> Tuple[object, Optional[FileChunks]]:
+        parsed = source_cache.get(file_path)
+        key = (file_path, parsed.content_hash)
+        if key not in self._files:
+            try:
+                self._files[key] = FileChunks(parsed) if file_path.endswith(".py") else None
+            except SyntaxError:
+                self._files[key] = None
+        return parsed, self._files[key]
+
+    def pack(self, file_path: str, line: int, end_line: Optional[int] = None) -> PackedContext:
+        """Context for a finding at ``line``..``end_line`` of ``file_path``."""
+        parsed, chunks = self._chunks(file_path)
+        end_line = max(line, end_line or line)
+        if chunks is None:
+            lines = parsed.lines
+            start, end = self._window(lines, 1, len(lines), line, end_line,
+                                      self.budget - estimate_tokens(_render(1, len(lines), "")))
+            text = _render(start, end, "\n".join(lines[start - 1:end]))
+            return PackedContext(text, estimate_tokens(text), [], (start, end) != (1, len(lines)))
+
+        target = chunks.enclosing(line)
+        if target is not None and target.kind == "class":
+            # A finding in a class body but outside its methods
+            pieces = [(target.start, target.end, target.name, chunks.outline(target))]
+        elif target is not None:
+            pieces = [(target.start, target.end, target.name, chunks.text(target.start, target.end))]
+        else:
+            start, end = chunks.statement_at(line)
+            pieces = [(start, max(end, end_line), "<module>", chunks.text(start, max(end, end_line)))]
+
+        start, end, name, text = pieces[0]
+        truncated = estimate_tokens(_render(start, end, text)) > self.budget
+        if truncated:
+            start, end = self._window(chunks.lines, start, end, line, end_line,
+                                      self.budget - estimate_tokens(_render(start, end, "")))
+            text = chunks.text(start, end)
+        used = self.budget - estimate_tokens(_render(start, end, text))
+        selected = [(start, end, name, text)]
+        included = {(pieces[0][0], pieces[0][1])}
+
+        def add(piece_start, piece_end, piece_name, piece_text):
+            nonlocal used
+            if (piece_start, piece_end) in included:
+                return False
+            cost = estimate_tokens(_render(piece_start, piece_end, piece_text))
+            if cost > used:
+                return False
+            used -= cost
+            included.add((piece_start, piece_end))
+            selected.append((piece_start, piece_end, piece_name, piece_text))
+            return True
+
+        def add_imports(chunk_names):
+            for import_start, import_end, bound in chunks.imports:
+                if bound & chunk_names:
+                    add(import_start, import_end, "<imports>", chunks.text(import_start, import_end))
+
+        names = target.names | target.calls if target is not None else frozenset(_TOKEN.findall(text))
+        add_imports(names)
+        if target is not None:
+            owner = chunks.enclosing(target.start, "class") if target.kind == "function" else None
+            if owner is not None:
+                add(owner.start, owner.end, owner.name, chunks.outline(owner))
+            related = chunks.callees(target) + chunks.callers(target)
+            for chunk in related:
+                if add(chunk.start, chunk.end, chunk.name, chunks.text(chunk.start, chunk.end)):
+                    names |= chunk.names | chunk.calls
+            add_imports(names)
+
+        selected.sort()
+        rendered = "\n".join(_render(s, e, t) for s, e, _, t in selected)
+        symbols = [n for _, _, n, _ in selected if not n.startswith("<")]
+        return PackedContext(rendered, estimate_tokens(rendered), symbols, truncated)
+
+    @staticmethod
+    def _window(lines: List[str], start: int, end: int, line: int, end_line: int,
+                budget: int) -> Tuple[int, int]:
+        """
+        Line range within ``start``..``end`` grown outwards from the finding
+        while it fits ``budget``. The finding's own lines are always kept.
+        """
+        end = min(end, len(lines))
+        low = min(max(start, line), end)
+        high = max(low, min(end, end_line))
+        cost = estimate_tokens("\n".join(lines[low - 1:high]))
+        grew = True
+        while grew:
+            grew = False
+            for candidate in (low - 1, high + 1):
+                if start <= candidate <= end and not low <= candidate <= high:
+                    extra = estimate_tokens(lines[candidate - 1])
+                    if cost + extra <= budget:
+                        cost += extra
+                        low, high = min(low, candidate), max(high, candidate)
+                        grew = True
+        return low, high
+
+
+def _render(start: int, end: int, text: str) -> str:
+    return f"# lines {start}-{end}\n{text}"
@@ -0,0 +1,87 @@
+"""
+Cross-tool deduplication of findings through a per-file interval sweep.
+"""
+
+from typing import Any, Dict, Iterable, List, Tuple
+
+# Rules of different tools that report the same underlying problem
+CONCERNS = {
+    "too-many-arguments": "too-many-parameters",
+    "too-many-positional-arguments": "too-many-parameters",
+    "too_many_parameters": "too-many-parameters",
+    "too-many-statements": "long-function",
+    "long_function": "long-function",
+    "too-many-branches": "complexity",
+    "too-complex": "complexity",
+    "high-cyclomatic-complexity": "complexity",
+    "magic-value-comparison": "magic-number",
+    "magic_number": "magic-number",
+    "too-many-lines": "large-module",
+}
+
+# Lower wins when choosing which of several duplicates to keep
+SEVERITY_RANK = {
+    "critical": 0, "high": 1, "error": 1, "medium": 2, "warning": 2,
+    "low": 3, "refactor": 3, "convention": 3, "info": 4
+}
+
+
+def _span(finding: Any) -> Tuple[int, int]:
+    start = finding.get("line") or 0
+    return start, max(start, finding.get("end_line") or start)
+
+
+def merge_duplicates(findings: Iterable[Any]) -> List[Tuple[Any, List[Any]]]:
+    """
+    Group near-duplicate findings reported by different tools.
+
+    Findings with the same id are exact duplicates. Findings whose rules map
+    to the same concern in the same file are near-duplicates when their line
+    intervals overlap and they come from different tools. Each (file,
+    concern) bucket is sorted once and swept, so the cost is O(n log n).
+
+    Returns:
+        (kept finding, findings merged into it) pairs, in input order
+    """
+    kept: List[Tuple[int, Any, List[Any]]] = []
+    seen_ids = set()
+    buckets: Dict[Tuple[str, str], List[Tuple[int, Any]]] = {}
+
+    for index, finding in enumerate(findings):
+        finding_id = finding.get("id")
+        if finding_id is not None:
+            if finding_id in seen_ids:
+                continue
+            seen_ids.add(finding_id)
+        concern = CONCERNS.get(finding.get("rule_id"))
+        if concern is None:
+            kept.append((index, finding, []))
+        else:
+            buckets.setdefault((finding.get("file"), concern), []).append((index, finding))
+
+    for bucket in buckets.values():
+        bucket.sort(key=lambda item: _span(item[1]))
+        cluster: List[Tuple[int, Any]] = []
+        cluster_end = -1
+        for item in bucket:
+            start, end = _span(item[1])
+            if cluster and start > cluster_end:
+                kept.extend(_resolve(cluster))
+                cluster = []
+            cluster.append(item)
+            cluster_end = max(cluster_end, end) if len(cluster) > 1 else end
+        if cluster:
+            kept.extend(_resolve(cluster))
+
+    kept.sort(key=lambda item: item[0])
+    return [(finding, merged) for _, finding, merged in kept]
+
+
+def _resolve(cluster: List[Tuple[int, Any]]) -> List[Tuple[int, Any, List[Any]]]:
+    """Keep the most severe finding of a cluster and fold other tools' findings into it."""
+    if len(cluster) == 1 or len({f.get("tool") for _, f in cluster}) == 1:
+        return [(index, finding, []) for index, finding in cluster]
+    best_index, best = min(cluster, key=lambda item: (SEVERITY_RANK.get(item[1].get("severity"), 5), item[0]))
+    merged = [f for _, f in cluster if f.get("tool") != best.get("tool")]
+    same_tool = [(i, f, []) for i, f in cluster if f is not best and f.get("tool") == best.get("tool")]
+    return [(best_index, best, merged)] + same_tool
@@ -0,0 +1,164 @@
+"""
+Dense retrieval for standards sections: local embeddings in a memory-mapped matrix.
+
+NumPy is only needed when dense retrieval is switched on, so it is
+imported lazily.
+"""
+
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple
+import json
+import os
+import re
+import zlib
+
+DEFAULT_DIMENSIONS = 256
+# Chunks embedded per call to the embedding function
+EMBED_BATCH = 512
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError as e:
+        raise ImportError("Dense policy retrieval requires numpy (pip install numpy)") from e
+    return numpy
+
+
+class HashingEmbedder:
+    """Offline embedding by the hashing trick.
+
+    Each word and each character trigram of a word is hashed to a signed
+    bucket, counts are log-scaled and the vector is L2-normalized. The
+    trigrams make inflections and compounds ("password", "passwords",
+    "hardcoded_password") land close together without any model download.
+    """
+
+    def __init__(self, dimensions: int = DEFAULT_DIMENSIONS):
+        self.dimensions = dimensions
+        self.name = f"hashing-{dimensions}"
+
+    def _features(self, text: str) -> Iterable[str]:
+        for word in _WORD.findall(text.lower()):
+            yield word
+            padded = f"<{word}>"
+            for start in range(len(padded) - 2):
+                yield padded[start:start + 3]
+
+    def __call__(self, texts: Sequence[str]):
+        np = _numpy()
+        matrix = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            buckets = np.fromiter((zlib.crc32(feature.encode()) for feature in self._features(text)),
+                                  dtype=np.uint32)
+            # The top bit picks the sign, so collisions tend to cancel out
+            signs = np.where(buckets & 0x80000000, -1.0, 1.0).astype(np.float32)
+            np.add.at(matrix[row], buckets % self.dimensions, signs)
+        matrix = np.sign(matrix) * np.log1p(np.abs(matrix))
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (matrix / norms).astype(np.float32)
+
+
+# An embedder maps N texts to an (N, dimensions) float32 array and has a
+# ``name`` that changes whenever its vectors would
+Embedder = Callable[[Sequence[str]], "numpy.ndarray"]
+
+
+class DenseIndex:
+    """Chunk embeddings stored as a float32 matrix memory-mapped from disk.
+
+    ``<prefix>.vectors.npy`` holds one L2-normalized row per chunk and
+    ``<prefix>.ids.npy`` the chunk id of each row. ``sync`` keeps the rows
+    of chunks that still exist and only embeds new ones; switching
+    embedders rebuilds everything. Queries are a single matrix-vector dot
+    product followed by a partial sort.
+    """
+
+    def __init__(self, prefix: str, embedder: Optional[Embedder] = None):
+        self.embedder = embedder or HashingEmbedder()
+        self.vectors_path = prefix + ".vectors.npy"
+        self.ids_path = prefix + ".ids.npy"
+        self.meta_path = prefix + ".meta.json"
+        self._vectors = None
+        self._ids = None
+        self.embedded = 0
+
+    def _signature(self) -> str:
+        return getattr(self.embedder, "name", type(self.embedder).__name__)
+
+    def _load(self):
+        np = _numpy()
+        if self._vectors is not None:
+            return
+        try:
+            with open(self.meta_path) as f:
+                meta = json.load(f)
+            if meta.get("embedder") != self._signature():
+                return
+            self._ids = np.load(self.ids_path)
+            self._vectors = np.load(self.vectors_path, mmap_mode="r")
+        except (OSError, ValueError):
+            self._ids = self._vectors = None
+
+    def sync(self, chunks: Iterable[Tuple[int, str]]) -> int:
+        """
+        Make the index hold exactly ``chunks`` ((chunk id, text) pairs).
+
+        Returns:
+            Number of chunks that had to be embedded
+        """
+        np = _numpy()
+        self._load()
+        chunks = list(chunks)
+        ids = np.array([chunk_id for chunk_id, _ in chunks], dtype=np.int64)
+        if self._ids is not None and np.array_equal(self._ids, ids):
+            return 0
+
+        old_rows = {} if self._ids is None else {int(i): row for row, i in enumerate(self._ids)}
+        missing = [(row, text) for row, (chunk_id, text) in enumerate(chunks) if chunk_id not in old_rows]
+        dimensions = None
+        new_vectors = []
+        for start in range(0, len(missing), EMBED_BATCH):
+            batch = self.embedder([text for _, text in missing[start:start + EMBED_BATCH]])
+            new_vectors.append(np.asarray(batch, dtype=np.float32))
+            dimensions = batch.shape[1]
+        if dimensions is None:
+            dimensions = self._vectors.shape[1] if self._vectors is not None and len(self._vectors) else 1
+
+        tmp_vectors = self.vectors_path + ".tmp.npy"
+        matrix = np.lib.format.open_memmap(tmp_vectors, mode="w+", dtype=np.float32,
+                                           shape=(len(chunks), dimensions))
+        if new_vectors:
+            matrix[[row for row, _ in missing]] = np.concatenate(new_vectors)
+        kept = [(row, old_rows[chunk_id]) for row, (chunk_id, _) in enumerate(chunks) if chunk_id in old_rows]
+        if kept:
+            matrix[[row for row, _ in kept]] = self._vectors[[old for _, old in kept]]
+        matrix.flush()
+        del matrix
+        self._vectors = None
+
+        tmp_ids = self.ids_path + ".tmp.npy"
+        np.save(tmp_ids, ids)
+        os.replace(tmp_vectors, self.vectors_path)
+        os.replace(tmp_ids, self.ids_path)
+        with open(self.meta_path, "w") as f:
+            json.dump({"embedder": self._signature(), "count": len(chunks)}, f)
+
+        self._ids = ids
+        self._vectors = np.load(self.vectors_path, mmap_mode="r")
+        self.embedded += len(missing)
+        return len(missing)
+
+    def search(self, query: str, k: int = 5) -> List[Tuple[int, float]]:
+        """Top ``k`` (chunk id, cosine similarity) pairs for ``query``."""
+        np = _numpy()
+        self._load()
+        if self._vectors is None or not len(self._vectors) or k <= 0:
+            return []
+        scores = self._vectors @ self.embedder([query])[0]
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(self._ids[row]), float(scores[row])) for row in top if scores[row] > 0]
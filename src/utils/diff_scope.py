@@ -0,0 +1,77 @@
+"""
+Changed-line ranges of a diff, used to keep diff reviews to what changed.
+"""
+
+from typing import Dict, List, Optional, Tuple
+import bisect
+import re
+
+_HUNK_HEADER = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@")
+
+
+def parse_unified_diff(diff_text: str) -> Dict[str, List[Tuple[int, int]]]:
+    """
+    Extract the changed line ranges of the new side of a ``git diff -U0``.
+
+    A hunk that only deletes lines is recorded as the single line it was
+    removed after, so the code around a deletion still counts as touched.
+    Deleted files and binary files have no new side and are left out.
+
+    Returns:
+        Mapping of file path to inclusive (start, end) ranges in file order
+    """
+    ranges: Dict[str, List[Tuple[int, int]]] = {}
+    current = None
+    for line in diff_text.splitlines():
+        if line.startswith("+++ "):
+            target = line[4:]
+            current = None if target == "/dev/null" else target[2:] if target.startswith("b/") else target
+            if current is not None:
+                ranges.setdefault(current, [])
+            continue
+        if current is None or not line.startswith("@@"):
+            continue
+        match = _HUNK_HEADER.match(line)
+        if not match:
+            continue
+        start = int(match.group(1))
+        count = 1 if match.group(2) is None else int(match.group(2))
+        if count == 0:
+            ranges[current].append((max(start, 1), max(start, 1)))
+        else:
+            ranges[current].append((start, start + count - 1))
+    return ranges
+
+
+class ChangedLines:
+    """Per-file changed ranges with fast overlap queries.
+
+    Files without an entry are treated as entirely changed, so a review
+    without diff information keeps every finding.
+    """
+
+    def __init__(self, ranges: Optional[Dict[str, List]] = None):
+        self._starts: Dict[str, List[int]] = {}
+        self._ends: Dict[str, List[int]] = {}
+        for file_path, file_ranges in (ranges or {}).items():
+            merged: List[List[int]] = []
+            for start, end in sorted(file_ranges):
+                if merged and start <= merged[-1][1] + 1:
+                    merged[-1][1] = max(merged[-1][1], end)
+                else:
+                    merged.append([start, end])
+            self._starts[file_path] = [r[0] for r in merged]
+            self._ends[file_path] = [r[1] for r in merged]
+
+    def __bool__(self) -> bool:
+        return bool(self._starts)
+
+    def overlaps(self, file_path: str, start: int, end: Optional[int] = None) -> bool:
+        """Whether lines ``start``..``end`` of ``file_path`` intersect a changed range."""
+        starts = self._starts.get(file_path)
+        if starts is None:
+            return True
+        end = start if end is None else max(start, end)
+        # Last range starting at or before ``end``; it overlaps iff it ends at or after ``start``
+        index = bisect.bisect_right(starts, end) - 1
+        return index >= 0 and self._ends[file_path][index] >= start
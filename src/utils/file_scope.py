@@ -0,0 +1,113 @@
+"""
+Streaming file enumeration driven by include/exclude globs.
+"""
+
+from typing import Iterable, Iterator, List, Optional
+import os
+import re
+
+# Version control metadata is never reviewed, whatever the config says
+ALWAYS_EXCLUDED_DIRS = {".git", ".hg", ".svn"}
+
+_GLOB_CHARS = re.compile(r"[*?\[]")
+
+
+def glob_to_regex(pattern: str) -> str:
+    """
+    Translate a gitignore-style glob into a regular expression.
+
+    ``**/`` matches zero or more directories, ``**`` anything, ``*`` and ``?``
+    stay within one path segment.
+    """
+    pattern = pattern.strip()
+    if pattern.startswith("./"):
+        pattern = pattern[2:]
+    out = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            out.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            out.append("[^/]")
+            i += 1
+        else:
+            out.append(re.escape(pattern[i]))
+            i += 1
+    return "".join(out)
+
+
+def _compile(patterns: Iterable[str]) -> Optional[re.Pattern]:
+    patterns = [p for p in patterns or [] if p and p.strip()]
+    if not patterns:
+        return None
+    return re.compile("|".join(f"(?:{glob_to_regex(p)})" for p in patterns) + r"\Z")
+
+
+class ScopeFilter:
+    """Include/exclude globs compiled once and applied to repo-relative paths."""
+
+    def __init__(self, include_patterns: Optional[List[str]] = None,
+                 exclude_patterns: Optional[List[str]] = None):
+        self._include = _compile(include_patterns)
+        self._exclude = _compile(exclude_patterns)
+        # Literal directory prefixes of the include globs ("src/**/*.py" ->
+        # "src/"), used to skip whole subtrees no include can ever match
+        self._include_roots = None
+        if include_patterns and self._include is not None:
+            roots = []
+            for pattern in include_patterns:
+                literal = _GLOB_CHARS.split(pattern.strip(), 1)[0]
+                roots.append(literal[:literal.rfind("/") + 1])
+            self._include_roots = None if "" in roots else roots
+
+    def wants_dir(self, rel_dir: str) -> bool:
+        """Whether a directory (relative, '/'-separated) may contain in-scope files."""
+        if os.path.basename(rel_dir) in ALWAYS_EXCLUDED_DIRS:
+            return False
+        candidate = rel_dir + "/"
+        # "vendor/**" matches "vendor/" since a trailing ** may be empty
+        if self._exclude is not None and self._exclude.match(candidate):
+            return False
+        if self._include_roots is not None:
+            return any(root.startswith(candidate) or candidate.startswith(root)
+                       for root in self._include_roots)
+        return True
+
+    def wants_file(self, rel_path: str) -> bool:
+        if self._exclude is not None and self._exclude.match(rel_path):
+            return False
+        return self._include is None or bool(self._include.match(rel_path))
+
+
+def iter_scope_files(root: str, include_patterns: Optional[List[str]] = None,
+                     exclude_patterns: Optional[List[str]] = None) -> Iterator[str]:
+    """
+    Lazily yield the files under ``root`` that are in review scope.
+
+    Excluded directories are pruned before descending into them, so large
+    ignored trees (node_modules, virtualenvs, build outputs) are never
+    listed. Files are yielded in a stable, sorted order.
+
+    Args:
+        root: Repository root
+        include_patterns: Globs a file must match (all files when empty)
+        exclude_patterns: Globs that remove files and whole directories
+
+    Yields:
+        File paths joined onto ``root``
+    """
+    scope = ScopeFilter(include_patterns, exclude_patterns)
+    for dirpath, dirnames, filenames in os.walk(root):
+        rel_dir = os.path.relpath(dirpath, root).replace(os.sep, "/")
+        prefix = "" if rel_dir == "." else rel_dir + "/"
+        dirnames[:] = sorted(d for d in dirnames if scope.wants_dir(prefix + d))
+        for name in sorted(filenames):
+            if scope.wants_file(prefix + name):
+                yield os.path.join(dirpath, name)
@@ -0,0 +1,114 @@
+"""
+Append-only JSONL sink that findings are streamed to as files finish.
+"""
+
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+import json
+import os
+import threading
+
+
+class FindingsSink:
+    """Appends findings to a JSONL file, one finding per line.
+
+    Every batch is flushed as soon as it is written, so a run that dies
+    half-way still leaves every finding produced so far on disk. Listeners
+    are called with the running total after each batch (e.g. to drive a
+    live counter); they run on whichever thread wrote the batch.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+        # Ids already on disk when continuing a stream; None on a fresh one
+        self._seen: Optional[set] = None
+        self._listeners: List[Callable[[int], None]] = []
+        self._lock = threading.Lock()
+
+    def reset(self):
+        """Start a new, empty stream."""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._lock:
+            open(self.path, "w").close()
+            self.count = 0
+            self._seen = None
+
+    def resume(self):
+        """
+        Continue an existing stream, e.g. when a review is resumed.
+
+        The file is rewritten without a torn last line, and findings whose
+        id is already in it are not written again, so a node re-run after
+        an interruption does not duplicate what it streamed the first time.
+        """
+        findings = list(read_findings(self.path))
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._lock:
+            with open(self.path, "w", encoding="utf-8") as f:
+                f.writelines(json.dumps(finding, default=str) + "\n" for finding in findings)
+            self.count = len(findings)
+            self._seen = {finding["id"] for finding in findings if finding.get("id")}
+
+    def subscribe(self, listener: Callable[[int], None]):
+        self._listeners.append(listener)
+
+    def write(self, findings: Iterable[Dict]) -> int:
+        """Append a batch of findings; returns how many were written."""
+        findings = [_as_dict(finding) for finding in findings]
+        with self._lock:
+            if self._seen is not None:
+                findings = [f for f in findings if not f.get("id") or f["id"] not in self._seen]
+                self._seen.update(f["id"] for f in findings if f.get("id"))
+            lines = [json.dumps(finding, default=str) + "\n" for finding in findings]
+            if not lines:
+                return 0
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.writelines(lines)
+            self.count += len(lines)
+            total = self.count
+        for listener in self._listeners:
+            listener(total)
+        return len(lines)
+
+    def read(self) -> Iterator[Dict]:
+        return read_findings(self.path)
+
+
+def _as_dict(finding) -> Dict:
+    # Compact finding records convert themselves back to the dict shape
+    to_dict = getattr(finding, "to_dict", None)
+    return to_dict() if to_dict is not None else finding
+
+
+def read_findings(path: str) -> Iterator[Dict]:
+    """
+    Lazily read the findings of a JSONL stream.
+
+    A torn last line, left behind when a run was killed mid-write, is
+    skipped rather than failing the whole read.
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+_sinks: Dict[str, FindingsSink] = {}
+_sinks_lock = threading.Lock()
+
+
+def get_findings_sink(path: Optional[str]) -> Optional[FindingsSink]:
+    """Process-wide sink for ``path``, or None when streaming is off."""
+    if not path:
+        return None
+    key = os.path.abspath(path)
+    with _sinks_lock:
+        if key not in _sinks:
+            _sinks[key] = FindingsSink(path)
+        return _sinks[key]
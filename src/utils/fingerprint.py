@@ -0,0 +1,109 @@
+"""
+Deterministic finding fingerprints.
+
+A fingerprint identifies a finding across runs: it hashes the file path
+relative to the repository, the rule, the normalized source line and the
+enclosing symbol, but not the line number, so unrelated edits that shift
+code up or down keep it stable.
+"""
+
+from typing import Dict, FrozenSet, List, Optional, Tuple
+import ast
+import hashlib
+import tokenize
+from utils.baseline import parse_suppressions
+
+# Bump whenever annotate_context changes the keys it adds to tool results
+CONTEXT_VERSION = "2"
+
+_SCOPES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+
+def normalize_context(line: str) -> str:
+    """Whitespace-insensitive form of a source line."""
+    return " ".join(line.split())
+
+
+class SymbolIndex:
+    """Dotted name of the innermost function or class around every line."""
+
+    def __init__(self, tree: ast.Module, line_count: int):
+        self._symbols: List[str] = [""] * (line_count + 2)
+        stack = [(node, "") for node in reversed(tree.body)]
+        while stack:
+            node, outer = stack.pop()
+            if isinstance(node, _SCOPES):
+                name = f"{outer}.{node.name}" if outer else node.name
+                # Outer scopes are filled first, inner ones overwrite them
+                start = min([node.lineno] + [d.lineno for d in node.decorator_list])
+                end = min(node.end_lineno, line_count + 1)
+                self._symbols[start:end + 1] = [name] * (end - start + 1)
+                outer = name
+            stack.extend((child, outer) for child in reversed(list(ast.iter_child_nodes(node))))
+
+    def symbol_at(self, line: int) -> str:
+        return self._symbols[line] if 0 <= line < len(self._symbols) else ""
+
+
+def _file_annotations(parsed) -> Tuple[SymbolIndex, Dict[int, FrozenSet[str]]]:
+    """Symbol index and inline suppressions of a file.
+
+    A file that does not parse (pylint still reports its syntax error) has
+    no symbols, and one that does not tokenize has no suppressions.
+    """
+    try:
+        symbols = SymbolIndex(parsed.tree, len(parsed.lines))
+    except (SyntaxError, ValueError):
+        symbols = SymbolIndex(ast.Module(body=[], type_ignores=[]), len(parsed.lines))
+    try:
+        suppressions = parse_suppressions(parsed)
+    except (SyntaxError, tokenize.TokenError, ValueError):
+        suppressions = {}
+    return symbols, suppressions
+
+
+def annotate_context(items: List[Dict], parsed, line_key: str = "line") -> List[Dict]:
+    """
+    Add ``scope`` (enclosing symbol) and ``context`` to per-line tool results,
+    and ``suppressed`` (rule names, or "*") on lines with an inline
+    ``# codeguardian: ignore`` comment.
+
+    Done while the tool result is computed, so the keys are stored in the
+    result cache and cache hits can be fingerprinted and filtered without
+    reading the file again. Error entries are left untouched.
+    """
+    symbols = suppressions = None
+    for item in items:
+        if "error" in item:
+            continue
+        if symbols is None:
+            symbols, suppressions = _file_annotations(parsed)
+        line = item.get(line_key) or 0
+        text = parsed.lines[line - 1] if 0 < line <= len(parsed.lines) else ""
+        item["scope"] = symbols.symbol_at(line)
+        item["context"] = hashlib.sha1(normalize_context(text).encode()).hexdigest()[:16]
+        if line in suppressions:
+            item["suppressed"] = sorted(suppressions[line])
+    return items
+
+
+class Fingerprinter:
+    """Issues fingerprints for the findings of one file.
+
+    Identical findings in the same symbol (say, the same literal on two
+    lines of one function) get an occurrence number, in the order they are
+    issued, so they stay distinct.
+    """
+
+    def __init__(self, rel_path: str):
+        self.rel_path = rel_path.replace("\\", "/")
+        self._seen: Dict[str, int] = {}
+
+    def make(self, rule_id: str, context: Optional[str] = "", symbol: Optional[str] = "") -> str:
+        raw = "\0".join([self.rel_path, rule_id, context or "", symbol or ""])
+        occurrence = self._seen.get(raw, 0)
+        self._seen[raw] = occurrence + 1
+        if occurrence:
+            raw += f"\0{occurrence}"
+        return hashlib.sha1(raw.encode()).hexdigest()[:20]
+
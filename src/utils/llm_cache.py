@@ -0,0 +1,96 @@
+"""
+Persistent prompt to response cache for LLM calls.
+"""
+
+from typing import Any, Dict, Optional
+import hashlib
+import json
+import os
+import threading
+import time
+
+from utils.result_cache import ResultCache
+
+DEFAULT_MAX_SIZE_MB = 128
+DEFAULT_TTL_HOURS = 168
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class LLMResponseCache(ResultCache):
+    """Result cache for LLM responses, with entries that expire.
+
+    Keys combine the model, the temperature, a hash of the prompt template
+    and a hash of the rendered inputs, so editing a template or switching
+    models is a plain cache miss. Size eviction, WAL mode and sharing
+    between worker processes come from ResultCache; on top of that entries
+    older than ``ttl_seconds`` are treated as misses and removed.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_size_mb: Optional[int] = None,
+                 ttl_seconds: Optional[float] = None):
+        if max_size_mb is None:
+            max_size_mb = int(os.getenv("LLM_CACHE_MAX_SIZE_MB", DEFAULT_MAX_SIZE_MB))
+        super().__init__(cache_dir, max_size_mb, filename="llm_responses.sqlite")
+        if ttl_seconds is None:
+            ttl_seconds = float(os.getenv("LLM_CACHE_TTL_HOURS", DEFAULT_TTL_HOURS)) * 3600
+        self.ttl_seconds = ttl_seconds
+        self.expired = 0
+
+    @staticmethod
+    def response_key(model: str, temperature: Any, template: str, inputs: Any = None) -> str:
+        inputs_text = json.dumps(inputs, sort_keys=True, default=str)
+        raw = "\0".join([model, repr(temperature), _digest(template), _digest(inputs_text)])
+        return _digest(raw)
+
+    def _is_expired(self, created: float) -> bool:
+        return self.ttl_seconds > 0 and time.time() - created > self.ttl_seconds
+
+    def get(self, key: str) -> Optional[str]:
+        row = self._execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+        entry = json.loads(row[0]) if row is not None else None
+        if entry is not None and self._is_expired(entry["created"]):
+            self._execute("DELETE FROM entries WHERE key = ?", (key,))
+            self.expired += 1
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+        return entry["response"]
+
+    def put(self, key: str, response: str):
+        super().put(key, {"response": response, "created": time.time()})
+
+    def prune_expired(self) -> int:
+        """Remove every expired entry; returns how many were removed."""
+        if self.ttl_seconds <= 0:
+            return 0
+        stale = [(key,) for key, value in self._execute("SELECT key, value FROM entries").fetchall()
+                 if self._is_expired(json.loads(value)["created"])]
+        self._connection().executemany("DELETE FROM entries WHERE key = ?", stale)
+        self.expired += len(stale)
+        return len(stale)
+
+    def stats(self) -> Dict[str, int]:
+        stats = super().stats()
+        stats["expired"] = self.expired
+        return stats
+
+
+_llm_cache: Optional[LLMResponseCache] = None
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_response_cache() -> Optional[LLMResponseCache]:
+    """Shared LLM response cache, or None when caching is disabled via ENABLE_CACHE."""
+    global _llm_cache
+    if os.getenv("ENABLE_CACHE", "true").lower() in ("0", "false", "no"):
+        return None
+    with _llm_cache_lock:
+        if _llm_cache is None:
+            _llm_cache = LLMResponseCache()
+        return _llm_cache
@@ -0,0 +1,281 @@
+"""
+Shared LLM client layer: concurrency limit, rate limit, retries and single-flight.
+"""
+
+from typing import Any, Callable, Dict, Optional, Type
+import asyncio
+import json
+import os
+import threading
+import time
+
+from utils.llm_cache import LLMResponseCache, get_llm_response_cache
+from tenacity import AsyncRetrying, retry_if_exception, stop_after_attempt, wait_random_exponential
+
+DEFAULT_MODEL = "gemini-2.0-flash-exp"
+
+# Errors that no amount of retrying will fix
+_PERMANENT_ERRORS = (ImportError, TypeError, ValueError, NotImplementedError)
+
+
+class GeminiBackend:
+    """Google Gemini through langchain-google-genai, imported on first use."""
+
+    def __init__(self, model: str = DEFAULT_MODEL, temperature: float = 0.1):
+        self.model = model
+        self.temperature = temperature
+        self._client = None
+
+    async def complete(self, prompt: Any, **kwargs) -> str:
+        if self._client is None:
+            from langchain_google_genai import ChatGoogleGenerativeAI
+            self._client = ChatGoogleGenerativeAI(model=self.model, temperature=self.temperature)
+        response = await self._client.ainvoke(prompt, **kwargs)
+        return response.content
+
+
+class FakeBackend:
+    """Offline backend for tests and load tests.
+
+    Answers after ``latency`` seconds with ``responder(prompt)`` (an echo by
+    default). With a ``gate`` (a threading.Event) calls also wait until it
+    is set, so tests control when answers come back. The first
+    ``failures`` calls raise ConnectionError, to exercise retries. Records
+    how many calls ran and the peak concurrency.
+    """
+
+    def __init__(self, latency: float = 0.0, responder: Optional[Callable[[Any], str]] = None,
+                 failures: int = 0, model: str = "fake", temperature: float = 0.0,
+                 gate: Optional[threading.Event] = None):
+        self.latency = latency
+        self.gate = gate
+        self.responder = responder or (lambda prompt: f"echo: {prompt}")
+        self.failures = failures
+        self.model = model
+        self.temperature = temperature
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+
+    async def complete(self, prompt: Any, **kwargs) -> str:
+        self.calls += 1
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.latency)
+            while self.gate is not None and not self.gate.is_set():
+                await asyncio.sleep(0.001)
+            if self.failures > 0:
+                self.failures -= 1
+                raise ConnectionError("fake backend failure")
+            return self.responder(prompt)
+        finally:
+            self.active -= 1
+
+
+# Backends selectable through LLM_BACKEND
+BACKENDS: Dict[str, Type] = {"gemini": GeminiBackend, "fake": FakeBackend}
+
+
+class TokenBucket:
+    """Async token bucket: ``rate`` requests per second with bursts up to ``capacity``.
+
+    A rate of 0 or less disables the limit.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class LLMGateway:
+    """Process-wide entry point for LLM calls.
+
+    Every request passes through a concurrency semaphore and a token-bucket
+    rate limiter, and is retried with jittered exponential backoff on
+    transient errors. Identical requests that are in flight at the same
+    time share one backend call (single-flight), and with a ``cache``
+    (an LLMResponseCache) answers are reused across runs.
+
+    Graph nodes run in worker threads while the CLI runs its own event
+    loop, so the gateway keeps its limits on a private event loop thread;
+    ``generate`` can be awaited from any loop and ``generate_sync`` called
+    from any thread.
+    """
+
+    def __init__(self, backend, max_concurrency: int = 4, requests_per_minute: float = 60,
+                 max_retries: int = 4, max_wait: float = 30.0, cache=None):
+        self.backend = backend
+        self.cache = cache
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max(1, max_retries)
+        self.max_wait = max_wait
+        self._bucket = TokenBucket(requests_per_minute / 60.0, capacity=self.max_concurrency)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
+        self.stats = {"requests": 0, "calls": 0, "coalesced": 0, "cached": 0, "retries": 0, "failures": 0}
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._loop_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="llm-gateway", daemon=True).start()
+                self._loop = loop
+            return self._loop
+
+    def request_key(self, template: str, inputs: Any = None, **kwargs) -> str:
+        """Identity of a request: model, temperature, template, inputs and call options."""
+        return LLMResponseCache.response_key(
+            getattr(self.backend, "model", ""), getattr(self.backend, "temperature", None),
+            template, [inputs, kwargs] if kwargs else inputs
+        )
+
+    async def generate(self, prompt: Any, **kwargs) -> str:
+        """Completion for ``prompt``; awaitable from any event loop."""
+        return await self._submit(prompt, _template_text(prompt), None, kwargs)
+
+    def generate_sync(self, prompt: Any, **kwargs) -> str:
+        """Blocking form of ``generate`` for synchronous graph nodes."""
+        return self._submit_sync(prompt, _template_text(prompt), None, kwargs)
+
+    async def generate_from_template(self, template: Any, inputs: Dict[str, Any], **kwargs) -> str:
+        """
+        Render ``template`` (a format string or a LangChain prompt template)
+        with ``inputs`` and complete it. The cache key hashes the template
+        and the inputs separately, so one template edit invalidates exactly
+        the answers it produced.
+        """
+        return await self._submit(_render(template, inputs), _template_text(template), inputs, kwargs)
+
+    def generate_from_template_sync(self, template: Any, inputs: Dict[str, Any], **kwargs) -> str:
+        """Blocking form of ``generate_from_template``."""
+        return self._submit_sync(_render(template, inputs), _template_text(template), inputs, kwargs)
+
+    async def _submit(self, prompt, template: str, inputs, kwargs) -> str:
+        future = asyncio.run_coroutine_threadsafe(self._generate(prompt, template, inputs, kwargs),
+                                                  self._ensure_loop())
+        return await asyncio.wrap_future(future)
+
+    def _submit_sync(self, prompt, template: str, inputs, kwargs) -> str:
+        return asyncio.run_coroutine_threadsafe(self._generate(prompt, template, inputs, kwargs),
+                                                self._ensure_loop()).result()
+
+    async def _generate(self, prompt: Any, template: str, inputs: Any, kwargs: Dict[str, Any]) -> str:
+        # Runs on the gateway loop, so the in-flight table needs no lock
+        self.stats["requests"] += 1
+        key = self.request_key(template, inputs, **kwargs)
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.stats["cached"] += 1
+                return cached
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(pending)
+
+        pending = asyncio.ensure_future(self._call(prompt, **kwargs))
+        self._inflight[key] = pending
+        try:
+            response = await asyncio.shield(pending)
+        finally:
+            if self._inflight.get(key) is pending:
+                del self._inflight[key]
+        if self.cache is not None and isinstance(response, str):
+            self.cache.put(key, response)
+        return response
+
+    async def _call(self, prompt: Any, **kwargs) -> str:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        retrying = AsyncRetrying(
+            stop=stop_after_attempt(self.max_retries),
+            wait=wait_random_exponential(multiplier=0.5, max=self.max_wait),
+            retry=retry_if_exception(lambda e: not isinstance(e, _PERMANENT_ERRORS)),
+            reraise=True
+        )
+        try:
+            async for attempt in retrying:
+                with attempt:
+                    if attempt.retry_state.attempt_number > 1:
+                        self.stats["retries"] += 1
+                    async with self._semaphore:
+                        await self._bucket.acquire()
+                        self.stats["calls"] += 1
+                        return await self.backend.complete(prompt, **kwargs)
+        except Exception:
+            self.stats["failures"] += 1
+            raise
+
+    def close(self):
+        """Stop the gateway loop; later calls start a new one."""
+        with self._loop_lock:
+            loop, self._loop = self._loop, None
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
+        # Loop-bound primitives are recreated on the next loop
+        self._semaphore = None
+        self._bucket._lock = None
+        self._inflight = {}
+
+
+def _template_text(template: Any) -> str:
+    if isinstance(template, str):
+        return template
+    pretty_repr = getattr(template, "pretty_repr", None)
+    if pretty_repr is not None:
+        return pretty_repr()
+    return json.dumps(template, sort_keys=True, default=str)
+
+
+def _render(template: Any, inputs: Dict[str, Any]) -> Any:
+    if isinstance(template, str):
+        return template.format(**inputs)
+    return template.format_messages(**inputs)
+
+
+_gateway: Optional[LLMGateway] = None
+_gateway_lock = threading.Lock()
+
+
+def get_llm_gateway() -> LLMGateway:
+    """Shared gateway, configured from the LLM_* environment variables."""
+    global _gateway
+    with _gateway_lock:
+        if _gateway is None:
+            backend_name = os.getenv("LLM_BACKEND", "gemini").lower()
+            if backend_name not in BACKENDS:
+                raise ValueError(f"Unknown LLM_BACKEND '{backend_name}' (choose from {', '.join(BACKENDS)})")
+            backend = BACKENDS[backend_name](
+                model=os.getenv("LLM_MODEL", DEFAULT_MODEL),
+                temperature=float(os.getenv("LLM_TEMPERATURE", "0.1"))
+            )
+            _gateway = LLMGateway(
+                backend,
+                max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "4")),
+                requests_per_minute=float(os.getenv("LLM_REQUESTS_PER_MINUTE", "60")),
+                max_retries=int(os.getenv("LLM_MAX_RETRIES", "4")),
+                cache=get_llm_response_cache()
+            )
+        return _gateway
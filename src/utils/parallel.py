@@ -0,0 +1,125 @@
+"""
+Process-pool fan-out for per-file analysis work.
+"""
+
+from typing import Any, Callable, Iterable, Iterator, Optional, Tuple, Union
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from collections import deque
+import atexit
+import multiprocessing
+import os
+import threading
+
+# Futures kept in flight per worker, so results stream back in input order
+# without materializing the whole file list as pending work.
+WINDOW_PER_WORKER = 4
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_jobs = 0
+_executor_lock = threading.Lock()
+
+
+def default_jobs() -> int:
+    """Number of worker processes used when --jobs is not given."""
+    return os.cpu_count() or 1
+
+
+def _get_executor(jobs: int) -> ProcessPoolExecutor:
+    """Long-lived pool shared by every node of the review."""
+    global _executor, _executor_jobs
+    with _executor_lock:
+        if _executor is None or _executor_jobs != jobs:
+            if _executor is not None:
+                _executor.shutdown(wait=False, cancel_futures=True)
+            # LangGraph runs sync nodes on threads; forking a threaded parent
+            # can deadlock, so workers are always spawned fresh.
+            _executor = ProcessPoolExecutor(
+                max_workers=jobs, mp_context=multiprocessing.get_context("spawn")
+            )
+            _executor_jobs = jobs
+        return _executor
+
+
+def _discard_executor(broken: ProcessPoolExecutor):
+    global _executor
+    with _executor_lock:
+        if _executor is broken:
+            _executor = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_pool():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True, cancel_futures=True)
+            _executor = None
+
+
+atexit.register(shutdown_pool)
+
+
+def _item_args(item: Union[str, tuple]) -> tuple:
+    return item if isinstance(item, tuple) else (item,)
+
+
+def _run_isolated(func: Callable, item: Union[str, tuple], args: tuple) -> Tuple[Any, Optional[str]]:
+    try:
+        return func(*_item_args(item), *args), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+def map_files(func: Callable, files: Iterable[Union[str, tuple]], *args,
+              jobs: Optional[int] = None) -> Iterator[Tuple[str, Any, Optional[str]]]:
+    """
+    Apply ``func(file_path, *args)`` to every file across worker processes.
+
+    Args:
+        func: Module-level (picklable) per-file function
+        files: File paths to process, or ``(file_path, *file_args)`` tuples
+            whose extra values are passed right after the path
+        args: Extra positional arguments passed to every call
+        jobs: Worker process count; 1 runs inline in this process
+
+    Yields:
+        (file_path, result, error) in the same order as ``files``. A file whose
+        analysis raised, or whose worker died, yields ``result=None`` and the
+        error message instead of aborting the whole batch.
+    """
+    jobs = jobs or default_jobs()
+    if jobs <= 1:
+        for item in files:
+            result, error = _run_isolated(func, item, args)
+            yield _item_args(item)[0], result, error
+        return
+
+    pending = deque()
+
+    def submit(item):
+        executor = _get_executor(jobs)
+        try:
+            return executor.submit(_run_isolated, func, item, args)
+        except BrokenProcessPool:
+            _discard_executor(executor)
+            return _get_executor(jobs).submit(_run_isolated, func, item, args)
+
+    def drain_one():
+        file_path, future = pending.popleft()
+        try:
+            result, error = future.result()
+        except BrokenProcessPool as e:
+            # A worker died (segfault, OOM kill); every in-flight file is lost
+            # with it, and the next submission replaces the pool.
+            result, error = None, f"Worker process crashed: {e}"
+        except Exception as e:
+            result, error = None, f"{type(e).__name__}: {e}"
+        return file_path, result, error
+
+    for item in files:
+        pending.append((_item_args(item)[0], submit(item)))
+        if len(pending) >= jobs * WINDOW_PER_WORKER:
+            yield drain_one()
+    while pending:
+        yield drain_one()
@@ -1,36 +1,331 @@
 """
 RAG Engine for policy-based code review.
+
+Standards documents are split into sections and kept in an on-disk BM25
+inverted index, which is updated incrementally as documents change.
 """
 
-from typing import List, Dict, Any
+from typing import Dict, Iterator, List, Optional, Tuple
+from collections import Counter
+import hashlib
+import math
 import os
+import re
+import sqlite3
+import threading
+
+# Documents the engine can read as text
+STANDARD_SUFFIXES = (".md", ".markdown", ".txt", ".rst")
+# Sections longer than this are split at paragraph boundaries
+MAX_CHUNK_WORDS = 250
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Bump when the index schema changes; older index files are left unused
+INDEX_VERSION = 2
+# Retrieval modes: BM25 over the inverted index, or embedding similarity
+RETRIEVAL_MODES = ("lexical", "dense")
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_MD_HEADING = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+_RST_UNDERLINE = re.compile(r"^([=\-~^\"'`#*+])\1{2,}\s*$")
+_TRIGGER_LINE = re.compile(r"^\s*[*-]?\s*triggers?\s*:\s*(.+)$", re.IGNORECASE | re.MULTILINE)
+_CODE_SPAN = re.compile(r"`([^`\n]{3,})`")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from in into is it its of on or that the this to with".split()
+)
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS documents (
+        path TEXT PRIMARY KEY,
+        mtime REAL NOT NULL,
+        size INTEGER NOT NULL,
+        sha TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS chunks (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        path TEXT NOT NULL,
+        section TEXT NOT NULL,
+        line INTEGER NOT NULL,
+        text TEXT NOT NULL,
+        length INTEGER NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS chunks_path ON chunks (path)",
+    """
+    CREATE TABLE IF NOT EXISTS postings (
+        term TEXT NOT NULL,
+        chunk_id INTEGER NOT NULL,
+        tf INTEGER NOT NULL,
+        PRIMARY KEY (term, chunk_id)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS postings_chunk ON postings (chunk_id)",
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased word tokens; identifiers split at underscores."""
+    return [token for token in _TOKEN.findall(text.lower()) if token not in _STOPWORDS]
+
+
+def policy_triggers(text: str) -> List[str]:
+    """
+    Code fragments whose presence in a file makes a policy section apply.
+
+    They come from ``Triggers: a, b`` lines and from inline code spans
+    such as a backticked ``cursor.execute(``, in order of appearance. A section without any
+    only serves as context.
+    """
+    triggers: List[str] = []
+    for match in _TRIGGER_LINE.finditer(text):
+        triggers.extend(part.strip().strip("`'\"") for part in match.group(1).split(","))
+    triggers.extend(match.group(1).strip() for match in _CODE_SPAN.finditer(text))
+    return [t for t in dict.fromkeys(triggers) if t]
+
+
+def split_sections(text: str) -> Iterator[Tuple[str, int, str]]:
+    """
+    Split a document into (section title, first line, text) chunks.
+
+    Markdown ``#`` headings and reStructuredText underlined titles start a
+    new section; the title includes its parent headings. Nothing inside a
+    ``` fence counts as a heading. Sections over MAX_CHUNK_WORDS are cut
+    at blank lines.
+    """
+    lines = text.splitlines()
+    headings: List[Tuple[int, str]] = []
+    title, start, body = "", 1, []
+    in_fence = False
+    index = 0
+    while index < len(lines):
+        line = lines[index]
+        if line.lstrip().startswith("```"):
+            in_fence = not in_fence
+        heading = None if in_fence else _MD_HEADING.match(line)
+        level = None
+        if heading:
+            level, name = len(heading.group(1)), heading.group(2)
+        elif (not in_fence and index + 1 < len(lines) and line.strip() and _RST_UNDERLINE.match(lines[index + 1])
+                and len(lines[index + 1].strip()) >= len(line.strip())):
+            level, name = 1, line.strip()
+            index += 1
+        if level is not None:
+            yield from _split_long(title, start, body)
+            headings = [h for h in headings if h[0] < level] + [(level, name)]
+            title, start, body = " > ".join(h[1] for h in headings), index + 2, []
+        else:
+            body.append(line)
+        index += 1
+    yield from _split_long(title, start, body)
+
+
+def _split_long(title: str, start: int, body: List[str]) -> Iterator[Tuple[str, int, str]]:
+    chunk: List[str] = []
+    chunk_start, words = start, 0
+    for offset, line in enumerate(body):
+        if not line.strip() and words >= MAX_CHUNK_WORDS:
+            if "".join(chunk).strip():
+                yield title, chunk_start, "\n".join(chunk).strip()
+            chunk, chunk_start, words = [], start + offset + 1, 0
+            continue
+        chunk.append(line)
+        words += len(line.split())
+    text = "\n".join(chunk).strip()
+    if text or title:
+        yield title, chunk_start, text
+
 
 class RAGEngine:
-    def __init__(self, standards_dir: str = "./standards"):
+    """Lexical retrieval over the standards directory.
+
+    The index lives in a SQLite database under CACHE_DIR, one per standards
+    directory. ``load_standards`` only re-reads documents whose size or
+    mtime changed, and only re-indexes those whose content hash changed;
+    documents that disappeared are dropped. Queries read the postings of
+    their terms and rank sections with BM25.
+
+    In ``dense`` mode sections are also embedded with ``embedder`` (see
+    utils.dense_index; a hashing embedder by default) and ranked by cosine
+    similarity, which finds policy text phrased unlike the query. Chunk ids
+    never get reused, so only new sections are embedded on re-indexing.
+    """
+
+    def __init__(self, standards_dir: str = "./standards", index_path: Optional[str] = None,
+                 mode: str = "lexical", embedder=None):
+        if mode not in RETRIEVAL_MODES:
+            raise ValueError(f"Unknown retrieval mode '{mode}' (choose from {', '.join(RETRIEVAL_MODES)})")
         self.standards_dir = standards_dir
+        self.mode = mode
         self.is_initialized = False
         if not os.path.exists(self.standards_dir):
             os.makedirs(self.standards_dir)
+        if index_path is None:
+            digest = hashlib.sha1(os.path.abspath(standards_dir).encode()).hexdigest()[:12]
+            index_path = os.path.join(os.getenv("CACHE_DIR", "./.cache"), f"standards-v{INDEX_VERSION}-{digest}.sqlite")
+        self.index_path = index_path
+        os.makedirs(os.path.dirname(os.path.abspath(index_path)), exist_ok=True)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._corpus: Optional[Tuple[int, float]] = None
+        for statement in _SCHEMA:
+            self._execute(statement)
+        self._dense = None
+        self._dense_synced = False
+        if mode == "dense":
+            from utils.dense_index import DenseIndex
+            self._dense = DenseIndex(os.path.splitext(index_path)[0] + "-dense", embedder)
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite connections must not cross threads or forked processes
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.index_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _execute(self, sql: str, params: tuple = ()) -> sqlite3.Cursor:
+        return self._connection().execute(sql, params)
+
+    def _documents(self) -> Iterator[str]:
+        for root, dirs, files in os.walk(self.standards_dir):
+            dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+            for name in sorted(files):
+                if name.lower().endswith(STANDARD_SUFFIXES):
+                    yield os.path.relpath(os.path.join(root, name), self.standards_dir).replace(os.sep, "/")
 
     def load_standards(self):
         """
-        Load and index PDF/Text standards from the standards directory.
-        In a real implementation, this would use LangChain's DirectoryLoader and VectorStore.
+        Bring the index up to date with the standards directory.
+
+        Returns a short summary of what was indexed.
+        """
+        with self._lock:
+            known = {path: (mtime, size, sha) for path, mtime, size, sha
+                     in self._execute("SELECT path, mtime, size, sha FROM documents")}
+            present = set()
+            changed = 0
+            for path in self._documents():
+                present.add(path)
+                full_path = os.path.join(self.standards_dir, path)
+                stat = os.stat(full_path)
+                previous = known.get(path)
+                if previous and previous[0] == stat.st_mtime and previous[1] == stat.st_size:
+                    continue
+                with open(full_path, "rb") as f:
+                    data = f.read()
+                sha = hashlib.sha1(data).hexdigest()
+                if previous and previous[2] == sha:
+                    self._execute("UPDATE documents SET mtime = ?, size = ? WHERE path = ?",
+                                  (stat.st_mtime, stat.st_size, path))
+                    continue
+                self._index_document(path, data.decode("utf-8", errors="replace"), stat, sha)
+                changed += 1
+            removed = set(known) - present
+            for path in removed:
+                self._drop_document(path)
+            if changed or removed:
+                self._corpus = None
+            if self._dense is not None and (changed or removed or not self._dense_synced):
+                self._dense.sync(self._execute(
+                    "SELECT id, section || char(10) || text FROM chunks ORDER BY id"
+                ).fetchall())
+                self._dense_synced = True
+            self.is_initialized = True
+        return (f"Indexed {len(present)} policy documents "
+                f"({changed} updated, {len(removed)} removed).")
+
+    def _drop_document(self, path: str, conn: Optional[sqlite3.Connection] = None):
+        conn = conn or self._connection()
+        conn.execute("DELETE FROM postings WHERE chunk_id IN (SELECT id FROM chunks WHERE path = ?)", (path,))
+        conn.execute("DELETE FROM chunks WHERE path = ?", (path,))
+        conn.execute("DELETE FROM documents WHERE path = ?", (path,))
+
+    def _index_document(self, path: str, text: str, stat: os.stat_result, sha: str):
+        conn = self._connection()
+        with conn:
+            conn.execute("BEGIN")
+            self._drop_document(path, conn)
+            for section, line, body in split_sections(text):
+                tokens = tokenize(f"{section}\n{body}")
+                if not tokens:
+                    continue
+                chunk_id = conn.execute(
+                    "INSERT INTO chunks (path, section, line, text, length) VALUES (?, ?, ?, ?, ?)",
+                    (path, section, line, body, len(tokens))
+                ).lastrowid
+                conn.executemany("INSERT INTO postings (term, chunk_id, tf) VALUES (?, ?, ?)",
+                                 [(term, chunk_id, tf) for term, tf in Counter(tokens).items()])
+            conn.execute("INSERT INTO documents (path, mtime, size, sha) VALUES (?, ?, ?, ?)",
+                         (path, stat.st_mtime, stat.st_size, sha))
+
+    def _corpus_stats(self) -> Tuple[int, float]:
+        if self._corpus is None:
+            count, total = self._execute("SELECT COUNT(*), COALESCE(SUM(length), 0) FROM chunks").fetchone()
+            self._corpus = (count, total / count if count else 0.0)
+        return self._corpus
+
+    def search(self, query: str, k: int = 5) -> List[Dict]:
         """
-        files = os.listdir(self.standards_dir)
-        # Mocking the indexing process
-        self.is_initialized = True
-        return f"Indexed {len(files)} policy documents."
+        Top ``k`` sections for ``query``, by BM25 score or, in dense mode,
+        cosine similarity.
 
-    def query_standards(self, query: str) -> str:
+        Returns:
+            Dicts with document path, section title, first line, text and score
+        """
+        if not self.is_initialized:
+            self.load_standards()
+        scored = self._dense.search(query, k) if self._dense is not None else self._bm25(query, k)
+        results = []
+        for chunk_id, score in scored:
+            path, section, line, text = self._execute(
+                "SELECT path, section, line, text FROM chunks WHERE id = ?", (chunk_id,)
+            ).fetchone()
+            results.append({"document": path, "section": section, "line": line,
+                            "text": text, "score": round(score, 4)})
+        return results
+
+    def _bm25(self, query: str, k: int) -> List[Tuple[int, float]]:
+        count, average_length = self._corpus_stats()
+        terms = set(tokenize(query))
+        if not count or not terms:
+            return []
+
+        scores: Dict[int, float] = {}
+        for term in terms:
+            postings = self._execute(
+                "SELECT p.chunk_id, p.tf, c.length FROM postings p JOIN chunks c ON c.id = p.chunk_id "
+                "WHERE p.term = ?", (term,)
+            ).fetchall()
+            if not postings:
+                continue
+            idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for chunk_id, tf, length in postings:
+                norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * length / average_length)
+                scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * tf * (BM25_K1 + 1) / norm
+
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:k]
+
+    def query_standards(self, query: str, k: int = 3) -> str:
         """
         Query the indexed standards for specific rules.
+
+        Returns the best matching sections as text, each headed by its
+        source, or an empty string when nothing matches.
         """
         if not self.is_initialized:
             return "RAG Engine not initialized with standards."
-        
-        # Mocking the retrieval process
-        return f"Policy found for: {query}. Code must follow strict encapsulation."
+        sections = []
+        for hit in self.search(query, k):
+            source = f"{hit['document']}" + (f" > {hit['section']}" if hit["section"] else "")
+            sections.append(f"[{source}]\n{hit['text']}")
+        return "\n\n".join(sections)
 
     def verify_against_policy(self, code_snippet: str, file_path: str) -> List[Dict]:
         """
@@ -39,3 +334,18 @@ class RAGEngine:
         # This would use the LLM to compare code against retrieved standard context
         findings = []
         return findings
+
+
+_engines: Dict[str, RAGEngine] = {}
+_engines_lock = threading.Lock()
+
+
+def get_rag_engine(standards_dir: str = "./standards", mode: str = "lexical") -> RAGEngine:
+    """Process-wide engine for ``standards_dir`` and ``mode``, indexed on first use."""
+    key = f"{os.path.abspath(standards_dir)}\0{mode}"
+    with _engines_lock:
+        if key not in _engines:
+            engine = RAGEngine(standards_dir, mode=mode)
+            engine.load_standards()
+            _engines[key] = engine
+        return _engines[key]
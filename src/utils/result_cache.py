@@ -0,0 +1,199 @@
+"""
+Persistent, content-addressed cache for per-file analyzer results.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from importlib import metadata
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_MAX_SIZE_MB = 512
+# How many writes happen between two size checks
+PRUNE_INTERVAL = 64
+
+
+def tool_version(package: str) -> str:
+    """Installed version of an analyzer package, part of every cache key."""
+    try:
+        return metadata.version(package)
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+class ResultCache:
+    """SQLite-backed key/value store with size-bounded LRU eviction.
+
+    Entries are keyed by file content hash, tool name, tool version and the
+    configuration section the tool depends on, so a change in any of them
+    is a plain cache miss. The database runs in WAL mode and is safe to
+    share between threads and worker processes.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_size_mb: Optional[int] = None,
+                 filename: str = "results.sqlite"):
+        self.cache_dir = cache_dir or os.getenv("CACHE_DIR", "./.cache")
+        if max_size_mb is None:
+            max_size_mb = int(os.getenv("CACHE_MAX_SIZE_MB", DEFAULT_MAX_SIZE_MB))
+        self.max_bytes = max_size_mb * 1024 * 1024
+        self.path = os.path.join(self.cache_dir, filename)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._local = threading.local()
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        self._execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._execute("CREATE INDEX IF NOT EXISTS entries_lru ON entries (last_access)")
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite connections must not cross threads or forked processes
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _execute(self, sql: str, params: tuple = ()) -> sqlite3.Cursor:
+        return self._connection().execute(sql, params)
+
+    @staticmethod
+    def make_key(content_hash: str, tool: str, version: str, config_section: Any = None) -> str:
+        section = json.dumps(config_section, sort_keys=True, default=str)
+        raw = "\0".join([content_hash, tool, version, section])
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        row = self._execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+        return json.loads(row[0])
+
+    def put(self, key: str, value: Any):
+        payload = json.dumps(value)
+        self._execute(
+            "INSERT OR REPLACE INTO entries (key, value, size, last_access) VALUES (?, ?, ?, ?)",
+            (key, payload, len(payload), time.time())
+        )
+        self._writes += 1
+        if self._writes % PRUNE_INTERVAL == 0:
+            self.prune()
+
+    def prune(self, max_bytes: Optional[int] = None) -> int:
+        """Evict least recently used entries until the cache fits in ``max_bytes``."""
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        total = self._execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= limit:
+            return 0
+
+        evicted = 0
+        rows = self._execute("SELECT key, size FROM entries ORDER BY last_access").fetchall()
+        stale = []
+        for key, size in rows:
+            if total <= limit:
+                break
+            stale.append((key,))
+            total -= size
+            evicted += 1
+        self._connection().executemany("DELETE FROM entries WHERE key = ?", stale)
+        return evicted
+
+    def clear(self):
+        self._execute("DELETE FROM entries")
+
+    def stats(self) -> Dict[str, int]:
+        entries, size = self._execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()
+        return {"entries": entries, "bytes": size, "hits": self.hits, "misses": self.misses}
+
+
+_result_cache: Optional[ResultCache] = None
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> Optional[ResultCache]:
+    """Shared result cache, or None when caching is disabled via ENABLE_CACHE."""
+    global _result_cache
+    if os.getenv("ENABLE_CACHE", "true").lower() in ("0", "false", "no"):
+        return None
+    with _result_cache_lock:
+        if _result_cache is None:
+            _result_cache = ResultCache()
+        return _result_cache
+
+
+def _storable(result: Any, cacheable: Optional[Callable[[Any], bool]]) -> bool:
+    if isinstance(result, dict):
+        failed = "error" in result
+    else:
+        failed = any(isinstance(item, dict) and "error" in item for item in result)
+    return not failed and (cacheable is None or cacheable(result))
+
+
+def cached_result(cache: Optional[ResultCache], content_hash: str, tool: str, version: str,
+                  compute: Callable[[], Any], config_section: Any = None,
+                  cacheable: Optional[Callable[[Any], bool]] = None) -> Any:
+    """Return the cached result for this file/tool pair, computing it on a miss.
+
+    Results that carry an ``error`` key, or that ``cacheable`` rejects, are
+    returned but never stored.
+    """
+    if cache is None:
+        return compute()
+
+    key = cache.make_key(content_hash, tool, version, config_section)
+    result = cache.get(key)
+    if result is not None:
+        return result
+
+    result = compute()
+    if _storable(result, cacheable):
+        cache.put(key, result)
+    return result
+
+
+def cached_results(cache: Optional[ResultCache], entries: Dict[str, Tuple[str, Any]], tool: str,
+                   version: str, compute: Callable[[List[str]], Dict[str, Any]],
+                   cacheable: Optional[Callable[[Any], bool]] = None) -> Dict[str, Any]:
+    """cached_result for a batch of files a tool processes in one call.
+
+    Args:
+        entries: (content hash, config section) of each file, by path
+        compute: Called once with the paths that missed the cache; returns
+            their results by path
+
+    Returns:
+        Result of every file in ``entries``, by path
+    """
+    if cache is None:
+        return compute(list(entries))
+
+    results, keys = {}, {}
+    for path, (content_hash, config_section) in entries.items():
+        keys[path] = cache.make_key(content_hash, tool, version, config_section)
+        result = cache.get(keys[path])
+        if result is not None:
+            results[path] = result
+    misses = [path for path in entries if path not in results]
+    if misses:
+        for path, result in compute(misses).items():
+            results[path] = result
+            if _storable(result, cacheable):
+                cache.put(keys[path], result)
+    return results
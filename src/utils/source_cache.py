@@ -0,0 +1,133 @@
+"""
+Shared source/AST cache so each file is read and parsed once per review.
+"""
+
+from typing import Dict, List, Optional
+from collections import OrderedDict
+from functools import cached_property
+import ast
+import bisect
+import hashlib
+import io
+import os
+import threading
+import tokenize
+
+
+def blob_hash(data: bytes) -> str:
+    """Content identity of a file, computed the same way git hashes blobs."""
+    digest = hashlib.sha1(b"blob %d\0" % len(data))
+    digest.update(data)
+    return digest.hexdigest()
+
+
+class ParsedFile:
+    """Source, line offsets, AST and token stream of a single file.
+
+    The AST and token stream are built on first access and then kept for
+    every later consumer of the same content.
+    """
+
+    def __init__(self, path: str, data: bytes, content_hash: Optional[str] = None):
+        self.path = path
+        self.data = data
+        self.content_hash = content_hash or blob_hash(data)
+        self.encoding, _ = tokenize.detect_encoding(io.BytesIO(data).readline)
+
+    @cached_property
+    def source(self) -> str:
+        return self.data.decode(self.encoding)
+
+    @cached_property
+    def lines(self) -> List[str]:
+        return self.source.split('\n')
+
+    @cached_property
+    def line_offsets(self) -> List[int]:
+        """Character offset at which each (1-based) line starts."""
+        offsets = [0]
+        for line in self.lines[:-1]:
+            offsets.append(offsets[-1] + len(line) + 1)
+        return offsets
+
+    @cached_property
+    def tree(self) -> ast.Module:
+        return ast.parse(self.source, filename=self.path)
+
+    @cached_property
+    def tokens(self) -> List[tokenize.TokenInfo]:
+        return list(tokenize.generate_tokens(io.StringIO(self.source).readline))
+
+    def line_at(self, offset: int) -> int:
+        """Map a character offset back to its 1-based line number."""
+        return bisect.bisect_right(self.line_offsets, offset)
+
+
+# Parsed files kept per process; each holds the source, AST and tokens
+DEFAULT_MAX_FILES = int(os.getenv("SOURCE_CACHE_MAX_FILES", "256"))
+
+
+class SourceCache:
+    """Per-review store of ParsedFile objects keyed by path and content hash.
+
+    At most ``max_files`` files are kept, least recently used first out, so
+    a long-lived worker's memory does not grow with the repository.
+    """
+
+    def __init__(self, max_files: int = DEFAULT_MAX_FILES):
+        self.max_files = max(1, max_files)
+        self._files: "OrderedDict[str, ParsedFile]" = OrderedDict()
+        self._stats: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, file_path: str, content_hash: Optional[str] = None) -> ParsedFile:
+        """Return the parsed view of ``file_path``, re-reading only on change.
+
+        ``content_hash`` is the file's git blob SHA when the caller already
+        knows it (e.g. from the git index); the read bytes are then not
+        hashed again.
+        """
+        path = os.path.abspath(file_path)
+        st = os.stat(path)
+        signature = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            cached = self._files.get(path)
+            if cached is not None and self._stats.get(path) == signature:
+                self.hits += 1
+                self._files.move_to_end(path)
+                return cached
+
+        with open(path, 'rb') as f:
+            data = f.read()
+        content_hash = content_hash or blob_hash(data)
+
+        with self._lock:
+            cached = self._files.get(path)
+            if cached is not None and cached.content_hash == content_hash:
+                self.hits += 1
+            else:
+                self.misses += 1
+                cached = ParsedFile(file_path, data, content_hash)
+                self._files[path] = cached
+            self._files.move_to_end(path)
+            self._stats[path] = signature
+            while len(self._files) > self.max_files:
+                evicted, _ = self._files.popitem(last=False)
+                self._stats.pop(evicted, None)
+            return cached
+
+    def clear(self):
+        with self._lock:
+            self._files.clear()
+            self._stats.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"files": len(self._files), "hits": self.hits, "misses": self.misses}
+
+
+source_cache = SourceCache()
@@ -36,3 +36,185 @@ def complex_function(x):
     
     assert len(comp_data) > 0
     assert comp_data[0]['complexity'] >= 4
+
+def test_pylint_worker_batches_files(tmp_path):
+    """One in-process linter handles a batch and splits messages per file."""
+    from tools.lint_worker import PylintWorker
+    clean = tmp_path / "clean.py"
+    clean.write_text('"""Clean module."""\n')
+    unused = tmp_path / "unused.py"
+    unused.write_text('"""Module."""\nimport os\n')
+
+    worker = PylintWorker()
+    results = worker.lint([str(clean), str(unused)])
+
+    assert results[str(clean)] == []
+    assert [issue["symbol"] for issue in results[str(unused)]] == ["unused-import"]
+    assert results[str(unused)][0]["line"] == 2
+
+def test_complexity_matches_radon():
+    """The native engine reports the same cyclomatic numbers as radon."""
+    radon_complexity = pytest.importorskip("radon.complexity")
+    import ast
+    import glob
+    from tools.complexity import analyze_complexity
+
+    src_dir = os.path.join(os.path.dirname(__file__), "..", "..", "src")
+    corpus = glob.glob(os.path.join(src_dir, "**", "*.py"), recursive=True)
+    corpus.append(os.path.join(os.path.dirname(__file__), "..", "test_integration", "test_full_review.py"))
+    for path in corpus:
+        with open(path) as f:
+            code = f.read()
+        ours = sorted((b["name"], b["lineno"], b["complexity"]) for b in analyze_complexity(ast.parse(code)))
+        theirs = sorted((b.name, b.lineno, b.complexity) for b in radon_complexity.cc_visit(code))
+        assert ours == theirs, path
+
+def test_cognitive_complexity_and_nesting():
+    import ast
+    from tools.complexity import analyze_complexity
+    code = """
+def f(x):
+    if x:                          # +1
+        pass
+    elif x > 1:                    # +1
+        for i in x:                # +2 (nesting 1)
+            if i and x or i:       # +3 (nesting 2), +2 boolean sequences
+                pass
+    else:                          # +1
+        if x:                      # +2 (nesting 1)
+            pass
+"""
+    block = analyze_complexity(ast.parse(code))[0]
+    assert block["complexity"] == 8
+    assert block["cognitive_complexity"] == 12
+    assert block["max_nesting"] == 3
+
+def test_smell_rules_use_config_and_cover_async(tmp_path):
+    from tools.code_analysis import find_code_smells
+    test_file = tmp_path / "smelly.py"
+    test_file.write_text(
+        "async def fetch(a, b, c, d, e, f):\n" + "\n".join(f"    await a({i})" for i in range(12)) + "\n"
+        "class Big:\n" + "\n".join(f"    x{i} = {i}" for i in range(12)) + "\n"
+    )
+
+    smells, timings = find_code_smells(str(test_file), {"max_function_lines": 10, "max_class_lines": 10})
+
+    assert {(s["type"], s["line"]) for s in smells if s["type"] != "magic_number"} == {
+        ("long_function", 1), ("too_many_parameters", 1), ("god_class", 14)
+    }
+    assert {"long_function", "too_many_parameters", "god_class"} <= set(timings)
+
+def test_magic_numbers_skip_constants_defaults_and_indices(tmp_path):
+    from tools.code_analysis import find_code_smells
+    test_file = tmp_path / "magic.py"
+    test_file.write_text(
+        "TIMEOUT = 3600\n"
+        "class Config:\n"
+        "    RETRIES = 5\n"
+        "    def wait(self, delay=30):\n"
+        "        # sleep 1000 ms\n"
+        "        first = items[3] + items[-4:10]\n"
+        "        if delay > 1001:\n"
+        "            return '86400'\n"
+        "        return -7 * 60\n"
+    )
+
+    smells, _ = find_code_smells(str(test_file), {"magic_number_allowlist": [0, 1, 60]})
+
+    assert [(s["line"], s["column"], s["value"]) for s in smells if s["type"] == "magic_number"] == [
+        (7, 19, "1001"), (9, 15, "-7")
+    ]
+
+    from agents.nodes import _pattern_analysis_file
+    findings, _, _ = _pattern_analysis_file(str(test_file), "magic.py", None, None,
+                                            {"magic_number_allowlist": [0, 1, 60]}, [], False)
+    assert [(f["line"], f["column"]) for f in findings if f["rule_id"] == "magic_number"] == [(7, 19), (9, 15)]
+
+def test_policy_rule_blocks_compile_into_smell_rules(tmp_path):
+    from tools.code_analysis import find_code_smells
+    from tools.policy_rules import load_policy_rules
+    standards = tmp_path / "standards"
+    standards.mkdir()
+    (standards / "python.md").write_text(
+        "# Errors\nNo bare except.\n\n```codeguardian-rule\n"
+        "id: no-bare-except\nseverity: high\nast: ExceptHandler\nwhere: {type: null}\n```\n\n"
+        "# HTTP\n```codeguardian-rule\n"
+        "id: requests-timeout\nmessage: HTTP calls must set a timeout\ncall: requests.*\nmissing_keyword: timeout\n```\n\n"
+        "# SQL\n```codeguardian-rule\n"
+        "id: parameterized-sql\ncall: '*.execute'\nfirst_arg: formatted\n```\n\n"
+        "# Broken\n```codeguardian-rule\nid: broken\nast: NotANode\n```\n"
+        "```codeguardian-rule\nid: no-position\nast: arguments\n```\n"
+    )
+    specs, errors = load_policy_rules(str(standards))
+    assert [spec["id"] for spec in specs] == ["no-bare-except", "requests-timeout", "parameterized-sql"]
+    assert specs[1]["source"] == {"document": "python.md", "section": "HTTP"}
+    assert len(errors) == 2 and "NotANode" in errors[0] and "no source position" in errors[1]
+
+    test_file = tmp_path / "app.py"
+    test_file.write_text(
+        "import requests\n"
+        "try:\n"
+        "    requests.get(url)\n"
+        "    requests.post(url, timeout=5)\n"
+        "    cursor.execute(f'SELECT * FROM t WHERE id = {uid}')\n"
+        "    cursor.execute('SELECT * FROM t WHERE id = ?', (uid,))\n"
+        "except:\n"
+        "    pass\n"
+        "except ValueError:\n"
+        "    pass\n"
+    )
+    smells, timings = find_code_smells(str(test_file), {}, specs)
+
+    policy = [(s["type"], s["line"], s["severity"]) for s in smells if s.get("category") == "policy"]
+    assert sorted(policy) == [("no-bare-except", 7, "high"), ("parameterized-sql", 5, "medium"),
+                              ("requests-timeout", 3, "medium")]
+    assert "requests-timeout" in timings
+
+def test_static_analysis_reports_syntax_errors_as_findings(tmp_path):
+    from agents.nodes import _static_analysis_file
+    broken = tmp_path / "broken.py"
+    broken.write_text("def f(:\n    return 1  # codeguardian: ignore\n")
+
+    findings, errors = _static_analysis_file(str(broken), "broken.py", None, None, {}, False)
+
+    syntax = [f for f in findings if f["rule_id"] == "syntax-error"]
+    assert len(syntax) == 1 and syntax[0]["severity"] == "error" and syntax[0]["symbol"] == ""
+    assert not any("pylint" in error.lower() for error in errors)
+
+def test_pylint_cache_keys_on_file_path_and_imported_modules(tmp_path, monkeypatch):
+    from agents import nodes
+    from utils.result_cache import ResultCache
+    monkeypatch.setattr(nodes, "_analysis_cache", lambda enabled: ResultCache(cache_dir=str(tmp_path / "cache")))
+    source = '"""Module."""\nfrom helper import VALUE\n\nprint(VALUE)\n'
+    (tmp_path / "ok.py").write_text(source)
+    (tmp_path / "Bad-Name.py").write_text(source)
+    (tmp_path / "helper.py").write_text('"""Helper."""\nVALUE = 1\n')
+
+    def symbols(name):
+        findings, _ = nodes._static_analysis_file(str(tmp_path / name), name, None, None, {}, True)
+        return {f["rule_id"] for f in findings}
+
+    assert "invalid-name" not in symbols("ok.py")
+    assert "invalid-name" in symbols("Bad-Name.py")
+
+    (tmp_path / "helper.py").write_text('"""Helper."""\nOTHER = 1\n')
+    assert "no-name-in-module" in symbols("ok.py")
+
+def test_static_analysis_lints_files_in_batches(tmp_path, monkeypatch):
+    from agents import nodes
+    from tools import code_analysis
+    batches = []
+    lint = code_analysis.lint_python_files
+    monkeypatch.setattr(nodes, "lint_python_files", lambda paths, *args: batches.append(paths) or lint(paths, *args))
+    monkeypatch.setattr(nodes, "LINT_BATCH_FILES", 2)
+    files = []
+    for name in ("a.py", "b.py", "c.py"):
+        (tmp_path / name).write_text('"""Module."""\nimport os\n')
+        files.append(str(tmp_path / name))
+
+    result = nodes.run_static_analysis_node({"target_files": files, "local_path": str(tmp_path),
+                                             "cache_enabled": False, "jobs": 1})
+
+    assert batches == [files[:2], files[2:]]
+    assert [f["file"] for f in result["static_analysis_findings"] if f["rule_id"] == "unused-import"] == files
+    assert result["files_analyzed"] == 3 and result["errors"] == []
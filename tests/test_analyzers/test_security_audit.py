@@ -0,0 +1,52 @@
+import pytest
+
+
+def test_security_node_maps_bandit_issues_to_findings(tmp_path):
+    from agents.nodes import run_security_audit_node
+    app = tmp_path / "app.py"
+    app.write_text(
+        "import subprocess\n"
+        "password = 'hunter2'\n"
+        "def run(cmd):\n"
+        "    assert cmd\n"
+        "    subprocess.call(cmd, shell=True)\n"
+        "    eval(cmd)  # nosec\n"
+        "    exec(cmd)  # codeguardian: ignore[B102]\n"
+    )
+    (tmp_path / "clean.py").write_text("def add(a, b):\n    return a + b\n")
+
+    result = run_security_audit_node({
+        "local_path": str(tmp_path),
+        "target_files": [str(app), str(tmp_path / "clean.py")],
+        "config": {"security": {"bandit_skips": ["B101"]}},
+        "cache_enabled": False,
+        "jobs": 1,
+    })
+
+    assert result["errors"] == []
+    findings = {f["rule_id"]: f for f in result["security_findings"]}
+    assert sorted(findings) == ["B105", "B404", "B602"]
+    shell = findings["B602"]
+    assert (shell["line"], shell["severity"], shell["cwe_id"], shell["tool"]) == (5, "critical", "CWE-78", "bandit")
+    assert findings["B105"]["severity"] == "low" and shell["symbol"] == "run"
+
+
+def test_bandit_severity_mapping():
+    from tools.bandit_worker import map_severity
+    assert map_severity("HIGH", "HIGH") == "critical"
+    assert map_severity("MEDIUM", "MEDIUM") == "medium"
+    assert map_severity("MEDIUM", "LOW") == "low"
+    assert map_severity("LOW", "LOW") == "info"
+
+
+def test_bandit_public_api_fallback_finds_the_same_issues(tmp_path):
+    from tools.bandit_worker import BanditWorker
+    path = tmp_path / "app.py"
+    path.write_text("import subprocess\nsubprocess.call(cmd, shell=True)\neval(cmd)  # nosec\n")
+    worker = BanditWorker()
+
+    fast = worker.scan(str(path))
+    public = worker._scan_public(str(path))
+
+    assert [(i["test_id"], i["line"]) for i in fast] == [(i["test_id"], i["line"]) for i in public]
+    assert [i["test_id"] for i in fast] == ["B404", "B602"]
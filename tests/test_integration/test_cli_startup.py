@@ -0,0 +1,25 @@
+import pytest
+import os
+import subprocess
+import sys
+import time
+
+MAIN = os.path.join(os.path.dirname(__file__), "..", "..", "src", "main.py")
+
+# Wall-clock budget for `main.py version`, interpreter start included
+STARTUP_BUDGET_SECONDS = float(os.getenv("CLI_STARTUP_BUDGET_SECONDS", "1.5"))
+
+
+def test_version_starts_fast_without_loading_the_graph():
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime", MAIN, "version"],
+                            capture_output=True, text=True, timeout=60)
+    elapsed = time.perf_counter() - started
+
+    assert result.returncode == 0, result.stderr
+    assert "Code Review Agent" in result.stdout
+    imported = [line.rsplit("|", 1)[-1].strip() for line in result.stderr.splitlines()]
+    heavy = [name for name in imported if name.split(".")[0] in ("langgraph", "langchain_core",
+                                                                 "langchain_google_genai")]
+    assert heavy == []
+    assert elapsed < STARTUP_BUDGET_SECONDS
@@ -60,3 +60,10 @@ def long_function():
         
     assert "reporting_complete" in final_state.get("current_step", "")
     assert len(final_state.get("all_findings", [])) >= 1
+
+
+def test_default_config_enables_every_analysis_node(tmp_path):
+    from agents.graph import ANALYSIS_NODES, route_analysis_nodes
+    from utils.config_loader import load_config
+    config = load_config(str(tmp_path))  # no .codeguardian.yml
+    assert route_analysis_nodes({"config": config}) == list(ANALYSIS_NODES)
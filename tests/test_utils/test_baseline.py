@@ -0,0 +1,25 @@
+import pytest
+from utils.baseline import is_suppressed, load_baseline, parse_suppressions, save_baseline
+from utils.source_cache import ParsedFile
+
+def test_baseline_round_trip(tmp_path):
+    path = str(tmp_path / "baseline")
+    fingerprints = ["0123456789abcdef0123", "ffffffffffffffffffff", "0123456789abcdef0123"]
+
+    assert save_baseline(path, fingerprints) == 2
+    assert load_baseline(path) == {"0123456789abcdef0123", "ffffffffffffffffffff"}
+
+def test_inline_suppressions(tmp_path):
+    parsed = ParsedFile("a.py", (
+        b"x = f(86400)  # codeguardian: ignore[magic_number, long_function]\n"
+        b"y = '# codeguardian: ignore'\n"
+        b"z = 1  # codeguardian: ignore\n"
+    ))
+
+    suppressions = parse_suppressions(parsed)
+
+    assert suppressions == {1: {"magic_number", "long_function"}, 3: {"*"}}
+    assert is_suppressed({"suppressed": sorted(suppressions[1])}, "magic_number")
+    assert not is_suppressed({"suppressed": sorted(suppressions[1])}, "too_many_parameters")
+    assert is_suppressed({"suppressed": ["*"]}, "anything")
+    assert not is_suppressed({}, "magic_number")
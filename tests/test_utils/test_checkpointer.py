@@ -0,0 +1,57 @@
+import pytest
+import operator
+from typing import Annotated, List, TypedDict
+from langgraph.graph import StateGraph, END
+from utils.checkpointer import SQLiteCheckpointSaver
+
+
+class _State(TypedDict):
+    findings: Annotated[List[str], operator.add]
+    steps: Annotated[List[str], operator.add]
+
+
+def _build(checkpointer, calls):
+    def analyze(state):
+        calls.append("analyze")
+        return {"findings": [f"finding-{i}" * 50 for i in range(200)], "steps": ["analyze"]}
+
+    def fix(state):
+        calls.append("fix")
+        return {"steps": ["fix"]}
+
+    workflow = StateGraph(_State)
+    workflow.add_node("analyze", analyze)
+    workflow.add_node("fix", fix)
+    workflow.set_entry_point("analyze")
+    workflow.add_edge("analyze", "fix")
+    workflow.add_edge("fix", END)
+    return workflow.compile(checkpointer=checkpointer, interrupt_before=["fix"])
+
+
+def test_paused_thread_resumes_in_a_new_saver(tmp_path):
+    path = str(tmp_path / "checkpoints.sqlite")
+    config = {"configurable": {"thread_id": "review-1"}}
+    calls = []
+
+    graph = _build(SQLiteCheckpointSaver(path), calls)
+    graph.invoke({"findings": [], "steps": []}, config)
+    assert calls == ["analyze"]
+
+    # A fresh saver on the same file stands in for a new process
+    saver = SQLiteCheckpointSaver(path)
+    graph = _build(saver, calls)
+    assert graph.get_state(config).next == ("fix",)
+    final = graph.invoke(None, config)
+    assert calls == ["analyze", "fix"]
+    assert final["steps"] == ["analyze", "fix"]
+    assert len(final["findings"]) == 200
+
+    # Unchanged channels are not stored again, large values are compressed
+    conn = saver._connection()
+    assert conn.execute("SELECT COUNT(*) FROM blobs WHERE channel = 'findings'").fetchone()[0] == 2
+    types = [row[0] for row in conn.execute("SELECT type FROM blobs WHERE channel = 'findings'")]
+    assert sorted(types) == ["msgpack", "msgpack+zlib"]
+
+    saver.delete_thread("review-1")
+    assert saver.get_tuple(config) is None
+    assert saver.thread_ids() == []
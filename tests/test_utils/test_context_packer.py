@@ -0,0 +1,77 @@
+import pytest
+from utils.context_packer import ContextPacker, estimate_tokens
+from utils.llm_gateway import FakeBackend, LLMGateway
+
+SOURCE = '''import os
+import json
+from typing import List
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+def unrelated(items: List[int]):
+    return sorted(items)
+
+class Store:
+    limit = 10
+
+    def __init__(self, root):
+        self.root = root
+
+    def read(self, name):
+        data = load(os.path.join(self.root, name))
+        return data[:self.limit]
+
+def main():
+    return Store(".").read("x.json")
+''' + "\n".join(f"CONSTANT_{i} = {i}" for i in range(200)) + "\n"
+
+
+def test_packs_enclosing_symbol_with_callees_callers_class_and_imports(tmp_path):
+    path = tmp_path / "store.py"
+    path.write_text(SOURCE)
+
+    context = ContextPacker(budget=400).pack(str(path), 20)
+
+    assert context.symbols == ["load", "Store", "Store.read", "main"]
+    assert "import os" in context.text and "import json" in context.text
+    assert "from typing" not in context.text and "unrelated" not in context.text
+    # The class shows up as an outline, with method bodies left out
+    assert "self.root = root" not in context.text
+    assert context.tokens <= 400 < estimate_tokens(SOURCE)
+
+
+def test_budget_drops_related_code_first_then_trims_the_symbol(tmp_path):
+    path = tmp_path / "store.py"
+    path.write_text(SOURCE)
+
+    small = ContextPacker(budget=40).pack(str(path), 20)
+    assert small.symbols == ["Store.read"] and not small.truncated
+
+    tiny = ContextPacker(budget=25).pack(str(path), 19)
+    assert tiny.truncated and tiny.tokens <= 25
+    assert tiny.text.startswith("# lines 19-") and "def read" not in tiny.text
+
+
+def test_fix_prompts_carry_packed_context_instead_of_the_file(tmp_path, monkeypatch):
+    from agents import nodes
+    path = tmp_path / "store.py"
+    path.write_text(SOURCE)
+    prompts = []
+
+    def respond(prompt):
+        prompts.append(prompt)
+        return "Here you go:\n```python\ndef read(self, name):\n    return []\n```"
+
+    gateway = LLMGateway(FakeBackend(responder=respond), requests_per_minute=0)
+    monkeypatch.setattr(nodes, "get_llm_gateway", lambda: gateway)
+    issue = {"id": "f1", "file": str(path), "line": 20, "title": "Magic Number", "auto_fixable": True}
+
+    result = nodes.generate_fixes_node({"prioritized_issues": [issue], "local_path": str(tmp_path),
+                                        "config": {"auto_fix": {"context_tokens": 300}}})
+    gateway.close()
+
+    [fix] = result["generated_fixes"]
+    assert fix["fix_code"] == "def read(self, name):\n    return []" and fix["context_tokens"] <= 300
+    assert "def read(self, name)" in prompts[0] and "CONSTANT_199" not in prompts[0]
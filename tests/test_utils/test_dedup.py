@@ -0,0 +1,35 @@
+import pytest
+from utils.dedup import merge_duplicates
+
+def test_cross_tool_duplicates_are_merged():
+    findings = [
+        {"id": "p1", "file": "a.py", "line": 3, "end_line": 3, "rule_id": "too-many-arguments",
+         "tool": "pylint", "severity": "refactor"},
+        {"id": "s1", "file": "a.py", "line": 3, "end_line": 20, "rule_id": "too_many_parameters",
+         "tool": "smells", "severity": "medium"},
+        {"id": "m1", "file": "a.py", "line": 8, "rule_id": "magic_number", "tool": "smells"},
+        {"id": "m2", "file": "a.py", "line": 8, "rule_id": "magic_number", "tool": "smells"},
+        {"id": "p2", "file": "b.py", "line": 3, "rule_id": "too-many-arguments", "tool": "pylint"},
+        {"id": "s1", "file": "a.py", "line": 3, "end_line": 20, "rule_id": "too_many_parameters",
+         "tool": "smells", "severity": "medium"},
+    ]
+
+    merged = merge_duplicates(findings)
+
+    assert [(kept["id"], [m["id"] for m in dups]) for kept, dups in merged] == [
+        ("s1", ["p1"]), ("m1", []), ("m2", []), ("p2", [])
+    ]
+
+def test_fingerprints_survive_line_shifts(tmp_path):
+    from agents.nodes import _pattern_analysis_file
+    source = "def f(a, b, c, d, e, g):\n    return a * 86400\n"
+    path = tmp_path / "a.py"
+
+    path.write_text(source)
+    before, _, _ = _pattern_analysis_file(str(path), "a.py", None, None, {}, [], False)
+    path.write_text("import os\n\n" + source)
+    after, _, _ = _pattern_analysis_file(str(path), "a.py", None, None, {}, [], False)
+
+    assert len(before) == 2
+    assert [f.id for f in before] == [f.id for f in after]
+    assert [f.line for f in after] == [3, 4]
@@ -0,0 +1,56 @@
+import pytest
+from utils.diff_scope import ChangedLines, parse_unified_diff
+
+DIFF = """diff --git a/app.py b/app.py
+--- a/app.py
++++ b/app.py
+@@ -3,0 +4,2 @@ def main():
++    x = 1
++    y = 2
+@@ -10 +12 @@ def helper():
+-    return 0
++    return 1
+@@ -20,3 +21,0 @@ def gone():
+-a
+-b
+-c
+diff --git a/old.py b/old.py
+--- a/old.py
++++ /dev/null
+@@ -1 +0,0 @@
+-print()
+"""
+
+def test_parse_unified_diff_new_side_ranges():
+    assert parse_unified_diff(DIFF) == {"app.py": [(4, 5), (12, 12), (21, 21)]}
+
+def test_changed_lines_overlap():
+    changed = ChangedLines({"app.py": [[12, 12], [4, 5], [6, 8]]})
+
+    assert changed.overlaps("app.py", 7)
+    assert changed.overlaps("app.py", 1, 4)  # a function whose body was edited
+    assert not changed.overlaps("app.py", 9, 11)
+    assert not changed.overlaps("app.py", 13)
+    assert changed.overlaps("other.py", 1)  # no diff information: whole file
+
+def test_changed_hunks_since_merge_base(tmp_path):
+    git = pytest.importorskip("git")
+    from tools.git_operations import get_changed_hunks
+
+    repo = git.Repo.init(tmp_path)
+    with repo.config_writer() as config:
+        config.set_value("user", "name", "test")
+        config.set_value("user", "email", "test@example.com")
+    source = tmp_path / "app.py"
+    source.write_text("".join(f"line{i}\n" for i in range(1, 11)))
+    repo.index.add(["app.py"])
+    repo.index.commit("base")
+    repo.git.branch("base")
+    source.write_text(source.read_text().replace("line7\n", "line7\nextra\n"))
+    (tmp_path / "new_module.py").write_text("a = 1\nb = 2\nc = 3\n")
+
+    hunks = get_changed_hunks.invoke({"repo_path": str(tmp_path), "base_ref": "base"})
+
+    assert hunks["status"] == "success"
+    # Untracked files are changed in full
+    assert hunks["files"] == {"app.py": [[8, 8]], "new_module.py": [[1, 3]]}
@@ -0,0 +1,55 @@
+import pytest
+from utils.file_scope import ScopeFilter, iter_scope_files
+import os
+
+def test_scope_honours_include_and_exclude(tmp_path):
+    for rel in ["src/app.py", "src/pkg/util.py", "src/pkg/util.spec.py", "src/node_modules/dep/x.py",
+                "tests/test_app.py", "docs/conf.py", ".git/hooks/pre-commit.py"]:
+        path = tmp_path / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("")
+
+    files = list(iter_scope_files(str(tmp_path),
+                                  ["src/**/*.py", "tests/**/*.py"],
+                                  ["**/node_modules/**", "**/*.spec.py"]))
+
+    assert [os.path.relpath(f, tmp_path) for f in files] == [
+        os.path.join("src", "app.py"),
+        os.path.join("src", "pkg", "util.py"),
+        os.path.join("tests", "test_app.py"),
+    ]
+
+def test_excluded_directories_are_pruned():
+    scope = ScopeFilter(["src/**/*.py"], ["**/node_modules/**", "build/**"])
+
+    assert not scope.wants_dir("node_modules")
+    assert not scope.wants_dir("src/web/node_modules")
+    assert not scope.wants_dir("build")
+    assert not scope.wants_dir("docs")  # no include pattern can match below it
+    assert scope.wants_dir("src/web")
+
+def test_git_listing_carries_blob_shas(tmp_path):
+    git = pytest.importorskip("git")
+    from tools.git_operations import list_repository_files
+    from utils.source_cache import blob_hash
+
+    repo = git.Repo.init(tmp_path)
+    for rel, text in [("app.py", "x = 1\n"), ("lib/util.py", "y = 2\n"),
+                      (".gitignore", "build/\n"), ("build/gen.py", "")]:
+        path = tmp_path / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+    (tmp_path / "link.py").symlink_to("app.py")
+    repo.index.add(["app.py", "lib/util.py", ".gitignore", "link.py"])
+    (tmp_path / "lib/util.py").write_text("y = 3\n")
+    (tmp_path / "new.py").write_text("")
+
+    files = list_repository_files.invoke({"repo_path": str(tmp_path)})["files"]
+
+    assert files == {
+        "app.py": blob_hash(b"x = 1\n"),
+        "lib/util.py": None,  # modified since it was staged
+        ".gitignore": blob_hash(b"build/\n"),
+        "new.py": None,  # untracked but not ignored
+        "link.py": None,  # the index hashes the link text, not app.py
+    }
@@ -0,0 +1,64 @@
+import pytest
+from utils.findings_stream import FindingsSink, read_findings
+
+def test_sink_appends_and_survives_torn_line(tmp_path):
+    path = tmp_path / "out" / "findings.jsonl"
+    sink = FindingsSink(str(path))
+    sink.reset()
+    totals = []
+    sink.subscribe(totals.append)
+
+    sink.write([{"file": "a.py", "line": 1}, {"file": "a.py", "line": 2}])
+    sink.write([])
+    sink.write([{"file": "b.py", "line": 3}])
+    with open(path, "a") as f:
+        f.write('{"file": "c.py", "li')  # killed mid-write
+
+    assert totals == [2, 3]
+    assert [f["line"] for f in read_findings(str(path))] == [1, 2, 3]
+
+def test_resumed_sink_drops_torn_line_and_already_streamed_ids(tmp_path):
+    path = tmp_path / "findings.jsonl"
+    FindingsSink(str(path)).write([{"id": "1", "line": 1}, {"id": "2", "line": 2}])
+    with open(path, "a") as f:
+        f.write('{"id": "3", "li')  # killed mid-write
+
+    sink = FindingsSink(str(path))
+    sink.resume()
+    # The re-run node emits its batch again, plus one new finding
+    sink.write([{"id": "1", "line": 1}, {"id": "2", "line": 2}, {"id": "3", "line": 3}])
+
+    assert [f["id"] for f in read_findings(str(path))] == ["1", "2", "3"]
+    assert sink.count == 3
+
+def test_synthesis_reads_streamed_findings(tmp_path):
+    from agents.nodes import synthesize_findings_node
+    path = str(tmp_path / "findings.jsonl")
+    sink = FindingsSink(path)
+    sink.write([{"id": "1", "file": "a.py", "line": 1, "severity": "low"},
+                {"id": "2", "file": "a.py", "line": 5, "severity": "critical"}])
+
+    result = synthesize_findings_node({
+        "findings_stream": path,
+        "policy_findings": [{"id": "3", "file": "b.py", "line": 1, "severity": "high"}]
+    })
+
+    assert [f["id"] for f in result["prioritized_issues"]] == ["2", "3", "1"]
+
+def test_finding_record_round_trips_losslessly(tmp_path):
+    import pickle
+    from agents.state import FindingRecord
+    finding = {"id": "x1", "file": "src/app.py", "line": 3, "severity": "high", "category": "security",
+               "title": "Hardcoded password", "description": "", "auto_fixable": False, "cwe_id": "CWE-259"}
+
+    record = FindingRecord.from_dict(finding)
+    copy = pickle.loads(pickle.dumps(record))
+
+    assert record.to_dict() == finding == copy.to_dict()
+    assert record["cwe_id"] == "CWE-259" and record.get("impact", "n/a") == "n/a"
+    assert "impact" not in record and dict(record) == finding
+    assert copy.file is record.file  # interned
+
+    sink = FindingsSink(str(tmp_path / "findings.jsonl"))
+    sink.write([record])
+    assert list(sink.read()) == [finding]
@@ -0,0 +1,72 @@
+import pytest
+import asyncio
+import threading
+from utils.llm_cache import LLMResponseCache
+from utils.llm_gateway import FakeBackend, LLMGateway, TokenBucket
+
+
+@pytest.mark.asyncio
+async def test_gateway_limits_concurrency_and_coalesces_identical_prompts():
+    # Calls are held until every request has reached the gateway, so all
+    # duplicates are still in flight when they arrive
+    gate = threading.Event()
+    backend = FakeBackend(gate=gate)
+    gateway = LLMGateway(backend, max_concurrency=3, requests_per_minute=0)
+    try:
+        prompts = [f"review file {i % 10}" for i in range(50)]
+        pending = asyncio.gather(*(gateway.generate(p) for p in prompts))
+        while gateway.stats["requests"] < len(prompts):
+            await asyncio.sleep(0.001)
+        gate.set()
+        answers = await pending
+    finally:
+        gateway.close()
+
+    assert answers == [f"echo: {p}" for p in prompts]
+    assert backend.max_active <= 3
+    assert backend.calls == 10
+    assert gateway.stats["coalesced"] == 40
+
+
+def test_gateway_retries_transient_failures():
+    backend = FakeBackend(failures=2)
+    gateway = LLMGateway(backend, requests_per_minute=0, max_retries=3, max_wait=0.01)
+    try:
+        assert gateway.generate_sync("hello") == "echo: hello"
+    finally:
+        gateway.close()
+    assert backend.calls == 3
+    assert gateway.stats["retries"] == 2
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_spaces_requests_beyond_the_burst():
+    bucket = TokenBucket(rate=50, capacity=2)
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    for _ in range(4):
+        await bucket.acquire()
+    # Two tokens up front, the other two at 50 per second
+    assert loop.time() - started >= 0.035
+
+
+def test_response_cache_keys_on_template_and_expires(tmp_path):
+    cache = LLMResponseCache(str(tmp_path), ttl_seconds=60)
+    backend = FakeBackend()
+    gateway = LLMGateway(backend, requests_per_minute=0, cache=cache)
+    template = "Fix {issue} in {file}"
+    try:
+        first = gateway.generate_from_template_sync(template, {"issue": "E1", "file": "a.py"})
+        again = gateway.generate_from_template_sync(template, {"file": "a.py", "issue": "E1"})
+        gateway.generate_from_template_sync(template + ".", {"issue": "E1", "file": "a.py"})
+    finally:
+        gateway.close()
+    assert first == again == "echo: Fix E1 in a.py"
+    assert backend.calls == 2
+    assert cache.stats()["hits"] == 1
+
+    # With a tiny TTL both stored answers are stale
+    cache.ttl_seconds = 1e-9
+    assert cache.get(gateway.request_key(template, {"issue": "E1", "file": "a.py"})) is None
+    assert cache.prune_expired() == 1
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,19 @@
+import pytest
+from utils.parallel import map_files
+
+def _path_length(file_path, offset):
+    if file_path == "boom.py":
+        raise ValueError("cannot analyze")
+    return len(file_path) + offset
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_map_files_keeps_order_and_isolates_errors(jobs):
+    files = ["a.py", "boom.py"] + [f"pkg/mod_{i}.py" for i in range(20)]
+
+    results = list(map_files(_path_length, files, 1, jobs=jobs))
+
+    assert [path for path, _, _ in results] == files
+    assert results[0] == ("a.py", 5, None)
+    assert results[1][1] is None
+    assert "ValueError: cannot analyze" in results[1][2]
+    assert all(error is None for _, _, error in results[2:])
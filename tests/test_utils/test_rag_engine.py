@@ -0,0 +1,145 @@
+import pytest
+import os
+from utils.rag_engine import RAGEngine, split_sections
+
+
+def test_sections_carry_their_heading_path():
+    text = "Intro line\n\n# Security\n\n## SQL\nUse parameterized queries.\n\nLogging\n=======\nNo secrets in logs."
+    sections = list(split_sections(text))
+    assert sections == [
+        ("", 1, "Intro line"),
+        ("Security", 4, ""),
+        ("Security > SQL", 6, "Use parameterized queries."),
+        ("Logging", 10, "No secrets in logs."),
+    ]
+
+
+def test_bm25_ranks_sections_and_reindexes_only_changed_documents(tmp_path):
+    standards = tmp_path / "standards"
+    standards.mkdir()
+    (standards / "security.md").write_text(
+        "# Database access\nAll database queries must use parameterized statements.\n\n"
+        "# Secrets\nNever hard-code API keys or passwords in source files.\n"
+    )
+    (standards / "style.txt").write_text("Function names use snake_case. Keep functions short.\n")
+    engine = RAGEngine(str(standards), index_path=str(tmp_path / "index.sqlite"))
+    assert engine.load_standards().startswith("Indexed 2 policy documents (2 updated")
+
+    hits = engine.search("hard-coded password in config", k=2)
+    assert hits[0]["document"] == "security.md"
+    assert hits[0]["section"] == "Secrets"
+    assert "[security.md > Database access]" in engine.query_standards("sql database queries", k=1)
+
+    # Touching a file without changing it, or not touching it, re-indexes nothing
+    os.utime(standards / "style.txt")
+    assert "(0 updated, 0 removed)" in engine.load_standards()
+
+    (standards / "style.txt").write_text("Class names use CamelCase.\n")
+    os.remove(standards / "security.md")
+    assert "(1 updated, 1 removed)" in engine.load_standards()
+    assert engine.search("password") == []
+    assert engine.search("camelcase")[0]["document"] == "style.txt"
+
+
+class _SynonymEmbedder:
+    """Deterministic stub: one dimension per concept, whatever the wording."""
+
+    name = "synonym-stub"
+    CONCEPTS = [("password", "credential", "secret"), ("sql", "query", "database")]
+
+    def __init__(self):
+        self.embedded = 0
+
+    def __call__(self, texts):
+        import numpy as np
+        self.embedded += len(texts)
+        matrix = np.zeros((len(texts), len(self.CONCEPTS)), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for dim, words in enumerate(self.CONCEPTS):
+                matrix[row, dim] = sum(text.lower().count(word) for word in words)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms == 0, 1, norms)
+
+
+def test_dense_mode_matches_paraphrases_and_embeds_only_new_sections(tmp_path):
+    pytest.importorskip("numpy")
+    standards = tmp_path / "standards"
+    standards.mkdir()
+    (standards / "policy.md").write_text(
+        "# Credentials\nStore every credential in the vault.\n\n# Queries\nParameterize each SQL statement.\n"
+    )
+    embedder = _SynonymEmbedder()
+    engine = RAGEngine(str(standards), index_path=str(tmp_path / "index.sqlite"), mode="dense", embedder=embedder)
+    engine.load_standards()
+
+    assert engine.search("password")[0]["section"] == "Credentials"
+    assert [hit["section"] for hit in engine.search("database", k=5)] == ["Queries"]
+
+    (standards / "extra.md").write_text("# Secrets\nRotate secrets yearly.\n")
+    before = embedder.embedded
+    engine.load_standards()
+    assert embedder.embedded - before == 1
+    assert {hit["document"] for hit in engine.search("password", k=5)} == {"policy.md", "extra.md"}
+
+
+def test_policy_node_retrieves_once_per_group_and_flags_trigger_matches(tmp_path, monkeypatch):
+    from agents.nodes import verify_policy_node
+    from utils import rag_engine
+
+    standards = tmp_path / "standards"
+    standards.mkdir()
+    (standards / "python.md").write_text(
+        "# Python database access\nNever build SQL with f-strings in python code.\n"
+        "Triggers: cursor.execute(f\n\n"
+        "# Python style\nPrefer pathlib in python code.\n"
+    )
+    repo = tmp_path / "repo"
+    (repo / "app").mkdir(parents=True)
+    (repo / "app" / "db.py").write_text("import os\n\ncursor.execute(f'SELECT {x}')\n")
+    (repo / "app" / "util.py").write_text("import os\n")
+    (repo / "app" / "views.py").write_text("import flask\n")
+
+    searches = []
+    original = rag_engine.RAGEngine.search
+    monkeypatch.setattr(rag_engine.RAGEngine, "search",
+                        lambda self, query, k=5: searches.append(query) or original(self, query, k))
+    monkeypatch.setenv("CACHE_DIR", str(tmp_path / "cache"))
+
+    result = verify_policy_node({
+        "local_path": str(repo),
+        "target_files": [str(repo / "app" / name) for name in ("db.py", "util.py", "views.py")],
+        "config": {"policy": {"standards_dir": str(standards)}},
+    })
+
+    assert sorted(searches) == ["python app", "python app flask"]
+    [finding] = result["policy_findings"]
+    assert finding["file"].endswith("db.py") and finding["line"] == 3
+    assert finding["title"] == "Policy applies: Python database access"
+
+
+def test_policy_triggers_come_from_trigger_lines_and_code_spans():
+    from utils.rag_engine import policy_triggers
+    text = "Never call `eval(` on input.\nTriggers: pickle.loads, `yaml.load(`\n"
+    assert policy_triggers(text) == ["pickle.loads", "yaml.load(", "eval("]
+
+
+def test_policy_node_skips_binary_and_undecodable_files(tmp_path, monkeypatch):
+    from agents.nodes import verify_policy_node
+
+    standards = tmp_path / "standards"
+    standards.mkdir()
+    (standards / "python.md").write_text("# Python eval\nNever call eval in python code.\nTriggers: eval(\n")
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    (repo / "logo.png").write_bytes(b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\xff\xfe")
+    (repo / "bad.py").write_bytes(b"# -*- coding: nonsense -*-\neval(x)\n")
+    (repo / "app.py").write_text("eval(x)\n")
+    monkeypatch.setenv("CACHE_DIR", str(tmp_path / "cache"))
+
+    result = verify_policy_node({
+        "local_path": str(repo),
+        "target_files": [str(repo / name) for name in ("logo.png", "bad.py", "app.py")],
+        "config": {"policy": {"standards_dir": str(standards)}},
+    })
+
+    assert [f["file"] for f in result["policy_findings"]] == [str(repo / "app.py")]
@@ -0,0 +1,36 @@
+import pytest
+from utils.result_cache import ResultCache, cached_result
+
+def test_cached_result_round_trip(tmp_path):
+    """A second lookup for the same content/tool/config is served from disk."""
+    cache = ResultCache(cache_dir=str(tmp_path))
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return [{"line": 3, "message": "unused import"}]
+
+    first = cached_result(cache, "abc123", "pylint", "3.3.4", compute, {"max_line_length": 100})
+    second = cached_result(ResultCache(cache_dir=str(tmp_path)), "abc123", "pylint", "3.3.4",
+                           compute, {"max_line_length": 100})
+    cached_result(cache, "abc123", "pylint", "3.3.4", compute, {"max_line_length": 120})
+
+    assert first == second
+    assert len(calls) == 2  # only the changed config section recomputed
+
+def test_errors_are_not_cached(tmp_path):
+    cache = ResultCache(cache_dir=str(tmp_path))
+    cached_result(cache, "abc123", "pylint", "3.3.4", lambda: [{"error": "Pylint timeout"}])
+    assert cache.stats()["entries"] == 0
+
+def test_prune_evicts_least_recently_used(tmp_path):
+    cache = ResultCache(cache_dir=str(tmp_path))
+    for name in ["a", "b", "c"]:
+        cache.put(name, {"payload": "x" * 100})
+    cache.get("a")
+
+    evicted = cache.prune(max_bytes=120)
+
+    assert evicted == 2
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
@@ -0,0 +1,57 @@
+import pytest
+from utils.source_cache import SourceCache, blob_hash
+import subprocess
+
+def test_file_parsed_once(tmp_path):
+    """Repeated lookups of an unchanged file reuse the same parse."""
+    test_file = tmp_path / "mod.py"
+    test_file.write_text("def f(x):\n    return x\n")
+    cache = SourceCache()
+
+    first = cache.get(str(test_file))
+    second = cache.get(str(test_file))
+
+    assert first is second
+    assert first.tree is second.tree
+    assert cache.stats() == {"files": 1, "hits": 1, "misses": 1}
+    assert first.line_offsets == [0, 10, 23]
+    assert first.line_at(12) == 2
+
+def test_changed_file_is_reparsed(tmp_path):
+    """A content change invalidates the cached entry."""
+    test_file = tmp_path / "mod.py"
+    test_file.write_text("x = 1\n")
+    cache = SourceCache()
+    first = cache.get(str(test_file))
+
+    test_file.write_text("x = 22\n")
+    second = cache.get(str(test_file))
+
+    assert first is not second
+    assert second.source == "x = 22\n"
+    assert cache.misses == 2
+
+def test_least_recently_used_files_are_evicted(tmp_path):
+    """The cache keeps at most max_files parsed files."""
+    paths = []
+    for name in ("a", "b", "c"):
+        path = tmp_path / f"{name}.py"
+        path.write_text(f"{name} = 1\n")
+        paths.append(str(path))
+    cache = SourceCache(max_files=2)
+
+    first = cache.get(paths[0])
+    cache.get(paths[1])
+    assert cache.get(paths[0]) is first
+    cache.get(paths[2])
+
+    assert cache.stats()["files"] == 2
+    assert cache.get(paths[0]) is first
+    cache.get(paths[1])
+    assert cache.misses == 4
+
+def test_content_hash_matches_git(tmp_path):
+    """Content hashes use git's blob identity."""
+    data = b"print('hi')\n"
+    result = subprocess.run(['git', 'hash-object', '--stdin'], input=data, capture_output=True)
+    assert blob_hash(data) == result.stdout.decode().strip()